@@ -1,83 +1,177 @@
 import os
 import sys
-import pandas as pd
+import argparse
+import numpy as np
+import profiling
+from draw_store import (store_path_for, make_records, load_draws, append_records, write_store,
+                        append_csv, write_csv_chunks, file_lock, mains, bonus, draw_dates, NO_BONUS)
+from dataset import invalidate
 
 PROCESSED_DIR = "data/processed"
 CLEANED_FILENAME = "lottomax_cleaned.csv"
 
-def show_last_draw(df):
-    if 'draw_date' not in df.columns or df.empty:
+# Batches longer than this rebuild the derived artifacts once instead of
+# applying one delta per draw
+DELTA_BATCH_LIMIT = 20
+
+def show_last_draw(records):
+    if len(records) == 0:
         print("No draw data found.")
         return
-    df['draw_date'] = pd.to_datetime(df['draw_date'])
-    last_row = df.sort_values('draw_date').iloc[-1]
-    print(f"\nLast draw date: {last_row['draw_date'].date()}")
-    numbers = [int(x) for x in last_row[['n1','n2','n3','n4','n5','n6','n7']]]
-    print(f"Numbers: {numbers}")
-    print(f"Bonus: {int(last_row['bonus'])}\n")
+    last = records[-1:]
+    print(f"\nLast draw date: {draw_dates(last)[0]}")
+    print(f"Numbers: {[int(n) for n in mains(last)[0]]}")
+    b = int(bonus(last)[0])
+    print(f"Bonus: {'' if b == NO_BONUS else b}\n")
+
+def parse_draw(draw_date, numbers, bonus):
+    # (day, 7 numbers, bonus) from text fields; ValueError on anything invalid
+    try:
+        day = np.datetime64(draw_date.strip(), 'D')
+    except ValueError:
+        raise ValueError(f"Invalid draw date: {draw_date!r}")
+    if np.isnat(day):
+        # np.datetime64 parses 'NaT' (any case) as not-a-time
+        raise ValueError(f"Invalid draw date: {draw_date!r}")
+    try:
+        numbers = [int(n) for n in numbers]
+        bonus = int(bonus)
+    except ValueError:
+        raise ValueError("Numbers and bonus must be integers")
+    if len(numbers) != 7 or len(set(numbers)) != 7 or not all(1 <= n <= 50 for n in numbers):
+        raise ValueError("You must provide exactly 7 distinct numbers between 1 and 50")
+    if not (1 <= bonus <= 50) or bonus in numbers:
+        raise ValueError("Bonus number must be between 1 and 50 and not one of the main numbers")
+    return day, numbers, bonus
+
+def read_draws(lines):
+    # Draws from lines of "YYYY-MM-DD,n1,...,n7,bonus"; blank lines and a
+    # header row are skipped
+    draws = []
+    for line_no, line in enumerate(lines, 1):
+        fields = [f.strip() for f in line.strip().split(',')]
+        if not fields[0] or fields[0] == 'draw_date':
+            continue
+        if len(fields) != 9:
+            raise ValueError(f"Line {line_no}: expected date, 7 numbers and bonus")
+        try:
+            draws.append(parse_draw(fields[0], fields[1:8], fields[8]))
+        except ValueError as e:
+            raise ValueError(f"Line {line_no}: {e}")
+    return draws
+
+@profiling.profiled()
+def add_draws(draws, path=None, update=True):
+    # Append many draws under the history's write lock. Duplicate dates are
+    # skipped: against the history by binary search of its sorted day column,
+    # within the batch by keeping each date's first draw. If every
+    # new draw is later than the last one on file, the CSV and binary store
+    # are appended in place; otherwise both are rewritten atomically in date
+    # order. update=False leaves the derived artifacts alone; their stamps
+    # then lag the history, so the next update rebuilds them. Returns the
+    # draws actually added.
+    path = path or os.path.join(PROCESSED_DIR, CLEANED_FILENAME)
+    store_path = store_path_for(path)
+    with file_lock(path):
+        records = load_draws(path)
+        days = records['day']
+        batch_days = np.array([day.astype(np.int64) for day, _, _ in draws], dtype=np.int64)
+        pos = np.minimum(np.searchsorted(days, batch_days), max(len(days) - 1, 0))
+        on_file = (days[pos] == batch_days) if len(days) else np.zeros(len(batch_days), dtype=bool)
+        first_in_batch = np.zeros(len(batch_days), dtype=bool)
+        first_in_batch[np.unique(batch_days, return_index=True)[1]] = True
+        added = []
+        for draw, keep in zip(draws, first_in_batch & ~on_file):
+            if not keep:
+                print(f"Draw for {draw[0]} already exists. Skipping.")
+                continue
+            added.append(draw)
+        if not added:
+            return added
 
+        new = make_records([d for d, _, _ in added], [n for _, n, _ in added], [b for _, _, b in added])
+        new = new[np.argsort(new['day'], kind='stable')]
+        in_order = len(records) == 0 or new['day'][0] > records['day'][-1]
+        if in_order:
+            # CSV first, then the store, so the store is never older than the CSV
+            append_csv(new, path)
+            append_records(new, store_path)
+        else:
+            merged = np.concatenate([np.asarray(records), new])
+            merged = merged[np.argsort(merged['day'], kind='stable')]
+            del records
+            write_csv_chunks([merged], path)
+            write_store(merged, store_path)
+        invalidate(path)
+        print(f"Added {len(added)} draw(s) through {draw_dates(new)[-1]}.")
+
+        # Bring frequency, pair/triplet and ML-ready artifacts up to date
+        if not update:
+            return added
+        from incremental_update import update_artifacts, rebuild_artifacts
+        if in_order and len(new) <= DELTA_BATCH_LIMIT:
+            for row in new:
+                update_artifacts(row['day'].astype('datetime64[D]'), row['numbers'][:7].tolist(),
+                                 int(row['numbers'][7]))
+        else:
+            rebuild_artifacts()
+    return added
 
 def add_new_draw():
-    # Load existing data
+    # Interactive entry of a single draw
     path = os.path.join(PROCESSED_DIR, CLEANED_FILENAME)
-    df = pd.read_csv(path)
-    
+    records = load_draws(path)
+
     # Show last draw info
-    show_last_draw(df)
+    show_last_draw(records)
 
     # Prompt for date
     draw_date = input("Enter draw date (YYYY-MM-DD) or press Enter to exit: ").strip()
     if not draw_date:
         print("No input provided. Exiting.")
         sys.exit(1)
-    if draw_date in df['draw_date'].values:
-        print(f"Draw for {draw_date} already exists. Exiting.")
-        sys.exit(1)
-    
+
     # Prompt for numbers
     numbers_str = input("Enter 7 main numbers separated by commas (e.g. 5,12,23,34,41,44,49) or press Enter to exit: ").strip()
     if not numbers_str:
         print("No input provided. Exiting.")
         sys.exit(1)
-    try:
-        numbers = [int(n) for n in numbers_str.split(',')]
-    except ValueError:
-        print("Invalid input. Please enter 7 integers separated by commas. Exiting.")
-        sys.exit(1)
-    if len(numbers) != 7 or not all(1 <= n <= 50 for n in numbers):
-        print("You must provide exactly 7 numbers between 1 and 50. Exiting.")
-        sys.exit(1)
-    
+
     # Prompt for bonus number
     bonus_str = input("Enter bonus number (1-50) or press Enter to exit: ").strip()
     if not bonus_str:
         print("No input provided. Exiting.")
         sys.exit(1)
+
     try:
-        bonus = int(bonus_str)
-    except ValueError:
-        print("Invalid input. Please enter an integer for the bonus number. Exiting.")
+        draw = parse_draw(draw_date, numbers_str.split(','), bonus_str)
+    except ValueError as e:
+        print(f"{e}. Exiting.")
         sys.exit(1)
-    if not (1 <= bonus <= 50):
-        print("Bonus number must be between 1 and 50. Exiting.")
+    if not add_draws([draw], path):
         sys.exit(1)
-    
-    # Prepare new row
-    new_row = {
-        'draw_date': draw_date,
-        'n1': numbers[0], 'n2': numbers[1], 'n3': numbers[2], 'n4': numbers[3],
-        'n5': numbers[4], 'n6': numbers[5], 'n7': numbers[6],
-        'bonus': bonus
-    }
-    
-    # Append and sort
-    df = pd.concat([df, pd.DataFrame([new_row])], ignore_index=True)
-    df['draw_date'] = pd.to_datetime(df['draw_date'])
-    df = df.sort_values('draw_date')
-    
-    # Save back
-    df.to_csv(path, index=False)
-    print(f"Draw for {draw_date} added successfully.")
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Add draws to the cleaned Lotto Max history.")
+    parser.add_argument('--file', default=None,
+                        help="CSV of draws (date,n1..n7,bonus) to append non-interactively; '-' reads stdin")
+    parser.add_argument('--skip-artifacts', action='store_true',
+                        help="Only append to the history; derived artifacts are rebuilt on the next update")
+    return parser.parse_args(argv)
 
 if __name__ == "__main__":
-    add_new_draw()
\ No newline at end of file
+    profiling.enable_from_argv()
+    args = parse_args(sys.argv[1:])
+    if args.file is None:
+        add_new_draw()
+    else:
+        try:
+            if args.file == '-':
+                draws = read_draws(sys.stdin)
+            else:
+                with open(args.file) as f:
+                    draws = read_draws(f)
+        except ValueError as e:
+            print(e)
+            sys.exit(1)
+        add_draws(draws, update=not args.skip_artifacts)
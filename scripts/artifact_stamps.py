@@ -0,0 +1,37 @@
+import os
+import json
+from draw_store import file_lock
+
+PROCESSED_DIR = "data/processed"
+STAMPS_FILENAME = "artifact_stamps.json"
+
+# Processed artifacts derived from lottomax_cleaned.csv
+MAIN_FREQ_FILENAME = "main_number_frequencies.csv"
+BONUS_FREQ_FILENAME = "bonus_number_frequencies.csv"
+PAIR_FILENAME = "pair_frequencies.csv"
+TRIPLET_FILENAME = "triplet_frequencies.csv"
+ML_FILENAME = "lottomax_ml_ready.csv"
+ML_PACKED_FILENAME = "lottomax_ml_ready.bin"
+GAP_STATE_FILENAME = "gap_state.npz"
+DERIVED_ARTIFACTS = [MAIN_FREQ_FILENAME, BONUS_FREQ_FILENAME, PAIR_FILENAME, TRIPLET_FILENAME, ML_FILENAME,
+                     ML_PACKED_FILENAME, GAP_STATE_FILENAME]
+
+def read_stamps():
+    # Maps artifact filename -> last draw_date (YYYY-MM-DD) it covers
+    path = os.path.join(PROCESSED_DIR, STAMPS_FILENAME)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+def stamp_artifacts(filenames, last_draw_date):
+    # Read-modify-write under a lock: pipeline stages stamp concurrently
+    path = os.path.join(PROCESSED_DIR, STAMPS_FILENAME)
+    with file_lock(path):
+        stamps = read_stamps()
+        for name in filenames:
+            stamps[name] = str(last_draw_date)[:10]
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w") as f:
+            json.dump(stamps, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, path)
@@ -0,0 +1,114 @@
+import os
+import sys
+import argparse
+import warnings
+import numpy as np
+import profiling
+from concurrent.futures import ProcessPoolExecutor
+from prepare_ml_data import NUM_COLS, load_ml_matrix
+from draw_store import load_draws, draw_dates
+from ml_common import (make_model, make_lagged_features, as_model_input, fit_predict, predict_per_number,
+                       score_per_number, shared_matrix_path)
+
+PROCESSED_DIR = "data/processed"
+CLEANED_FILENAME = "lottomax_cleaned.csv"
+CACHE_DIR = os.path.join(PROCESSED_DIR, "sweep_cache")
+
+# Models whose estimator supports partial_fit are updated step by step;
+# all others are refit from scratch at every boundary
+INCREMENTAL_MODELS = {'sgd'}
+
+def step_boundaries(n_samples, initial_train, step):
+    return list(range(initial_train, n_samples, step))
+
+def _pooled_auc(y, probas):
+    from sklearn.metrics import roc_auc_score
+    y = np.asarray(y).ravel()
+    if y.min() == y.max():
+        return np.nan
+    return roc_auc_score(y, np.asarray(probas).ravel())
+
+def _refit_step(matrix_path, model_type, n_lags, params, start, stop):
+    # Worker: independent fit on everything before `start`, predict [start, stop)
+    warnings.simplefilter('ignore')
+    X, y = make_lagged_features(np.load(matrix_path, mmap_mode='r'), n_lags=n_lags)
+    return fit_predict(model_type, params, as_model_input(X[:start]), y[:start],
+                       as_model_input(X[start:stop]), n_jobs=1)
+
+def _incremental_steps(X, y, model_type, params, boundaries):
+    # One model carried through the history: predict the next block, then
+    # partial_fit on it once its outcomes are known
+    model = make_model(model_type, params)
+    classes = [np.array([0, 1])] * y.shape[1]
+    model.partial_fit(as_model_input(X[:boundaries[0]]), y[:boundaries[0]], classes=classes)
+    outputs = []
+    for start, stop in zip(boundaries, boundaries[1:] + [len(X)]):
+        X_step = as_model_input(X[start:stop])
+        outputs.append(predict_per_number(model, X_step))
+        model.partial_fit(X_step, y[start:stop])
+    return outputs
+
+@profiling.profiled()
+def walk_forward(model_type='sgd', n_lags=3, params=None, initial_train=200, step=10, workers=None):
+    import pandas as pd
+    ml_matrix = load_ml_matrix()
+    X, y = make_lagged_features(ml_matrix, n_lags=n_lags)
+    boundaries = step_boundaries(len(X), initial_train, step)
+    if not boundaries:
+        raise ValueError(f"Need more than {initial_train} samples for a walk-forward run, have {len(X)}.")
+    stops = boundaries[1:] + [len(X)]
+
+    if model_type in INCREMENTAL_MODELS:
+        outputs = _incremental_steps(X, y, model_type, params, boundaries)
+    else:
+        matrix_path = shared_matrix_path(ml_matrix, CACHE_DIR)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_refit_step, matrix_path, model_type, n_lags, params, start, stop)
+                       for start, stop in zip(boundaries, stops)]
+            outputs = [future.result() for future in futures]
+
+    # Sample i of X predicts draw i + n_lags of the history
+    dates = draw_dates(load_draws(os.path.join(PROCESSED_DIR, CLEANED_FILENAME)))[n_lags:]
+    rows = []
+    for start, stop, (preds, probas) in zip(boundaries, stops, outputs):
+        rows.append({
+            'train_size': start,
+            'first_test_date': str(dates[start]),
+            'last_test_date': str(dates[stop - 1]),
+            'step_accuracy': float(np.mean(preds == y[start:stop])),
+            'step_auc': _pooled_auc(y[start:stop], probas),
+            'cumulative_auc': _pooled_auc(y[boundaries[0]:stop],
+                                          np.vstack([p for _, p in outputs[:len(rows) + 1]])),
+        })
+    steps = pd.DataFrame(rows)
+
+    # Aggregate over every out-of-sample prediction
+    all_preds = np.vstack([p for p, _ in outputs])
+    all_probas = np.vstack([p for _, p in outputs])
+    y_test = y[boundaries[0]:]
+    accs, aucs = score_per_number(y_test, all_preds, all_probas)
+    per_number = pd.DataFrame({'number': NUM_COLS, 'accuracy': accs, 'roc_auc': aucs})
+
+    out_path = os.path.join(PROCESSED_DIR, f"backtest_{model_type}_lags{n_lags}.csv")
+    steps.to_csv(out_path, index_label='step')
+    print(steps.to_string(float_format=lambda v: f"{v:.3f}"))
+    print(f"\n{len(steps)} walk-forward steps of {step} draws ({model_type}, n_lags={n_lags})")
+    print(f"Average accuracy across all numbers: {np.mean(accs):.3f}")
+    print(f"Average ROC-AUC across all numbers: {np.nanmean(aucs):.3f}")
+    print(f"Pooled out-of-sample ROC-AUC: {_pooled_auc(y_test, all_probas):.3f}")
+    print(f"Per-step results saved to {out_path}")
+    return steps, per_number
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Walk-forward backtest of the next-draw models.")
+    parser.add_argument('--model', choices=['sgd', 'logistic', 'rf'], default='sgd')
+    parser.add_argument('--lags', type=int, default=3)
+    parser.add_argument('--initial-train', type=int, default=200)
+    parser.add_argument('--step', type=int, default=10)
+    parser.add_argument('--workers', type=int, default=None)
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    profiling.enable_from_argv()
+    args = parse_args(sys.argv[1:])
+    walk_forward(args.model, args.lags, initial_train=args.initial_train, step=args.step, workers=args.workers)
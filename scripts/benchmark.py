@@ -0,0 +1,202 @@
+import os
+import sys
+import json
+import time
+import shutil
+import argparse
+import tempfile
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import get_context
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+BENCHMARK_DIR = os.path.join(os.path.dirname(SCRIPTS_DIR), "data", "benchmarks")
+BASELINE_FILENAME = "baseline.json"
+LATEST_FILENAME = "latest.json"
+
+RAW_FILENAME = "lottomax_raw.csv"
+CLEANED_FILENAME = "lottomax_cleaned.csv"
+SIZES = [10**3, 10**4, 10**5]
+# Draws generated per chunk (each chunk holds a (chunk, 50) float64 key array)
+GENERATOR_CHUNK = 100_000
+# Synthetic dates are twice weekly from FIRST_DAY, squeezed closer together for
+# long histories so they stay within the range of pandas nanosecond timestamps.
+# Up to MAX_SYNTHETIC_DRAWS draws every date is unique; longer histories (up
+# to 10^7 draws) put several draws on each day, still in non-decreasing order.
+FIRST_DAY = np.datetime64('1678-01-01')
+LAST_DAY = np.datetime64('2262-04-11')
+MAX_SYNTHETIC_DRAWS = int((LAST_DAY - FIRST_DAY).astype(np.int64)) + 1
+# A run slower than baseline * (1 + tolerance) counts as a regression
+DEFAULT_TOLERANCE = 0.25
+
+# Entry point name -> (module, function, kwargs, largest history it is run on)
+# Paths are relative to the benchmark working directory.
+ENTRY_POINTS = {
+    'clean_lottomax_data': ('process_data', 'clean_lottomax_data',
+                            {'input_path': f"data/raw/{RAW_FILENAME}",
+                             'output_path': f"data/processed/{CLEANED_FILENAME}"}, None),
+    'frequency_analysis': ('frequency_analysis', 'frequency_analysis',
+                           {'input_path': f"data/processed/{CLEANED_FILENAME}"}, None),
+    'pair_triplet_analysis': ('pair_triplet_analysis', 'pair_triplet_analysis',
+                              {'input_path': f"data/processed/{CLEANED_FILENAME}"}, None),
+    'prepare_ml_data': ('prepare_ml_data', 'prepare_ml_data', {}, None),
+    'chi_square_test': ('randomness_tests', 'chi_square_test',
+                        {'input_path': f"data/processed/{CLEANED_FILENAME}"}, None),
+    'runs_test': ('randomness_tests', 'runs_test',
+                  {'input_path': f"data/processed/{CLEANED_FILENAME}"}, None),
+    'serial_correlation_test': ('randomness_tests', 'serial_correlation_test',
+                                {'input_path': f"data/processed/{CLEANED_FILENAME}"}, None),
+    'entropy_test': ('randomness_tests', 'entropy_test',
+                     {'input_path': f"data/processed/{CLEANED_FILENAME}"}, None),
+    'run_all_tests': ('randomness_tests', 'run_all_tests',
+                      {'input_path': f"data/processed/{CLEANED_FILENAME}"}, None),
+    'ml_logistic': ('ml_predict_next_draw', 'main', {'n_jobs': 1}, 10**4),
+    'ml_lagged': ('ml_predict_next_draw_lagged', 'main', {'n_lags': 3, 'n_jobs': 1}, 10**4),
+    'ml_rf': ('ml_predict_next_draw_rf', 'main', {'n_lags': 3, 'n_estimators': 10, 'n_jobs': 1}, 10**4),
+}
+
+def synthetic_draws(n_draws, seed=0):
+    # 7 distinct numbers from 1..50 per draw: the 7 smallest of 50 random keys
+    rng = np.random.default_rng(seed)
+    keys = rng.random((n_draws, 50))
+    return np.argpartition(keys, 7, axis=1)[:, :7] + 1
+
+def synthetic_history(n_draws, seed=0, chunk=GENERATOR_CHUNK):
+    # Record chunks of a uniform 7-of-50 + bonus history: the 8 smallest of
+    # 50 random keys per draw, the 8th being the bonus; mains sorted ascending
+    from draw_store import make_records
+    rng = np.random.default_rng(seed)
+    step = min(3.5, (LAST_DAY - FIRST_DAY).astype(np.int64) / max(n_draws - 1, 1))
+    for start in range(0, n_draws, chunk):
+        n = min(chunk, n_draws - start)
+        picks = np.argpartition(rng.random((n, 50)), 7, axis=1)[:, :8] + 1
+        days = FIRST_DAY + np.floor((start + np.arange(n)) * step).astype(np.int64)
+        yield make_records(days, np.sort(picks[:, :7], axis=1), picks[:, 7])
+
+def write_synthetic_history(workdir, n_draws, seed=0):
+    # Raw and cleaned CSVs plus the binary store in the cleaned schema
+    from draw_store import write_csv_chunks, write_store_chunks, store_path_for
+    os.makedirs(os.path.join(workdir, "data", "raw"), exist_ok=True)
+    os.makedirs(os.path.join(workdir, "data", "processed"), exist_ok=True)
+    cleaned_path = os.path.join(workdir, "data", "processed", CLEANED_FILENAME)
+    write_csv_chunks(synthetic_history(n_draws, seed), cleaned_path)
+    write_store_chunks(synthetic_history(n_draws, seed), store_path_for(cleaned_path))
+    shutil.copyfile(cleaned_path, os.path.join(workdir, "data", "raw", RAW_FILENAME))
+
+def _peak_rss_mb():
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+def _run_entry(workdir, name):
+    # Worker: one entry point in a fresh process so memory figures are its own
+    import io
+    import warnings
+    import importlib
+    from contextlib import redirect_stdout
+    os.chdir(workdir)
+    sys.path.insert(0, SCRIPTS_DIR)
+    module_name, func_name, kwargs, _ = ENTRY_POINTS[name]
+    func = getattr(importlib.import_module(module_name), func_name)
+    # Libraries the entry points import lazily are loaded before timing starts
+    for library in ('pandas', 'scipy.stats', 'sklearn.linear_model', 'sklearn.ensemble', 'sklearn.multioutput'):
+        importlib.import_module(library)
+    rss_before = _peak_rss_mb()
+    with redirect_stdout(io.StringIO()), warnings.catch_warnings():
+        warnings.simplefilter("ignore")
+        start_wall, start_cpu = time.perf_counter(), time.process_time()
+        func(**kwargs)
+        wall, cpu = time.perf_counter() - start_wall, time.process_time() - start_cpu
+    return {'wall_s': wall, 'cpu_s': cpu, 'peak_rss_mb': _peak_rss_mb(), 'rss_before_mb': rss_before}
+
+def run_benchmarks(sizes=SIZES, entries=None, seed=0):
+    entries = entries or list(ENTRY_POINTS)
+    results = {}
+    context = get_context('spawn')
+    for n_draws in sizes:
+        workdir = tempfile.mkdtemp(prefix=f"lottomax_bench_{n_draws}_")
+        try:
+            start = time.perf_counter()
+            write_synthetic_history(workdir, n_draws, seed)
+            print(f"\n{n_draws} draws (generated in {time.perf_counter() - start:.2f}s)")
+            if any(ENTRY_POINTS[name][0].startswith('ml_') for name in entries) and 'prepare_ml_data' not in entries:
+                with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                    pool.submit(_run_entry, workdir, 'prepare_ml_data').result()
+            for name in entries:
+                max_draws = ENTRY_POINTS[name][3]
+                if max_draws is not None and n_draws > max_draws:
+                    print(f"  {name:<26} skipped (> {max_draws} draws)")
+                    continue
+                try:
+                    with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                        result = pool.submit(_run_entry, workdir, name).result()
+                except Exception as e:
+                    # e.g. MemoryError at 10^7 draws; record it and keep going
+                    results[f"{name}@{n_draws}"] = {'error': f"{type(e).__name__}: {e}"}
+                    print(f"  {name:<26} failed: {type(e).__name__}: {e}")
+                    continue
+                result['draws_per_s'] = n_draws / result['wall_s'] if result['wall_s'] > 0 else None
+                results[f"{name}@{n_draws}"] = result
+                print(f"  {name:<26} {result['wall_s']:>9.3f}s  {result['draws_per_s']:>12.0f} draws/s  "
+                      f"{result['peak_rss_mb']:>8.1f} MB peak")
+        finally:
+            shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+def compare_to_baseline(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    # (key, baseline wall, current wall, ratio) for every run slower than
+    # the baseline by more than the tolerance, or failing where it used to run
+    regressions = []
+    for key, result in results.items():
+        before = baseline.get(key, {}).get('wall_s')
+        if not before:
+            continue
+        if 'error' in result:
+            # Ran in the baseline, fails now
+            regressions.append((key, before, float('nan'), float('nan')))
+        elif result['wall_s'] / before > 1 + tolerance:
+            regressions.append((key, before, result['wall_s'], result['wall_s'] / before))
+    return regressions
+
+def _save(results, path):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    report = {'created': time.strftime('%Y-%m-%dT%H:%M:%S'), 'python': sys.version.split()[0],
+              'numpy': np.__version__, 'cpu_count': os.cpu_count(), 'results': results}
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+
+def _history_size(text):
+    n_draws = int(float(text))
+    if n_draws < 1:
+        raise argparse.ArgumentTypeError("must be at least 1")
+    return n_draws
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Benchmark the pipeline entry points on synthetic histories.")
+    parser.add_argument('--sizes', nargs='+', type=_history_size, default=SIZES,
+                        help="History lengths in draws, e.g. 1e3 1e5 1e7")
+    parser.add_argument('--entries', nargs='+', choices=list(ENTRY_POINTS), default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--save-baseline', action='store_true', help="Store this run as the new baseline")
+    parser.add_argument('--tolerance', type=float, default=DEFAULT_TOLERANCE)
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    args = parse_args(sys.argv[1:])
+    sys.path.insert(0, SCRIPTS_DIR)
+    results = run_benchmarks(args.sizes, args.entries, args.seed)
+    _save(results, os.path.join(BENCHMARK_DIR, LATEST_FILENAME))
+    baseline_path = os.path.join(BENCHMARK_DIR, BASELINE_FILENAME)
+    if args.save_baseline:
+        _save(results, baseline_path)
+        print(f"\nBaseline saved to {baseline_path}")
+    elif os.path.exists(baseline_path):
+        with open(baseline_path) as f:
+            regressions = compare_to_baseline(results, json.load(f)['results'], args.tolerance)
+        for key, before, after, ratio in regressions:
+            print(f"REGRESSION {key}: {before:.3f}s -> {after:.3f}s ({ratio:.2f}x)")
+        if regressions:
+            sys.exit(1)
+        print(f"\nNo regressions beyond {args.tolerance:.0%} against {baseline_path}")
+    else:
+        print(f"\nNo baseline at {baseline_path}; run with --save-baseline to create one")
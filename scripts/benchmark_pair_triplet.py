@@ -0,0 +1,75 @@
+import sys
+import time
+import argparse
+import pandas as pd
+from itertools import combinations
+from collections import Counter
+from cooccurrence import MAIN_COLS, pair_triplet_counts
+from benchmark import synthetic_draws
+
+SIZES = [10**3, 10**5, 10**6]
+# By default the iterrows + Counter path is timed on at most this many draws
+# and extrapolated linearly beyond it (it is O(draws), ~20s per 10^5 draws);
+# those rows are reported as estimates. --full-legacy times it at every size.
+LEGACY_MAX_DRAWS = 10**4
+
+def legacy_pair_triplet_counts(df):
+    # The original per-row implementation, kept here as the reference
+    pair_counter = Counter()
+    triplet_counter = Counter()
+    for _, row in df.iterrows():
+        numbers = [row[col] for col in MAIN_COLS]
+        for pair in combinations(sorted(numbers), 2):
+            pair_counter[pair] += 1
+        for triplet in combinations(sorted(numbers), 3):
+            triplet_counter[triplet] += 1
+    pair_df = pd.DataFrame(
+        [(a, b, count) for (a, b), count in pair_counter.items()],
+        columns=['num1', 'num2', 'count']
+    ).sort_values(['count', 'num1', 'num2'], ascending=[False, True, True])
+    triplet_df = pd.DataFrame(
+        [(a, b, c, count) for (a, b, c), count in triplet_counter.items()],
+        columns=['num1', 'num2', 'num3', 'count']
+    ).sort_values(['count', 'num1', 'num2', 'num3'], ascending=[False, True, True, True])
+    return pair_df, triplet_df
+
+def same_tables(a, b):
+    return all(x.reset_index(drop=True).equals(y.reset_index(drop=True)) for x, y in zip(a, b))
+
+def run_benchmark(sizes=SIZES, legacy_max_draws=LEGACY_MAX_DRAWS):
+    # legacy_max_draws=None times the legacy path on every full history
+    print(f"{'draws':>10} {'legacy (s)':>12} {'numpy (s)':>10} {'speedup':>9}  legacy timing")
+    rows = []
+    for n in sizes:
+        draws = synthetic_draws(n)
+        df = pd.DataFrame(draws, columns=MAIN_COLS)
+
+        start = time.perf_counter()
+        fast = pair_triplet_counts(draws)
+        numpy_time = time.perf_counter() - start
+
+        legacy_n = n if legacy_max_draws is None else min(n, legacy_max_draws)
+        start = time.perf_counter()
+        legacy = legacy_pair_triplet_counts(df.iloc[:legacy_n])
+        legacy_time = (time.perf_counter() - start) * n / legacy_n
+        measured = legacy_n == n
+        if measured and not same_tables(fast, legacy):
+            raise AssertionError(f"Vectorized tables differ from the legacy path at {n} draws")
+
+        source = "measured" if measured else f"estimate (timed on {legacy_n} draws)"
+        print(f"{n:>10} {legacy_time:>12.3f} {numpy_time:>10.3f} {legacy_time / numpy_time:>8.0f}x  {source}")
+        rows.append({'draws': n, 'legacy_s': legacy_time, 'numpy_s': numpy_time, 'legacy_measured': measured})
+    return rows
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Vectorized vs legacy pair/triplet counting.")
+    parser.add_argument('sizes', nargs='*', type=lambda text: int(float(text)), default=SIZES,
+                        help="History lengths in draws, e.g. 1e3 1e5 1e6")
+    parser.add_argument('--full-legacy', action='store_true',
+                        help=f"Time the legacy path at every size instead of estimating above {LEGACY_MAX_DRAWS} "
+                             "draws (about 20s per 10^5 draws)")
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    args = parse_args(sys.argv[1:])
+    run_benchmark(args.sizes, None if args.full_legacy else LEGACY_MAX_DRAWS)
@@ -0,0 +1,118 @@
+import os
+import sys
+import numpy as np
+import profiling
+from math import comb
+from itertools import combinations
+from dataset import get_dataset
+
+PROCESSED_DIR = "data/processed"
+CLEANED_FILENAME = "lottomax_cleaned.csv"
+COMBO_FILENAME = "combo_counts_k{k}.npz"
+
+MAX_NUMBER = 50
+NUMBERS_PER_DRAW = 7
+# BINOM[n, k] = C(n, k) for n <= 50, k <= 7; C(50, 7) ~ 99.9M fits int64
+BINOM = np.array([[comb(n, k) for k in range(NUMBERS_PER_DRAW + 1)] for n in range(MAX_NUMBER + 1)],
+                 dtype=np.int64)
+
+def subset_positions(k, size=NUMBERS_PER_DRAW):
+    return np.array(list(combinations(range(size), k)), dtype=np.int64).reshape(-1, k)
+
+def rank_subsets(subsets):
+    # Combinatorial number system rank of sorted k-subsets of 1..50:
+    # rank = sum_i C(c_i, i + 1) over the zero-based elements c_0 < ... < c_{k-1}
+    subsets = np.asarray(subsets, dtype=np.int64) - 1
+    k = subsets.shape[-1]
+    return BINOM[subsets, np.arange(1, k + 1)].sum(axis=-1)
+
+def unrank_subsets(ranks, k):
+    # Inverse of rank_subsets: (n, k) sorted subsets of 1..50
+    ranks = np.array(ranks, dtype=np.int64).ravel()
+    out = np.zeros((len(ranks), k), dtype=np.int64)
+    for i in range(k, 0, -1):
+        c = np.searchsorted(BINOM[:, i], ranks, side='right') - 1
+        out[:, i - 1] = c + 1
+        ranks = ranks - BINOM[c, i]
+    return out
+
+def draw_subset_ranks(draws, k):
+    # (draws, C(7, k)) ranks of every k-subset of each draw
+    draws = np.sort(np.asarray(draws, dtype=np.int64), axis=1)
+    return rank_subsets(draws[:, subset_positions(k, draws.shape[1])])
+
+def count_subsets(draws, k):
+    # Sparse counts of the k-subsets that occur: sorted unique ranks + counts
+    return np.unique(draw_subset_ranks(draws, k).ravel(), return_counts=True)
+
+def save_subset_counts(ranks, counts, k):
+    np.savez(os.path.join(PROCESSED_DIR, COMBO_FILENAME.format(k=k)), ranks=ranks, counts=counts)
+
+def load_subset_counts(k):
+    with np.load(os.path.join(PROCESSED_DIR, COMBO_FILENAME.format(k=k))) as data:
+        return data['ranks'], data['counts']
+
+def subset_frame(ranks, counts, k, top=None):
+    # Same ordering as the pair/triplet tables: count desc, then numbers asc
+    import pandas as pd
+    if top is not None and len(counts) > top:
+        # Only unrank the rows that can make the cut
+        threshold = np.partition(counts, len(counts) - top)[len(counts) - top]
+        keep = counts >= threshold
+        ranks, counts = ranks[keep], counts[keep]
+    subsets = unrank_subsets(ranks, k)
+    cols = [f"num{i + 1}" for i in range(k)]
+    frame = pd.DataFrame(subsets, columns=cols)
+    frame['count'] = counts
+    frame = frame.sort_values(['count'] + cols, ascending=[False] + [True] * k)
+    return frame if top is None else frame.head(top)
+
+class DrawHistory:
+    # O(log N) membership lookups of tickets and their 6-subsets against
+    # every drawn 7-set, via binary search over sorted subset ranks
+    def __init__(self, draws):
+        self.seven_ranks = np.unique(draw_subset_ranks(draws, 7).ravel())
+        self.six_ranks = np.unique(draw_subset_ranks(draws, 6).ravel())
+
+    @staticmethod
+    def _contains(sorted_ranks, ranks):
+        ranks = np.asarray(ranks)
+        if len(sorted_ranks) == 0:
+            return np.zeros(ranks.shape, dtype=bool)
+        pos = np.searchsorted(sorted_ranks, ranks)
+        pos = np.minimum(pos, len(sorted_ranks) - 1)
+        return sorted_ranks[pos] == ranks
+
+    def drawn(self, tickets):
+        # Boolean per ticket: has this exact 7-set ever been drawn?
+        return self._contains(self.seven_ranks, draw_subset_ranks(np.atleast_2d(tickets), 7)[:, 0])
+
+    def six_subset_drawn(self, tickets):
+        # Boolean per ticket: has any 6 of its numbers ever been drawn together?
+        return self._contains(self.six_ranks, draw_subset_ranks(np.atleast_2d(tickets), 6)).any(axis=1)
+
+@profiling.profiled()
+def combination_analysis(input_path, ks=(4, 5, 6, 7), top=10):
+    draws = get_dataset(input_path).mains
+    for k in ks:
+        ranks, counts = count_subsets(draws, k)
+        save_subset_counts(ranks, counts, k)
+        print(f"\n{k}-number combinations: {len(ranks)} distinct of {comb(MAX_NUMBER, k)} possible; "
+              f"{int((counts > 1).sum())} occurred more than once")
+        print(subset_frame(ranks, counts, k, top).to_string(index=False))
+    print(f"\nCombination counts saved to {PROCESSED_DIR}/")
+
+if __name__ == "__main__":
+    profiling.enable_from_argv()
+    input_path = os.path.join(PROCESSED_DIR, CLEANED_FILENAME)
+    if len(sys.argv) > 1:
+        # Check a ticket against the history, e.g. combinations_index.py 5,12,23,34,41,44,49
+        ticket = [int(n) for n in sys.argv[1].split(',')]
+        if len(ticket) != 7 or len(set(ticket)) != 7 or not all(1 <= n <= MAX_NUMBER for n in ticket):
+            print("You must provide exactly 7 distinct numbers between 1 and 50.")
+            sys.exit(1)
+        history = DrawHistory(get_dataset(input_path).mains)
+        print(f"Exact 7-set drawn before: {bool(history.drawn(ticket)[0])}")
+        print(f"Any 6-number subset drawn before: {bool(history.six_subset_drawn(ticket)[0])}")
+    else:
+        combination_analysis(input_path)
@@ -0,0 +1,56 @@
+import numpy as np
+from itertools import combinations
+
+MAIN_COLS = ['n1', 'n2', 'n3', 'n4', 'n5', 'n6', 'n7']
+MAX_NUMBER = 50
+
+# Column positions of every 2- and 3-subset of a 7-number draw
+PAIR_IDX = np.array(list(combinations(range(7), 2)))
+TRIPLET_IDX = np.array(list(combinations(range(7), 3)))
+# Draws encoded per triplet_tensor pass (35 int64 codes each)
+TRIPLET_CHUNK = 200_000
+
+def indicator_matrix(draws, max_number=MAX_NUMBER):
+    # Draw-by-number 0/1 matrix: rows = draws, columns = numbers 1..max_number
+    draws = np.asarray(draws)
+    ind = np.zeros((len(draws), max_number), dtype=np.uint8)
+    ind[np.arange(len(draws))[:, None], draws - 1] = 1  # -1 for zero-based index
+    return ind
+
+def pair_matrix(ind):
+    # Symmetric co-occurrence counts; the diagonal holds single-number counts.
+    # float64 matmul goes through BLAS and is exact for counts below 2**53.
+    m = ind.astype(np.float64)
+    return (m.T @ m).astype(np.int64)
+
+def triplet_tensor(draws, max_number=MAX_NUMBER):
+    # Dense (n, n, n) triplet counts indexed by the sorted triplet (a < b < c),
+    # built by encoding each of the C(7,3) triplets per draw as a flat index
+    # (chunked so the per-draw triplet codes stay bounded for long histories)
+    draws = np.asarray(draws)
+    counts = np.zeros(max_number ** 3, dtype=np.int64)
+    for start in range(0, len(draws), TRIPLET_CHUNK):
+        chunk = np.sort(draws[start:start + TRIPLET_CHUNK].astype(np.int64), axis=1) - 1
+        t = chunk[:, TRIPLET_IDX]
+        codes = (t[..., 0] * max_number + t[..., 1]) * max_number + t[..., 2]
+        counts += np.bincount(codes.ravel(), minlength=max_number ** 3)
+    return counts.reshape(max_number, max_number, max_number)
+
+def pair_frame(pairs):
+    import pandas as pd
+    a, b = np.nonzero(np.triu(pairs, k=1))
+    pair_df = pd.DataFrame({'num1': a + 1, 'num2': b + 1, 'count': pairs[a, b]})
+    return pair_df.sort_values(['count', 'num1', 'num2'], ascending=[False, True, True])
+
+def triplet_frame(triplets):
+    import pandas as pd
+    a, b, c = np.nonzero(triplets)
+    triplet_df = pd.DataFrame({'num1': a + 1, 'num2': b + 1, 'num3': c + 1, 'count': triplets[a, b, c]})
+    return triplet_df.sort_values(['count', 'num1', 'num2', 'num3'], ascending=[False, True, True, True])
+
+def pair_triplet_counts(draws):
+    # Returns the (pair_df, triplet_df) tables written by pair_triplet_analysis
+    draws = np.asarray(draws)
+    pairs = pair_matrix(indicator_matrix(draws))
+    triplets = triplet_tensor(draws)
+    return pair_frame(pairs), triplet_frame(triplets)
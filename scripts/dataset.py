@@ -0,0 +1,78 @@
+import os
+import numpy as np
+from functools import cached_property
+from draw_store import load_draws, mains, bonus, draw_dates, indicator, to_frame
+
+# Parsed draw histories for this process, keyed by absolute path
+_CACHE = {}
+
+def _file_key(path):
+    st = os.stat(path)
+    return (st.st_mtime_ns, st.st_size)
+
+class DrawDataset:
+    # One parsed draw history plus derived views, each computed on first use
+    def __init__(self, path, records):
+        self.path = path
+        self.records = records
+
+    @property
+    def n_draws(self):
+        return len(self.records)
+
+    @cached_property
+    def mains(self):
+        return mains(self.records).astype(np.int64)
+
+    @cached_property
+    def bonus(self):
+        return bonus(self.records).astype(np.int64)
+
+    @cached_property
+    def dates(self):
+        return draw_dates(self.records)
+
+    @cached_property
+    def flat_mains(self):
+        # n1..n7 of every draw in draw order
+        return self.mains.ravel()
+
+    @cached_property
+    def main_series(self):
+        import pandas as pd
+        return pd.Series(self.flat_mains)
+
+    @cached_property
+    def indicator(self):
+        return indicator(self.records)
+
+    @cached_property
+    def high_low(self):
+        # True for high (26-50), False for low (1-25), along flat_mains
+        return self.flat_mains > 25
+
+    @cached_property
+    def frame(self):
+        return to_frame(self.records)
+
+    @cached_property
+    def pair_triplet_tables(self):
+        from cooccurrence import pair_triplet_counts
+        return pair_triplet_counts(self.mains)
+
+def get_dataset(path):
+    # Cached per process; a rewrite of the file (new mtime/size) invalidates it
+    path = os.path.abspath(path)
+    key = _file_key(path)
+    cached = _CACHE.get(path)
+    if cached is not None and cached[0] == key:
+        return cached[1]
+    dataset = DrawDataset(path, load_draws(path))
+    _CACHE[path] = (key, dataset)
+    return dataset
+
+def invalidate(path=None):
+    if path is None:
+        _CACHE.clear()
+    else:
+        _CACHE.pop(os.path.abspath(path), None)
@@ -0,0 +1,162 @@
+import os
+import numpy as np
+from contextlib import contextmanager
+try:
+    import fcntl
+except ImportError:  # Windows: writers are not serialized
+    fcntl = None
+from cooccurrence import MAIN_COLS, MAX_NUMBER
+
+# Fixed-width 20-byte draw record:
+#   day     - draw date as days since 1970-01-01
+#   numbers - the 7 main numbers followed by the bonus (NO_BONUS if missing)
+#   mask    - bit (n - 1) set for every main number n
+RECORD_DTYPE = np.dtype([('day', '<i4'), ('numbers', 'u1', (8,)), ('mask', '<u8')])
+NO_BONUS = 255
+
+def store_path_for(csv_path):
+    # lottomax_cleaned.csv -> lottomax_cleaned.bin in the same directory
+    return os.path.splitext(csv_path)[0] + ".bin"
+
+def presence_masks(numbers):
+    # uint64 per row with bit (n - 1) set for every number n in the row
+    numbers = np.asarray(numbers, dtype=np.int64)
+    bits = np.left_shift(np.uint64(1), (numbers - 1).astype(np.uint64))
+    return np.bitwise_or.reduce(bits, axis=-1)
+
+def make_records(dates, mains, bonus=None):
+    mains = np.asarray(mains, dtype=np.int64).reshape(-1, 7)
+    records = np.zeros(len(mains), dtype=RECORD_DTYPE)
+    records['day'] = np.asarray(dates, dtype='datetime64[D]').astype(np.int64)
+    records['numbers'][:, :7] = mains
+    records['numbers'][:, 7] = NO_BONUS
+    if bonus is not None:
+        bonus = np.asarray(bonus, dtype=float)
+        records['numbers'][:, 7] = np.where(np.isnan(bonus), NO_BONUS, bonus).astype(np.uint8)
+    records['mask'] = presence_masks(mains)
+    return records
+
+def records_from_frame(df):
+    bonus = df['bonus'] if 'bonus' in df.columns else None
+    return make_records(df['draw_date'].to_numpy(dtype='datetime64[D]'), df[MAIN_COLS].to_numpy(), bonus)
+
+def write_store(records, path):
+    # Whole-file write through a temp file so readers never see a partial store
+    write_store_chunks([records], path)
+
+def write_store_chunks(chunks, path):
+    # write_store for an iterable of record arrays, one chunk in memory at a
+    # time; the temp name is per process since concurrent loads may rebuild it
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        for records in chunks:
+            f.write(np.ascontiguousarray(records, dtype=RECORD_DTYPE).tobytes())
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+def append_records(records, path):
+    # A single O_APPEND write of whole records; a torn tail left by a crash is
+    # ignored by open_store since it only maps complete records
+    data = np.ascontiguousarray(records, dtype=RECORD_DTYPE).tobytes()
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, data)
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def csv_lines(records):
+    # lottomax_cleaned.csv rows for records, without going through pandas
+    days = draw_dates(records).astype(str)
+    numbers = records['numbers'].tolist()
+    return [f"{day},{','.join(map(str, nums[:7]))},{'' if nums[7] == NO_BONUS else nums[7]}\n"
+            for day, nums in zip(days, numbers)]
+
+def append_csv(records, path):
+    # New rows at the end of the cleaned CSV in one O_APPEND write
+    needs_newline = False
+    if os.path.getsize(path) > 0:
+        with open(path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            needs_newline = f.read(1) != b'\n'
+    data = ('\n' if needs_newline else '') + ''.join(csv_lines(records))
+    fd = os.open(path, os.O_WRONLY | os.O_APPEND)
+    try:
+        os.write(fd, data.encode())
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def write_csv_chunks(chunks, path):
+    # Whole cleaned CSV through a temp file, one chunk of records at a time
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w", newline="") as f:
+        f.write(','.join(['draw_date'] + MAIN_COLS + ['bonus']) + '\n')
+        for records in chunks:
+            f.writelines(csv_lines(records))
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+@contextmanager
+def file_lock(path):
+    # Exclusive advisory lock on <path>.lock serializing writers of path
+    if fcntl is None:
+        yield
+        return
+    with open(path + ".lock", "w") as lock_file:
+        fcntl.flock(lock_file, fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def open_store(path):
+    # Zero-copy, read-only view of the store
+    n_records = os.path.getsize(path) // RECORD_DTYPE.itemsize
+    if n_records == 0:
+        return np.zeros(0, dtype=RECORD_DTYPE)
+    return np.memmap(path, dtype=RECORD_DTYPE, mode='r', shape=(n_records,))
+
+def close_store(records):
+    # Unmap a store from open_store right away rather than at garbage
+    # collection; no view into it may be used afterwards
+    mapped = getattr(records, '_mmap', None)
+    if mapped is not None:
+        mapped.close()
+
+def load_draws(csv_path):
+    # Memory-map the binary store next to csv_path, (re)building it from the
+    # CSV first if it is missing or older than the CSV
+    path = store_path_for(csv_path)
+    if not os.path.exists(path) or os.stat(path).st_mtime_ns < os.stat(csv_path).st_mtime_ns:
+        import pandas as pd
+        write_store(records_from_frame(pd.read_csv(csv_path)), path)
+    return open_store(path)
+
+def mains(records):
+    return records['numbers'][:, :7]
+
+def bonus(records):
+    return records['numbers'][:, 7]
+
+def draw_dates(records):
+    return records['day'].astype('datetime64[D]')
+
+def indicator(records):
+    # (draws, 50) uint8 0/1 matrix unpacked from the presence masks
+    shifts = np.arange(MAX_NUMBER, dtype=np.uint64)
+    return ((records['mask'][:, None] >> shifts) & np.uint64(1)).astype(np.uint8)
+
+def to_frame(records):
+    # Back to the lottomax_cleaned.csv schema for CSV export
+    import pandas as pd
+    df = pd.DataFrame(mains(records).astype(np.int64), columns=MAIN_COLS)
+    df.insert(0, 'draw_date', draw_dates(records).astype(str))
+    b = bonus(records).astype(np.int64)
+    if (b == NO_BONUS).any():
+        df['bonus'] = np.where(b == NO_BONUS, np.nan, b)
+    else:
+        df['bonus'] = b
+    return df
@@ -1,11 +1,15 @@
 import os
 import pandas as pd
+import profiling
+from dataset import get_dataset
+from artifact_stamps import MAIN_FREQ_FILENAME, BONUS_FREQ_FILENAME, stamp_artifacts
 
 PROCESSED_DIR = "data/processed"
 CLEANED_FILENAME = "lottomax_cleaned.csv"
 
+@profiling.profiled()
 def frequency_analysis(input_path):
-    df = pd.read_csv(input_path)
+    df = get_dataset(input_path).frame
     
     # Main numbers columns
     main_cols = ['n1', 'n2', 'n3', 'n4', 'n5', 'n6', 'n7']
@@ -41,10 +45,12 @@ def frequency_analysis(input_path):
     print(all_freq)
     
     # save to CSV
-    main_freq.to_csv(os.path.join(PROCESSED_DIR, "main_number_frequencies.csv"), header=["count"])
-    bonus_freq.to_csv(os.path.join(PROCESSED_DIR, "bonus_number_frequencies.csv"), header=["count"])
+    main_freq.to_csv(os.path.join(PROCESSED_DIR, MAIN_FREQ_FILENAME), header=["count"])
+    bonus_freq.to_csv(os.path.join(PROCESSED_DIR, BONUS_FREQ_FILENAME), header=["count"])
+    stamp_artifacts([MAIN_FREQ_FILENAME, BONUS_FREQ_FILENAME], df['draw_date'].max())
     print("\nFrequency tables saved to data/processed/")
 
 if __name__ == "__main__":
+    profiling.enable_from_argv()
     input_path = os.path.join(PROCESSED_DIR, CLEANED_FILENAME)
     frequency_analysis(input_path)
\ No newline at end of file
@@ -0,0 +1,146 @@
+import os
+import sys
+import numpy as np
+import profiling
+from dataset import get_dataset
+from artifact_stamps import stamp_artifacts
+
+PROCESSED_DIR = "data/processed"
+CLEANED_FILENAME = "lottomax_cleaned.csv"
+GAP_STATE_FILENAME = "gap_state.npz"
+GAP_SUMMARY_FILENAME = "number_gaps.csv"
+
+MAX_NUMBER = 50
+# Chance that a given number is drawn in one draw: 7 mains of 50, and the
+# bonus is one of the remaining 43 (43/50 * 1/43)
+HIT_PROBABILITY = {'main': 7 / MAX_NUMBER, 'bonus': 1 / MAX_NUMBER}
+
+def _bonus_indicator(bonus):
+    ind = np.zeros((len(bonus), MAX_NUMBER), dtype=np.uint8)
+    valid = (bonus >= 1) & (bonus <= MAX_NUMBER)
+    ind[np.nonzero(valid)[0], bonus[valid] - 1] = 1
+    return ind
+
+def gap_arrays(ind):
+    # Inter-arrival gaps (in draws) of every number, from a (draws, 50)
+    # indicator matrix: returns (number, gap) pairs plus each number's last
+    # appearance (-1 if never drawn). Column j of ind is number j + 1.
+    number, position = np.nonzero(np.asarray(ind).T)
+    number = number + 1
+    same = np.zeros(len(number), dtype=bool)
+    same[1:] = number[1:] == number[:-1]
+    gaps = np.diff(position, prepend=0)[same]
+    is_last = np.ones(len(number), dtype=bool)
+    is_last[:-1] = ~same[1:]
+    last_seen = np.full(MAX_NUMBER + 1, -1, dtype=np.int64)
+    last_seen[number[is_last]] = position[is_last]
+    return number[same], gaps, last_seen
+
+def _kind_state(ind):
+    gap_number, gaps, last_seen = gap_arrays(ind)
+    max_gap = np.zeros(MAX_NUMBER + 1, dtype=np.int64)
+    np.maximum.at(max_gap, gap_number, gaps)
+    width = int(gaps.max()) + 1 if len(gaps) else 1
+    hist = np.bincount(gap_number * width + gaps, minlength=(MAX_NUMBER + 1) * width)
+    return last_seen, max_gap, hist.reshape(MAX_NUMBER + 1, width)
+
+def build_gap_state(dataset):
+    state = {'n_draws': np.int64(dataset.n_draws),
+             'last_draw_date': str(dataset.dates.max()) if dataset.n_draws else ''}
+    for kind, ind in (('main', dataset.indicator), ('bonus', _bonus_indicator(dataset.bonus))):
+        state[f'{kind}_last_seen'], state[f'{kind}_max_gap'], state[f'{kind}_gap_hist'] = _kind_state(ind)
+    return state
+
+def apply_draw(state, draw_date, numbers, bonus):
+    # O(1) per drawn number: close the gap since its last appearance
+    n = int(state['n_draws'])
+    drawn = {'main': np.asarray(numbers, dtype=np.int64),
+             'bonus': np.asarray([bonus] if bonus is not None and 1 <= bonus <= MAX_NUMBER else [], dtype=np.int64)}
+    for kind, nums in drawn.items():
+        last_seen = state[f'{kind}_last_seen']
+        seen = nums[last_seen[nums] >= 0]
+        gaps = n - last_seen[seen]
+        if len(gaps) and gaps.max() >= state[f'{kind}_gap_hist'].shape[1]:
+            hist = state[f'{kind}_gap_hist']
+            state[f'{kind}_gap_hist'] = np.pad(hist, ((0, 0), (0, gaps.max() + 1 - hist.shape[1])))
+        state[f'{kind}_gap_hist'][seen, gaps] += 1
+        state[f'{kind}_max_gap'][seen] = np.maximum(state[f'{kind}_max_gap'][seen], gaps)
+        last_seen[nums] = n
+    state['n_draws'] = np.int64(n + 1)
+    state['last_draw_date'] = str(draw_date)[:10]
+
+def load_gap_state():
+    path = os.path.join(PROCESSED_DIR, GAP_STATE_FILENAME)
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as data:
+        state = {name: data[name] for name in data.files}
+    state['last_draw_date'] = str(state['last_draw_date'])
+    return state
+
+def save_gap_state(state):
+    path = os.path.join(PROCESSED_DIR, GAP_STATE_FILENAME)
+    tmp_path = path + ".tmp.npz"
+    np.savez(tmp_path, **state)
+    os.replace(tmp_path, path)
+
+def gap_summary(state, kind='main'):
+    # Current/max/mean gap per number against the geometric distribution
+    # expected if draws are independent. p_overdue is P(a gap at least as
+    # long as the current one) = (1 - p)^current_gap.
+    import pandas as pd
+    p = HIT_PROBABILITY[kind]
+    n = int(state['n_draws'])
+    numbers = np.arange(1, MAX_NUMBER + 1)
+    last_seen = state[f'{kind}_last_seen'][1:]
+    hist = state[f'{kind}_gap_hist'][1:]
+    gap_values = np.arange(hist.shape[1])
+    n_gaps = hist.sum(axis=1)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        mean_gap = np.where(n_gaps > 0, (hist * gap_values).sum(axis=1) / n_gaps, np.nan)
+    current_gap = np.where(last_seen >= 0, n - 1 - last_seen, n)
+    summary = pd.DataFrame({
+        'number': numbers,
+        'appearances': n_gaps + (last_seen >= 0),
+        'current_gap': current_gap,
+        'max_gap': state[f'{kind}_max_gap'][1:],
+        'mean_gap': mean_gap,
+        'expected_mean_gap': 1 / p,
+        'p_overdue': (1 - p) ** current_gap,
+    })
+    return summary.sort_values(['current_gap', 'number'], ascending=[False, True]).set_index('number')
+
+def gap_distribution(state, kind='main'):
+    # Pooled gap histogram vs. geometric expectation P(gap = g) = p (1 - p)^(g - 1)
+    import pandas as pd
+    p = HIT_PROBABILITY[kind]
+    observed = state[f'{kind}_gap_hist'][1:].sum(axis=0)
+    gaps = np.arange(1, len(observed))
+    expected = observed.sum() * p * (1 - p) ** (gaps - 1)
+    return pd.DataFrame({'gap': gaps, 'observed': observed[1:], 'expected': expected}).set_index('gap')
+
+@profiling.profiled()
+def gap_analysis(input_path):
+    state = build_gap_state(get_dataset(input_path))
+    save_gap_state(state)
+    stamp_artifacts([GAP_STATE_FILENAME], state['last_draw_date'])
+    main_summary = gap_summary(state, 'main')
+    main_summary.to_csv(os.path.join(PROCESSED_DIR, GAP_SUMMARY_FILENAME))
+    print("Most overdue main numbers:")
+    print(main_summary.head(10).to_string(float_format=lambda v: f"{v:.3f}"))
+    print("\nMost overdue bonus numbers:")
+    print(gap_summary(state, 'bonus').head(10).to_string(float_format=lambda v: f"{v:.3f}"))
+    print("\nMain-number gap distribution vs. geometric expectation (first 15 gaps):")
+    print(gap_distribution(state, 'main').head(15).to_string(float_format=lambda v: f"{v:.1f}"))
+    print(f"\nGap summary saved to {os.path.join(PROCESSED_DIR, GAP_SUMMARY_FILENAME)}")
+    return state
+
+if __name__ == "__main__":
+    profiling.enable_from_argv()
+    input_path = os.path.join(PROCESSED_DIR, CLEANED_FILENAME)
+    if len(sys.argv) > 1 and sys.argv[1] == "--overdue":
+        # Live view from the persisted state; no history scan
+        state = load_gap_state() or build_gap_state(get_dataset(input_path))
+        print(gap_summary(state).head(10).to_string(float_format=lambda v: f"{v:.3f}"))
+    else:
+        gap_analysis(input_path)
@@ -0,0 +1,134 @@
+import os
+import numpy as np
+import profiling
+from cooccurrence import (MAIN_COLS, MAX_NUMBER, PAIR_IDX, TRIPLET_IDX, indicator_matrix,
+                          pair_matrix, triplet_tensor, pair_frame, triplet_frame)
+from dataset import get_dataset
+import gap_analysis
+from number_index import INDEX_FILENAME, NumberIndex
+from artifact_stamps import (PROCESSED_DIR, MAIN_FREQ_FILENAME, BONUS_FREQ_FILENAME, PAIR_FILENAME,
+                             TRIPLET_FILENAME, ML_FILENAME, DERIVED_ARTIFACTS, read_stamps, stamp_artifacts)
+
+CLEANED_FILENAME = "lottomax_cleaned.csv"
+STATE_FILENAME = "analytics_state.npz"
+
+# Running totals behind every derived artifact. Its size depends only on the
+# number range, so applying one draw costs O(C(7,3)) no matter how many draws
+# the history holds.
+def build_state(df):
+    draws = df[MAIN_COLS].to_numpy(dtype=np.int64)
+    bonus = df['bonus'].dropna().to_numpy(dtype=np.int64)
+    return {
+        'main_counts': np.bincount(draws.ravel(), minlength=MAX_NUMBER + 1),
+        'bonus_counts': np.bincount(bonus, minlength=MAX_NUMBER + 1),
+        'pairs': pair_matrix(indicator_matrix(draws)),
+        'triplets': triplet_tensor(draws),
+        'last_draw_date': str(df['draw_date'].max())[:10],
+    }
+
+def load_state():
+    path = os.path.join(PROCESSED_DIR, STATE_FILENAME)
+    if not os.path.exists(path):
+        return None
+    with np.load(path) as data:
+        state = {name: data[name] for name in data.files}
+    state['last_draw_date'] = str(state['last_draw_date'])
+    return state
+
+def save_state(state):
+    path = os.path.join(PROCESSED_DIR, STATE_FILENAME)
+    tmp_path = path + ".tmp.npz"
+    np.savez(tmp_path, **state)
+    os.replace(tmp_path, path)
+
+def apply_draw(state, draw_date, numbers, bonus):
+    numbers = np.sort(np.asarray(numbers, dtype=np.int64))
+    state['main_counts'][numbers] += 1
+    if bonus is not None:
+        state['bonus_counts'][bonus] += 1
+    zero_based = numbers - 1
+    a, b = zero_based[PAIR_IDX].T
+    state['pairs'][a, b] += 1
+    state['pairs'][b, a] += 1
+    state['pairs'][zero_based, zero_based] += 1
+    a, b, c = zero_based[TRIPLET_IDX].T
+    state['triplets'][a, b, c] += 1
+    state['last_draw_date'] = str(draw_date)[:10]
+
+def _frequency_table(counts):
+    # Same layout as frequency_analysis: seen numbers, count desc then number asc
+    import pandas as pd
+    numbers = np.nonzero(counts)[0]
+    freq = pd.DataFrame({'number': numbers, 'count': counts[numbers]})
+    return freq.sort_values(['count', 'number'], ascending=[False, True]).set_index('number')
+
+def export_state(state):
+    _frequency_table(state['main_counts']).to_csv(os.path.join(PROCESSED_DIR, MAIN_FREQ_FILENAME), header=["count"])
+    _frequency_table(state['bonus_counts']).to_csv(os.path.join(PROCESSED_DIR, BONUS_FREQ_FILENAME), header=["count"])
+    pair_df = pair_frame(state['pairs'])
+    triplet_df = triplet_frame(state['triplets'])
+    pair_df.to_csv(os.path.join(PROCESSED_DIR, PAIR_FILENAME), index=False)
+    triplet_df.to_csv(os.path.join(PROCESSED_DIR, TRIPLET_FILENAME), index=False)
+    NumberIndex.build(pair_df, triplet_df).save(os.path.join(PROCESSED_DIR, INDEX_FILENAME))
+
+def append_ml_row(draw_date, numbers, bonus):
+    # One new line at the end of the ML-ready CSV and one 7-byte row at the
+    # end of the packed matrix instead of full rewrites
+    from prepare_ml_data import append_packed_rows
+    row = indicator_matrix([numbers])[0]
+    append_packed_rows(row[None])
+    fields = [str(x) for x in row] + [str(draw_date)[:10], '' if bonus is None else str(bonus)]
+    path = os.path.join(PROCESSED_DIR, ML_FILENAME)
+    with open(path, 'rb+') as f:
+        f.seek(-1, os.SEEK_END)
+        needs_newline = f.read(1) != b'\n'
+    with open(path, 'a') as f:
+        f.write(('\n' if needs_newline else '') + ','.join(fields) + '\n')
+
+@profiling.profiled()
+def rebuild_artifacts():
+    # Full recompute from lottomax_cleaned.csv; also seeds the running state
+    from prepare_ml_data import prepare_ml_data
+    dataset = get_dataset(os.path.join(PROCESSED_DIR, CLEANED_FILENAME))
+    state = build_state(dataset.frame)
+    export_state(state)
+    prepare_ml_data()
+    gap_analysis.save_gap_state(gap_analysis.build_gap_state(dataset))
+    save_state(state)
+    stamp_artifacts(DERIVED_ARTIFACTS, state['last_draw_date'])
+    print(f"Rebuilt processed artifacts through {state['last_draw_date']}.")
+
+@profiling.profiled()
+def update_artifacts(draw_date, numbers, bonus):
+    # Apply a newly appended draw as a delta when every artifact is known to
+    # cover exactly the draws before it; otherwise fall back to a rebuild
+    draw_date = str(draw_date)[:10]
+    state = load_state()
+    gap_state = gap_analysis.load_gap_state()
+    stamps = read_stamps()
+    # A missing state file (fresh checkout, deleted by hand) means not in
+    # sync, whatever the stamps say
+    in_sync = (state is not None and gap_state is not None
+               and gap_state['last_draw_date'] == state['last_draw_date']
+               and all(stamps.get(name) == state['last_draw_date'] for name in DERIVED_ARTIFACTS))
+    if in_sync:
+        # The state must end at the draw just before this one in the history
+        # (appends made with update=False leave it further behind)
+        days = get_dataset(os.path.join(PROCESSED_DIR, CLEANED_FILENAME)).records['day']
+        before = np.searchsorted(days, np.datetime64(draw_date, 'D').astype(np.int64))
+        in_sync = before > 0 and str(days[before - 1].astype('datetime64[D]')) == state['last_draw_date']
+    if not in_sync or draw_date <= state['last_draw_date']:
+        rebuild_artifacts()
+        return
+    apply_draw(state, draw_date, numbers, bonus)
+    export_state(state)
+    append_ml_row(draw_date, numbers, bonus)
+    gap_analysis.apply_draw(gap_state, draw_date, numbers, bonus)
+    gap_analysis.save_gap_state(gap_state)
+    save_state(state)
+    stamp_artifacts(DERIVED_ARTIFACTS, draw_date)
+    print(f"Updated processed artifacts incrementally through {draw_date}.")
+
+if __name__ == "__main__":
+    profiling.enable_from_argv()
+    rebuild_artifacts()
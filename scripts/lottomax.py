@@ -0,0 +1,96 @@
+import os
+import sys
+import runpy
+import argparse
+
+# Single entry point for the scripts. Nothing heavy is imported here: each
+# subcommand loads its module (and with it pandas/scipy/sklearn) only when
+# it runs, and show-last/append need nothing beyond NumPy.
+PROCESSED_DIR = "data/processed"
+CLEANED_FILENAME = "lottomax_cleaned.csv"
+
+# Subcommand -> (script module run as __main__, description)
+SCRIPT_COMMANDS = {
+    'pipeline': ('pipeline', "Run the processing pipeline, skipping up-to-date stages"),
+    'clean': ('process_data', "Clean the raw workbook into lottomax_cleaned.csv"),
+    'frequency': ('frequency_analysis', "Main/bonus number frequency tables"),
+    'pairs': ('pair_triplet_analysis', "Pair/triplet tables and interactive lookup"),
+    'ml-prep': ('prepare_ml_data', "Build the ML-ready one-hot matrix"),
+    'update': ('incremental_update', "Rebuild every derived artifact"),
+    'randomness': ('randomness_tests', "Randomness tests (--all for the batch report)"),
+    'rolling': ('rolling_randomness', "Rolling/expanding-window randomness statistics"),
+    'monte-carlo': ('monte_carlo', "Monte Carlo p-values for the randomness statistics"),
+    'gaps': ('gap_analysis', "Gap/overdue statistics (--overdue for the live view)"),
+    'odds': ('probability_tables', "Exact match odds and pair/triplet significance, or look one up"),
+    'combos': ('combinations_index', "4- to 7-number combination counts, or check a ticket"),
+    'score': ('ticket_scoring', "Score tickets against every historical draw"),
+    'predict': ('ml_predict_next_draw', "Logistic model on the previous draw"),
+    'predict-lagged': ('ml_predict_next_draw_lagged', "Logistic model on lagged draws"),
+    'predict-rf': ('ml_predict_next_draw_rf', "Random forest on lagged draws"),
+    'next': ('next_draw', "Train a persisted model, or serve next-draw probabilities from it"),
+    'sweep': ('sweep', "Hyperparameter/lag sweep"),
+    'backtest': ('backtest', "Walk-forward backtest"),
+    'benchmark': ('benchmark', "Benchmark suite on synthetic histories"),
+}
+
+def show_last(argv):
+    from draw_store import load_draws
+    from add_new_draw import show_last_draw
+    show_last_draw(load_draws(os.path.join(PROCESSED_DIR, CLEANED_FILENAME)))
+
+def append(argv):
+    from add_new_draw import parse_draw, read_draws, add_draws
+    parser = argparse.ArgumentParser(prog="lottomax.py append",
+                                     description="Append draws, e.g. append 2025-06-20 5,12,23,34,41,44,49 7")
+    parser.add_argument('draw', nargs='*', help="DATE NUMBERS BONUS")
+    parser.add_argument('--file', default=None, help="CSV of draws (date,n1..n7,bonus); '-' reads stdin")
+    parser.add_argument('--skip-artifacts', action='store_true',
+                        help="Only append to the history; derived artifacts are rebuilt on the next update")
+    args = parser.parse_args(argv)
+    try:
+        if args.file == '-':
+            draws = read_draws(sys.stdin)
+        elif args.file:
+            with open(args.file) as f:
+                draws = read_draws(f)
+        elif len(args.draw) == 3:
+            draws = [parse_draw(args.draw[0], args.draw[1].split(','), args.draw[2])]
+        else:
+            parser.error("give DATE NUMBERS BONUS or --file")
+    except ValueError as e:
+        print(e)
+        sys.exit(1)
+    if not add_draws(draws, update=not args.skip_artifacts):
+        sys.exit(1)
+
+BUILTIN_COMMANDS = {
+    'show-last': (show_last, "Show the most recent draw"),
+    'append': (append, "Append one draw or a file of draws"),
+}
+
+def usage():
+    lines = ["usage: lottomax.py <command> [args...] [--profile]", "", "commands:"]
+    for name, (_, description) in {**BUILTIN_COMMANDS, **SCRIPT_COMMANDS}.items():
+        lines.append(f"  {name:<16} {description}")
+    return "\n".join(lines)
+
+def main(argv):
+    if not argv or argv[0] in ('-h', '--help'):
+        print(usage())
+        return
+    command, rest = argv[0], argv[1:]
+    if command in BUILTIN_COMMANDS:
+        import profiling
+        profiling.enable_from_argv(rest)
+        BUILTIN_COMMANDS[command][0](rest)
+    elif command in SCRIPT_COMMANDS:
+        # Run the script exactly as if invoked directly, with its own arguments
+        module = SCRIPT_COMMANDS[command][0]
+        sys.argv = [module + ".py"] + rest
+        runpy.run_module(module, run_name="__main__", alter_sys=True)
+    else:
+        print(f"Unknown command: {command}\n\n{usage()}")
+        sys.exit(2)
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
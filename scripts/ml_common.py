@@ -0,0 +1,139 @@
+import os
+import hashlib
+import numpy as np
+import profiling
+from numpy.lib.stride_tricks import sliding_window_view
+
+def make_lagged_features(ml_matrix, n_lags=3):
+    # Row t of X holds the n_lags draws before draw t + n_lags, flattened
+    # oldest first (lag n_lags ... lag 1); y is the draw itself. Both are
+    # read-only views over ml_matrix: no per-lag copies and no float upcast.
+    ml_matrix = np.ascontiguousarray(ml_matrix)
+    n_draws, n_numbers = ml_matrix.shape
+    history = ml_matrix[:-1].reshape(-1)
+    X = sliding_window_view(history, n_lags * n_numbers)[::n_numbers]
+    y = ml_matrix[n_lags:].view()
+    y.flags.writeable = False
+    return X, y
+
+def as_model_input(X, dtype=np.float32):
+    # Materialize a feature view for fitting; float32 halves the copy that
+    # sklearn would otherwise make in float64 (tree models use float32 natively)
+    return np.asarray(X, dtype=dtype)
+
+def fit_per_number(make_model, X_train, y_train, X_test):
+    # One independent model per number, fitted sequentially
+    preds = np.zeros((len(X_test), y_train.shape[1]), dtype=np.uint8)
+    probas = np.zeros((len(X_test), y_train.shape[1]))
+    for i in range(y_train.shape[1]):
+        model = make_model()
+        with profiling.stage('fit_per_number.fit', tag=f"num_{i + 1}"):
+            model.fit(X_train, y_train[:, i])
+        preds[:, i] = model.predict(X_test)
+        probas[:, i] = model.predict_proba(X_test)[:, 1]
+    return preds, probas
+
+def predict_per_number(model, X_test):
+    # Per-number predictions and P(number drawn) from a fitted multi-output
+    # model (native multi-output estimators or MultiOutputClassifier)
+    preds = np.asarray(model.predict(X_test), dtype=np.uint8)
+    probas = np.zeros(preds.shape)
+    for i, (est_proba, classes) in enumerate(zip(model.predict_proba(X_test), _output_classes(model))):
+        if 1 in classes:
+            probas[:, i] = est_proba[:, list(classes).index(1)]
+    return preds, probas
+
+def _output_classes(model):
+    if hasattr(model, 'classes_'):
+        return model.classes_
+    return [est.classes_ for est in model.estimators_]  # MultiOutputClassifier after partial_fit
+
+def score_per_number(y_test, preds, probas):
+    from sklearn.metrics import accuracy_score, roc_auc_score
+    accs = []
+    aucs = []
+    for i in range(y_test.shape[1]):
+        accs.append(accuracy_score(y_test[:, i], preds[:, i]))
+        try:
+            aucs.append(roc_auc_score(y_test[:, i], probas[:, i]))
+        except ValueError:
+            aucs.append(np.nan)  # If only one class in y_test
+    return accs, aucs
+
+def report_per_number(num_cols, y_test, preds, probas):
+    accs, aucs = score_per_number(y_test, preds, probas)
+    for col, acc, auc in zip(num_cols, accs, aucs):
+        print(f"{col}: Accuracy={acc:.3f}, ROC-AUC={auc if not np.isnan(auc) else 'N/A'}")
+    
+    print(f"\nAverage accuracy across all numbers: {np.mean(accs):.3f}")
+    print(f"Average ROC-AUC across all numbers: {np.nanmean(aucs):.3f}")
+    return accs, aucs
+
+def make_model(model_type, params=None, n_jobs=None):
+    # Batched (all 50 numbers at once) model for the given type/hyperparameters
+    params = dict(params or {})
+    if model_type == 'logistic':
+        from sklearn.linear_model import LogisticRegression
+        from sklearn.multioutput import MultiOutputClassifier
+        return MultiOutputClassifier(LogisticRegression(solver='liblinear', **params), n_jobs=n_jobs)
+    if model_type == 'sgd':
+        # Logistic loss fitted by SGD; supports partial_fit for incremental updates
+        from sklearn.linear_model import SGDClassifier
+        from sklearn.multioutput import MultiOutputClassifier
+        params.setdefault('random_state', 42)
+        return MultiOutputClassifier(SGDClassifier(loss='log_loss', **params), n_jobs=n_jobs)
+    if model_type == 'rf':
+        from sklearn.ensemble import RandomForestClassifier
+        params.setdefault('n_estimators', 100)
+        params.setdefault('random_state', 42)
+        return RandomForestClassifier(n_jobs=n_jobs, **params)
+    raise ValueError(f"Unknown model type: {model_type}")
+
+def evaluate_lagged(ml_matrix, model_type, n_lags, params=None, split_idx=-20, n_jobs=None):
+    # Fit on all but the last -split_idx lag windows and score the holdout
+    X, y = make_lagged_features(ml_matrix, n_lags=n_lags)
+    X_train, X_test = as_model_input(X[:split_idx]), as_model_input(X[split_idx:])
+    y_train, y_test = y[:split_idx], y[split_idx:]
+    preds, probas = fit_predict(model_type, params, X_train, y_train, X_test, n_jobs=n_jobs)
+    return score_per_number(y_test, preds, probas)
+
+def fit_predict(model_type, params, X_train, y_train, X_test, n_jobs=None):
+    # Batched fit + predict. Numbers that never (or always) occur in the
+    # training window, e.g. 50 before the 7-of-50 format, get a constant
+    # prediction instead of a model.
+    fitted = fit_varying(model_type, params, X_train, y_train, n_jobs=n_jobs)
+    return predict_varying(fitted, X_test)
+
+def fit_varying(model_type, params, X_train, y_train, n_jobs=None):
+    # (model or None, mask of numbers it covers, constant 0/1 row for the rest)
+    y_train = np.asarray(y_train)
+    constant = y_train[0].astype(np.uint8)
+    varying = y_train.min(axis=0) != y_train.max(axis=0)
+    model = None
+    if varying.any():
+        model = make_model(model_type, params, n_jobs=n_jobs)
+        with profiling.stage('fit_predict.fit', tag=model_type):
+            model.fit(X_train, y_train[:, varying])
+    return model, varying, constant
+
+def predict_varying(fitted, X_test):
+    model, varying, constant = fitted
+    preds = np.repeat(constant[None], len(X_test), axis=0)
+    probas = preds.astype(float)
+    if model is not None:
+        preds[:, varying], probas[:, varying] = predict_per_number(model, X_test)
+    return preds, probas
+
+def data_fingerprint(ml_matrix):
+    return hashlib.sha256(np.ascontiguousarray(ml_matrix).tobytes()).hexdigest()[:16]
+
+def shared_matrix_path(ml_matrix, cache_dir):
+    # Save the matrix once as .npy so worker processes can np.load it with
+    # mmap_mode='r' instead of each receiving a pickled copy
+    os.makedirs(cache_dir, exist_ok=True)
+    path = os.path.join(cache_dir, f"ml_matrix_{data_fingerprint(ml_matrix)}.npy")
+    if not os.path.exists(path):
+        tmp_path = path + ".tmp.npy"
+        np.save(tmp_path, np.ascontiguousarray(ml_matrix))
+        os.replace(tmp_path, path)
+    return path
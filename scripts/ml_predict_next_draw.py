@@ -1,45 +1,34 @@
-import os
-import pandas as pd
-import numpy as np
 from sklearn.linear_model import LogisticRegression
-from sklearn.metrics import accuracy_score, roc_auc_score
+from sklearn.multioutput import MultiOutputClassifier
+from prepare_ml_data import NUM_COLS, load_ml_matrix
+import profiling
+from ml_common import fit_per_number, predict_per_number, report_per_number
 
-PROCESSED_DIR = "data/processed"
-ML_FILENAME = "lottomax_ml_ready.csv"
-
-def main():
-    path = os.path.join(PROCESSED_DIR, ML_FILENAME)
-    df = pd.read_csv(path)
-    num_cols = [f"num_{i}" for i in range(1, 51)]
+@profiling.profiled()
+def main(batched=True, n_jobs=-1):
+    ml_matrix = load_ml_matrix()
+    num_cols = NUM_COLS
     
     # Use previous draw as features, current draw as label
-    X = df[num_cols].shift(1).iloc[1:].values  # previous draw
-    y = df[num_cols].iloc[1:].values           # current draw
+    X = ml_matrix[:-1]  # previous draw
+    y = ml_matrix[1:]   # current draw
     
     # Train/test split (simple: last 20 draws as test)
     split_idx = -20
     X_train, X_test = X[:split_idx], X[split_idx:]
     y_train, y_test = y[:split_idx], y[split_idx:]
     
-    # Train a model for each number
-    accs = []
-    aucs = []
-    for i, col in enumerate(num_cols):
-        model = LogisticRegression(solver='liblinear')
-        model.fit(X_train, y_train[:, i])
-        preds = model.predict(X_test)
-        probas = model.predict_proba(X_test)[:, 1]
-        acc = accuracy_score(y_test[:, i], preds)
-        try:
-            auc = roc_auc_score(y_test[:, i], probas)
-        except ValueError:
-            auc = np.nan  # If only one class in y_test
-        accs.append(acc)
-        aucs.append(auc)
-        print(f"{col}: Accuracy={acc:.3f}, ROC-AUC={auc if not np.isnan(auc) else 'N/A'}")
-    
-    print(f"\nAverage accuracy across all numbers: {np.mean(accs):.3f}")
-    print(f"Average ROC-AUC across all numbers: {np.nanmean(aucs):.3f}")
+    if batched:
+        # One-vs-rest over all 50 numbers, fitted in parallel across cores
+        model = MultiOutputClassifier(LogisticRegression(solver='liblinear'), n_jobs=n_jobs)
+        with profiling.stage('batched.fit'):
+            model.fit(X_train, y_train)
+        preds, probas = predict_per_number(model, X_test)
+    else:
+        # Train a model for each number
+        preds, probas = fit_per_number(lambda: LogisticRegression(solver='liblinear'), X_train, y_train, X_test)
+    report_per_number(num_cols, y_test, preds, probas)
 
 if __name__ == "__main__":
+    profiling.enable_from_argv()
     main()
\ No newline at end of file
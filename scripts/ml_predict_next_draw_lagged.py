@@ -1,54 +1,34 @@
-import os
-import pandas as pd
-import numpy as np
 from sklearn.linear_model import LogisticRegression
-from sklearn.metrics import accuracy_score, roc_auc_score
+from sklearn.multioutput import MultiOutputClassifier
+from prepare_ml_data import NUM_COLS, load_ml_matrix
+import profiling
+from ml_common import make_lagged_features, as_model_input, fit_per_number, predict_per_number, report_per_number
 
-PROCESSED_DIR = "data/processed"
-ML_FILENAME = "lottomax_ml_ready.csv"
-
-def make_lagged_features(df, num_cols, n_lags=3):
-    # Create lagged features for each previous draw
-    lagged_features = []
-    for lag in range(1, n_lags+1):
-        lagged = df[num_cols].shift(lag)
-        lagged.columns = [f"{col}_lag{lag}" for col in num_cols]
-        lagged_features.append(lagged)
-    X = pd.concat(lagged_features, axis=1).iloc[n_lags:]
-    y = df[num_cols].iloc[n_lags:]
-    return X.values, y.values
-
-def main(n_lags=3):
-    path = os.path.join(PROCESSED_DIR, ML_FILENAME)
-    df = pd.read_csv(path)
-    num_cols = [f"num_{i}" for i in range(1, 51)]
+@profiling.profiled()
+def main(n_lags=3, batched=True, n_jobs=-1):
+    num_cols = NUM_COLS
     
-    X, y = make_lagged_features(df, num_cols, n_lags=n_lags)
+    # Lag windows are views over the uint8 draw matrix
+    X, y = make_lagged_features(load_ml_matrix(), n_lags=n_lags)
     
     # Train/test split (last 20 draws as test)
     split_idx = -20
     X_train, X_test = X[:split_idx], X[split_idx:]
     y_train, y_test = y[:split_idx], y[split_idx:]
+    X_train, X_test = as_model_input(X_train), as_model_input(X_test)
     
-    accs = []
-    aucs = []
-    for i, col in enumerate(num_cols):
-        model = LogisticRegression(solver='liblinear')
-        model.fit(X_train, y_train[:, i])
-        preds = model.predict(X_test)
-        probas = model.predict_proba(X_test)[:, 1]
-        acc = accuracy_score(y_test[:, i], preds)
-        try:
-            auc = roc_auc_score(y_test[:, i], probas)
-        except ValueError:
-            auc = np.nan
-        accs.append(acc)
-        aucs.append(auc)
-        print(f"{col}: Accuracy={acc:.3f}, ROC-AUC={auc if not np.isnan(auc) else 'N/A'}")
-    
-    print(f"\nAverage accuracy across all numbers: {np.mean(accs):.3f}")
-    print(f"Average ROC-AUC across all numbers: {np.nanmean(aucs):.3f}")
+    if batched:
+        # One-vs-rest over all 50 numbers, fitted in parallel across cores
+        model = MultiOutputClassifier(LogisticRegression(solver='liblinear'), n_jobs=n_jobs)
+        with profiling.stage('batched.fit'):
+            model.fit(X_train, y_train)
+        preds, probas = predict_per_number(model, X_test)
+    else:
+        # Train a model for each number
+        preds, probas = fit_per_number(lambda: LogisticRegression(solver='liblinear'), X_train, y_train, X_test)
+    report_per_number(num_cols, y_test, preds, probas)
 
 if __name__ == "__main__":
+    profiling.enable_from_argv()
     # Change n_lags to use more or fewer previous draws
     main(n_lags=54)
\ No newline at end of file
@@ -0,0 +1,170 @@
+import os
+import sys
+import argparse
+import numpy as np
+import profiling
+from concurrent.futures import ProcessPoolExecutor
+from draw_store import load_draws, mains
+
+PROCESSED_DIR = "data/processed"
+CLEANED_FILENAME = "lottomax_cleaned.csv"
+
+MAX_NUMBER = 50
+NUMBERS_PER_DRAW = 7
+STATISTICS = ['chi2', 'runs_z', 'serial_corr', 'entropy']
+# Tail of the null distribution that counts as "at least as extreme"
+TAILS = {'chi2': 'upper', 'runs_z': 'two-sided', 'serial_corr': 'two-sided', 'entropy': 'lower'}
+# Simulated numbers held in memory per chunk (int64 ~ 8 bytes each)
+CHUNK_NUMBERS = 2_000_000
+# Replicates per pool task. Fixed, so the task layout (and with it the child
+# seeds) depends only on n_replicates, never on the worker count
+TASK_REPLICATES = 250
+
+def simulate_draws(rng, n_draws):
+    # (n_draws, 7) sorted draws of 7 distinct numbers from 1..50: sample with
+    # replacement and redraw only the rows that came out with a repeat
+    draws = np.sort(rng.integers(1, MAX_NUMBER + 1, size=(n_draws, NUMBERS_PER_DRAW)), axis=1)
+    bad = np.nonzero((np.diff(draws, axis=1) == 0).any(axis=1))[0]
+    while len(bad):
+        redraw = np.sort(rng.integers(1, MAX_NUMBER + 1, size=(len(bad), NUMBERS_PER_DRAW)), axis=1)
+        draws[bad] = redraw
+        bad = bad[(np.diff(redraw, axis=1) == 0).any(axis=1)]
+    return draws
+
+def simulate_histories(rng, n_histories, n_draws):
+    return simulate_draws(rng, n_histories * n_draws).reshape(n_histories, n_draws, NUMBERS_PER_DRAW)
+
+def history_statistics(histories):
+    # Every randomness_tests statistic for a (histories, draws, 7) batch at once;
+    # each history is read as its flattened n1..n7 sequence in draw order
+    histories = np.asarray(histories, dtype=np.int64)
+    n_hist, n_draws = histories.shape[:2]
+    flat = histories.reshape(n_hist, -1)
+    n = flat.shape[1]
+
+    # Chi-square against a uniform 7-of-50 expectation
+    offsets = (np.arange(n_hist) * (MAX_NUMBER + 1))[:, None]
+    counts = np.bincount((flat + offsets).ravel(), minlength=n_hist * (MAX_NUMBER + 1))
+    counts = counts.reshape(n_hist, MAX_NUMBER + 1)[:, 1:]
+    expected = n_draws * NUMBERS_PER_DRAW / MAX_NUMBER
+    chi2 = ((counts - expected) ** 2 / expected).sum(axis=1)
+
+    # Shannon entropy of the observed number distribution
+    p = counts / counts.sum(axis=1, keepdims=True)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        entropy = -np.where(p > 0, p * np.log2(p), 0.0).sum(axis=1)
+
+    # Wald-Wolfowitz runs test on the high/low (26-50 / 1-25) sequence
+    high = flat > 25
+    runs = 1 + np.count_nonzero(np.diff(high, axis=1), axis=1)
+    n_h = high.sum(axis=1)
+    n_l = n - n_h
+    expected_runs = 2 * n_l * n_h / n + 1
+    var_runs = (2 * n_l * n_h) * (2 * n_l * n_h - n_l - n_h) / (n ** 2 * (n - 1))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        runs_z = np.where(var_runs > 0, (runs - expected_runs) / np.sqrt(var_runs), 0.0)
+
+    # Lag-1 Pearson serial correlation
+    x = flat[:, :-1] - flat[:, :-1].mean(axis=1, keepdims=True)
+    y = flat[:, 1:] - flat[:, 1:].mean(axis=1, keepdims=True)
+    serial_corr = (x * y).sum(axis=1) / np.sqrt((x * x).sum(axis=1) * (y * y).sum(axis=1))
+
+    return {'chi2': chi2, 'runs_z': runs_z, 'serial_corr': serial_corr, 'entropy': entropy}
+
+def _exceedances(stats, observed):
+    out = {}
+    for name, tail in TAILS.items():
+        if tail == 'upper':
+            out[name] = int(np.count_nonzero(stats[name] >= observed[name]))
+        elif tail == 'lower':
+            out[name] = int(np.count_nonzero(stats[name] <= observed[name]))
+        else:
+            out[name] = int(np.count_nonzero(np.abs(stats[name]) >= abs(observed[name])))
+    return out
+
+def _simulate_task(seed_seq, n_replicates, n_draws, observed):
+    # Worker: runs its replicates in fixed-size chunks and returns only
+    # exceedance counts and running sums, so memory stays bounded
+    rng = np.random.default_rng(seed_seq)
+    chunk = max(1, CHUNK_NUMBERS // (n_draws * NUMBERS_PER_DRAW))
+    exceed = dict.fromkeys(STATISTICS, 0)
+    sums = dict.fromkeys(STATISTICS, 0.0)
+    sq_sums = dict.fromkeys(STATISTICS, 0.0)
+    done = 0
+    while done < n_replicates:
+        size = min(chunk, n_replicates - done)
+        stats = history_statistics(simulate_histories(rng, size, n_draws))
+        for name, count in _exceedances(stats, observed).items():
+            exceed[name] += count
+            sums[name] += float(stats[name].sum())
+            sq_sums[name] += float((stats[name] ** 2).sum())
+        done += size
+    return exceed, sums, sq_sums
+
+def check_replicates(n_replicates):
+    # The null mean and std average over the replicates, so there must be one
+    if n_replicates < 1:
+        raise ValueError(f"Need at least 1 replicate, got {n_replicates}")
+
+@profiling.profiled()
+def monte_carlo_pvalues(draws, n_replicates=10_000, workers=None, seed=0):
+    # Empirical p-values of the observed statistics against n_replicates
+    # simulated histories of the same length. Replicates are split into tasks
+    # of TASK_REPLICATES, each with its own child of SeedSequence(seed), so the
+    # same seed gives the same results with any number of workers.
+    check_replicates(n_replicates)
+    draws = np.asarray(draws, dtype=np.int64)
+    observed = {name: float(v[0]) for name, v in history_statistics(draws[None]).items()}
+    n_tasks = max(1, -(-n_replicates // TASK_REPLICATES))
+    sizes = [min(TASK_REPLICATES, n_replicates - i * TASK_REPLICATES) for i in range(n_tasks)]
+    seeds = np.random.SeedSequence(seed).spawn(n_tasks)
+
+    exceed = dict.fromkeys(STATISTICS, 0)
+    sums = dict.fromkeys(STATISTICS, 0.0)
+    sq_sums = dict.fromkeys(STATISTICS, 0.0)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [pool.submit(_simulate_task, s, size, len(draws), observed) for s, size in zip(seeds, sizes)]
+        for future in futures:
+            task_exceed, task_sums, task_sq = future.result()
+            for name in STATISTICS:
+                exceed[name] += task_exceed[name]
+                sums[name] += task_sums[name]
+                sq_sums[name] += task_sq[name]
+
+    results = {}
+    for name in STATISTICS:
+        mean = sums[name] / n_replicates
+        results[name] = {
+            'observed': observed[name],
+            'null_mean': mean,
+            'null_std': float(np.sqrt(max(sq_sums[name] / n_replicates - mean ** 2, 0.0))),
+            'tail': TAILS[name],
+            'p_value': (exceed[name] + 1) / (n_replicates + 1),
+        }
+    return results
+
+def print_results(results, n_replicates):
+    print(f"Monte Carlo randomness tests ({n_replicates} simulated 7-of-50 histories):")
+    print(f"{'statistic':<12} {'observed':>10} {'null mean':>10} {'null std':>9} {'p-value':>8}  tail")
+    for name, r in results.items():
+        print(f"{name:<12} {r['observed']:>10.4f} {r['null_mean']:>10.4f} {r['null_std']:>9.4f} "
+              f"{r['p_value']:>8.4f}  {r['tail']}")
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Empirical p-values for the randomness tests by simulation.")
+    parser.add_argument('--replicates', type=int, default=10_000)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args(argv)
+    try:
+        check_replicates(args.replicates)
+    except ValueError as e:
+        parser.error(str(e))
+    return args
+
+if __name__ == "__main__":
+    profiling.enable_from_argv()
+    args = parse_args(sys.argv[1:])
+    draws = mains(load_draws(os.path.join(PROCESSED_DIR, CLEANED_FILENAME)))
+    results = monte_carlo_pvalues(draws, args.replicates, args.workers, args.seed)
+    print_results(results, args.replicates)
@@ -0,0 +1,208 @@
+import os
+import sys
+import json
+import time
+import shutil
+import hashlib
+import argparse
+import numpy as np
+import profiling
+from draw_store import load_draws, draw_dates
+from artifact_stamps import read_stamps
+from prepare_ml_data import ML_PACKED_FILENAME, packed_path, open_packed_matrix, unpack_rows, load_ml_matrix
+from ml_common import make_lagged_features, as_model_input, fit_varying, data_fingerprint
+
+PROCESSED_DIR = "data/processed"
+CLEANED_FILENAME = "lottomax_cleaned.csv"
+MODEL_DIR = os.path.join(PROCESSED_DIR, "models")
+META_FILENAME = "meta.json"
+
+# Loaded models for this process, keyed by model directory
+_LOADED = {}
+
+# A saved model is a directory of plain .npy arrays plus meta.json, so
+# serving needs neither sklearn nor unpickling:
+#   linear (logistic, sgd): P(drawn) = sigmoid(X @ weights + bias)
+#   forest (rf): every tree flattened into shared node arrays; P(drawn) is
+#   the mean over trees of the leaf's class-1 fraction
+# Numbers that never varied in training keep their constant 0/1 row.
+
+def model_dir(model_type, n_lags, params=None):
+    name = f"{model_type}_lags{n_lags}"
+    if params:
+        name += "_" + hashlib.sha256(json.dumps(params, sort_keys=True).encode()).hexdigest()[:8]
+    return os.path.join(MODEL_DIR, name)
+
+def export_linear(model):
+    # MultiOutputClassifier of binary linear classifiers -> (F, V) weights, (V,) bias
+    weights = np.stack([est.coef_[0] for est in model.estimators_], axis=1)
+    bias = np.array([est.intercept_[0] for est in model.estimators_])
+    return {'weights': weights, 'bias': bias}
+
+def export_forest(model):
+    # Multi-output RandomForestClassifier -> node arrays for every tree, with
+    # child indices offset into the shared arrays (-1 marks a leaf)
+    left, right, feature, threshold, leaf_p1, roots = [], [], [], [], [], []
+    offset = 0
+    for est in model.estimators_:
+        tree = est.tree_
+        is_leaf = tree.children_left == -1
+        roots.append(offset)
+        left.append(np.where(is_leaf, -1, tree.children_left + offset))
+        right.append(np.where(is_leaf, -1, tree.children_right + offset))
+        feature.append(np.where(is_leaf, 0, tree.feature))
+        threshold.append(tree.threshold)
+        # value is (nodes, outputs, classes); every output saw both classes
+        value = tree.value[:, :, :2]
+        leaf_p1.append(value[:, :, 1] / value.sum(axis=2))
+        offset += tree.node_count
+    return {
+        'roots': np.array(roots, dtype=np.int64),
+        'left': np.concatenate(left).astype(np.int64),
+        'right': np.concatenate(right).astype(np.int64),
+        'feature': np.concatenate(feature).astype(np.int64),
+        'threshold': np.concatenate(threshold),
+        'leaf_p1': np.concatenate(leaf_p1),
+    }
+
+@profiling.profiled()
+def train(model_type='logistic', n_lags=3, params=None, n_jobs=None):
+    # Fit on every lag window of the history and save the model's arrays with
+    # a fingerprint of the draws it was trained on
+    ml_matrix = load_ml_matrix()
+    X, y = make_lagged_features(ml_matrix, n_lags=n_lags)
+    model, varying, constant = fit_varying(model_type, params, as_model_input(X), y, n_jobs=n_jobs)
+    arrays = {'varying': varying, 'constant': constant}
+    if model is not None:
+        arrays.update(export_forest(model) if model_type == 'rf' else export_linear(model))
+    meta = {
+        'model_type': model_type, 'n_lags': n_lags, 'params': params or {},
+        'n_draws': len(ml_matrix), 'fingerprint': data_fingerprint(ml_matrix),
+        'trained': time.strftime('%Y-%m-%dT%H:%M:%S'),
+    }
+    path = model_dir(model_type, n_lags, params)
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    os.makedirs(tmp_path)
+    for name, array in arrays.items():
+        np.save(os.path.join(tmp_path, name + ".npy"), np.ascontiguousarray(array))
+    with open(os.path.join(tmp_path, META_FILENAME), "w") as f:
+        json.dump(meta, f, indent=2)
+    # Swap the directory in; a directory cannot be os.replace'd over a
+    # non-empty one, so the old model is moved aside first
+    old_path = f"{path}.{os.getpid()}.old"
+    if os.path.exists(path):
+        os.rename(path, old_path)
+    os.rename(tmp_path, path)
+    shutil.rmtree(old_path, ignore_errors=True)
+    _LOADED.pop(path, None)
+    return meta
+
+def load_model(model_type='logistic', n_lags=3, params=None):
+    # meta plus memory-mapped arrays; cached per process until retrained
+    path = model_dir(model_type, n_lags, params)
+    meta_path = os.path.join(path, META_FILENAME)
+    mtime = os.stat(meta_path).st_mtime_ns
+    cached = _LOADED.get(path)
+    if cached is None or cached[0] != mtime:
+        with open(meta_path) as f:
+            model = json.load(f)
+        for name in os.listdir(path):
+            if name.endswith(".npy"):
+                model[name[:-4]] = np.load(os.path.join(path, name), mmap_mode='r')
+        cached = (mtime, model)
+        _LOADED[path] = cached
+    return cached[1]
+
+def _forest_proba(model, X):
+    # Walk all trees for all windows together, one tree level per step
+    node = np.broadcast_to(model['roots'], (len(X), len(model['roots']))).copy()
+    rows = np.arange(len(X))[:, None]
+    while True:
+        left = model['left'][node]
+        inner = left != -1
+        if not inner.any():
+            break
+        go_left = X[rows, model['feature'][node]] <= model['threshold'][node]
+        node = np.where(inner, np.where(go_left, left, model['right'][node]), node)
+    return model['leaf_p1'][node].mean(axis=1)
+
+def predict_windows(model, windows):
+    # P(number drawn) for each (n_lags, 50) window: (n_windows, 50)
+    windows = np.asarray(windows, dtype=np.float32).reshape(len(windows), -1)
+    varying = np.asarray(model['varying'])
+    probas = np.repeat(np.asarray(model['constant'], dtype=float)[None], len(windows), axis=0)
+    if varying.any():
+        if model['model_type'] == 'rf':
+            probas[:, varying] = _forest_proba(model, windows)
+        else:
+            z = windows.astype(np.float64) @ model['weights'] + model['bias']
+            probas[:, varying] = 1.0 / (1.0 + np.exp(-z))
+    return probas
+
+def latest_rows(n_rows):
+    # Last n_rows draws as a (n_rows, 50) one-hot matrix, oldest first. Only
+    # those rows of the packed matrix are read; add_new_draw appends each new
+    # draw to it, so the window follows the history without a rebuild.
+    if not os.path.exists(packed_path()):
+        return load_ml_matrix()[-n_rows:]
+    return unpack_rows(open_packed_matrix()[-n_rows:])
+
+def window_is_current():
+    # The packed matrix must be stamped through the history's last draw;
+    # appends made with --skip-artifacts leave it behind
+    records = load_draws(os.path.join(PROCESSED_DIR, CLEANED_FILENAME))
+    return len(records) > 0 and read_stamps().get(ML_PACKED_FILENAME) == str(draw_dates(records[-1:])[0])
+
+def history_matches(model):
+    # True if the draws the model was trained on are still the first
+    # n_draws of the history (i.e. it has only been appended to since)
+    packed = open_packed_matrix()
+    if len(packed) < model['n_draws']:
+        return False
+    return data_fingerprint(unpack_rows(packed[:model['n_draws']])) == model['fingerprint']
+
+def predict_next(model_type='logistic', n_lags=3, params=None):
+    # 50-vector of P(number n + 1 is drawn next) from the latest n_lags draws
+    if not window_is_current():
+        raise ValueError("The ML matrix does not cover the latest draw; run 'lottomax.py update' first")
+    model = load_model(model_type, n_lags, params)
+    return predict_windows(model, latest_rows(model['n_lags'])[None])[0]
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Train once, then serve next-draw probabilities.")
+    parser.add_argument('command', choices=['train', 'predict'])
+    parser.add_argument('--model', choices=['logistic', 'sgd', 'rf'], default='logistic')
+    parser.add_argument('--lags', type=int, default=3)
+    parser.add_argument('--n-jobs', type=int, default=None)
+    parser.add_argument('--top', type=int, default=7, help="Numbers to list in predict mode")
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    profiling.enable_from_argv()
+    args = parse_args(sys.argv[1:])
+    path = model_dir(args.model, args.lags)
+    if args.command == 'train':
+        start = time.perf_counter()
+        meta = train(args.model, args.lags, n_jobs=args.n_jobs)
+        print(f"Trained {args.model} (n_lags={args.lags}) on {meta['n_draws']} draws in "
+              f"{time.perf_counter() - start:.2f}s; saved to {path}")
+    else:
+        if not os.path.exists(os.path.join(path, META_FILENAME)):
+            print(f"No trained model at {path}; run with 'train' first.")
+            sys.exit(1)
+        start = time.perf_counter()
+        try:
+            probas = predict_next(args.model, args.lags)
+        except ValueError as e:
+            print(e)
+            sys.exit(1)
+        elapsed = time.perf_counter() - start
+        model = load_model(args.model, args.lags)
+        if not history_matches(model):
+            print("Warning: the draw history changed since training; retrain for consistent results.")
+        order = np.argsort(-probas, kind='stable')[:args.top]
+        print(f"Top {args.top} numbers for the next draw ({args.model}, n_lags={args.lags}, "
+              f"trained on {model['n_draws']} draws):")
+        for i in order:
+            print(f"  {i + 1:>2}: {probas[i]:.4f}")
+        print(f"Loaded and predicted in {elapsed * 1000:.1f} ms")
@@ -0,0 +1,61 @@
+import numpy as np
+
+INDEX_FILENAME = "pair_triplet_index.npz"
+
+def _csr(table, width, max_number):
+    # Map each number to the row positions of the table that contain it.
+    # A stable sort keeps each number's rows in table order (count descending).
+    numbers = table[:, :width].ravel()
+    rows = np.repeat(np.arange(len(table), dtype=np.int32), width)
+    order = np.argsort(numbers, kind='stable')
+    counts = np.bincount(numbers, minlength=max_number + 1)
+    offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+    return offsets, rows[order]
+
+class NumberIndex:
+    # Per-number CSR index over the sorted pair and triplet frequency tables:
+    # rows containing number n are *_rows[*_offsets[n]:*_offsets[n + 1]]
+    def __init__(self, pair_table, pair_offsets, pair_rows, triplet_table, triplet_offsets, triplet_rows):
+        self.pair_table = pair_table
+        self.pair_offsets = pair_offsets
+        self.pair_rows = pair_rows
+        self.triplet_table = triplet_table
+        self.triplet_offsets = triplet_offsets
+        self.triplet_rows = triplet_rows
+        for arr in vars(self).values():
+            arr.flags.writeable = False  # safe to share between concurrent readers
+
+    @classmethod
+    def build(cls, pair_df, triplet_df, max_number=50):
+        pair_table = pair_df[['num1', 'num2', 'count']].to_numpy(dtype=np.int32)
+        triplet_table = triplet_df[['num1', 'num2', 'num3', 'count']].to_numpy(dtype=np.int32)
+        pair_offsets, pair_rows = _csr(pair_table, 2, max_number)
+        triplet_offsets, triplet_rows = _csr(triplet_table, 3, max_number)
+        return cls(pair_table, pair_offsets, pair_rows, triplet_table, triplet_offsets, triplet_rows)
+
+    def save(self, path):
+        np.savez(path, **vars(self))
+
+    @classmethod
+    def load(cls, path):
+        with np.load(path) as data:
+            return cls(**{name: data[name] for name in data.files})
+
+    def _rows(self, offsets, rows, number):
+        if not 0 <= number < len(offsets) - 1:
+            return rows[:0]
+        return rows[offsets[number]:offsets[number + 1]]
+
+    def pair_rows_for(self, number):
+        return self._rows(self.pair_offsets, self.pair_rows, number)
+
+    def triplet_rows_for(self, number):
+        return self._rows(self.triplet_offsets, self.triplet_rows, number)
+
+    def top_pairs(self, number, k=1):
+        # (k, 3) array of num1, num2, count sorted by count descending
+        return self.pair_table[self.pair_rows_for(number)[:k]]
+
+    def top_triplets(self, number, k=1):
+        # (k, 4) array of num1, num2, num3, count sorted by count descending
+        return self.triplet_table[self.triplet_rows_for(number)[:k]]
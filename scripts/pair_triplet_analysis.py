@@ -1,41 +1,28 @@
 import os
-import pandas as pd
-from itertools import combinations
-from collections import Counter
+import profiling
+from dataset import get_dataset
+from number_index import INDEX_FILENAME, NumberIndex
+from artifact_stamps import PAIR_FILENAME, TRIPLET_FILENAME, read_stamps, stamp_artifacts
 
 PROCESSED_DIR = "data/processed"
 CLEANED_FILENAME = "lottomax_cleaned.csv"
 
+@profiling.profiled()
 def pair_triplet_analysis(input_path):
-    df = pd.read_csv(input_path)
-    main_cols = ['n1', 'n2', 'n3', 'n4', 'n5', 'n6', 'n7']
+    dataset = get_dataset(input_path)
     
-    pair_counter = Counter()
-    triplet_counter = Counter()
-
-    for _, row in df.iterrows():
-        numbers = [row[col] for col in main_cols]
-        # Pairs
-        for pair in combinations(sorted(numbers), 2):
-            pair_counter[pair] += 1
-        # Triplets
-        for triplet in combinations(sorted(numbers), 3):
-            triplet_counter[triplet] += 1
-
-    # Convert to DataFrame and sort
-    pair_df = pd.DataFrame(
-        [(a, b, count) for (a, b), count in pair_counter.items()],
-        columns=['num1', 'num2', 'count']
-    ).sort_values(['count', 'num1', 'num2'], ascending=[False, True, True])
-    
-    triplet_df = pd.DataFrame(
-        [(a, b, c, count) for (a, b, c), count in triplet_counter.items()],
-        columns=['num1', 'num2', 'num3', 'count']
-    ).sort_values(['count', 'num1', 'num2', 'num3'], ascending=[False, True, True, True])
+    # Vectorized co-occurrence counts (indicator matrix product for pairs,
+    # flat-index bincount for triplets), computed once per dataset
+    pair_df, triplet_df = dataset.pair_triplet_tables
     
     # Save to CSV
-    pair_df.to_csv(os.path.join(PROCESSED_DIR, "pair_frequencies.csv"), index=False)
-    triplet_df.to_csv(os.path.join(PROCESSED_DIR, "triplet_frequencies.csv"), index=False)
+    pair_df.to_csv(os.path.join(PROCESSED_DIR, PAIR_FILENAME), index=False)
+    triplet_df.to_csv(os.path.join(PROCESSED_DIR, TRIPLET_FILENAME), index=False)
+    stamp_artifacts([PAIR_FILENAME, TRIPLET_FILENAME], dataset.dates.max())
+    
+    # Per-number lookup index for the interactive/top-k queries
+    index = NumberIndex.build(pair_df, triplet_df)
+    index.save(os.path.join(PROCESSED_DIR, INDEX_FILENAME))
     
     print("Top 10 pairs:")
     print(pair_df.head(10).to_string(index=False))
@@ -44,30 +31,66 @@ def pair_triplet_analysis(input_path):
     print("\nPair and triplet frequency tables saved to data/processed/")
     return pair_df, triplet_df
 
-def best_pair_and_triplet_for_number(pair_df, triplet_df, number):
-    # Find all pairs containing the number
-    pairs_with_number = pair_df[(pair_df['num1'] == number) | (pair_df['num2'] == number)]
-    if not pairs_with_number.empty:
-        best_pair = pairs_with_number.iloc[0]
+def load_number_index(pair_df, triplet_df):
+    # Reuse the persisted index if present, otherwise build it from the tables
+    path = os.path.join(PROCESSED_DIR, INDEX_FILENAME)
+    if os.path.exists(path):
+        return NumberIndex.load(path)
+    return NumberIndex.build(pair_df, triplet_df)
+
+def load_pair_triplet_tables(input_path):
+    # Reuse the saved tables and index when they are stamped as covering the
+    # latest draw; otherwise run the analysis
+    import pandas as pd
+    last_draw_date = str(get_dataset(input_path).dates.max())
+    stamps = read_stamps()
+    index_path = os.path.join(PROCESSED_DIR, INDEX_FILENAME)
+    if all(stamps.get(name) == last_draw_date for name in (PAIR_FILENAME, TRIPLET_FILENAME)) \
+            and os.path.exists(index_path):
+        pair_df = pd.read_csv(os.path.join(PROCESSED_DIR, PAIR_FILENAME))
+        triplet_df = pd.read_csv(os.path.join(PROCESSED_DIR, TRIPLET_FILENAME))
+        print(f"Pair and triplet tables are up to date through {last_draw_date}.")
+        return pair_df, triplet_df, NumberIndex.load(index_path)
+    pair_df, triplet_df = pair_triplet_analysis(input_path)
+    return pair_df, triplet_df, load_number_index(pair_df, triplet_df)
+
+def _rows_with_number(pair_df, triplet_df, number, index):
+    if index is None:
+        pairs_with_number = pair_df[(pair_df['num1'] == number) | (pair_df['num2'] == number)]
+        triplets_with_number = triplet_df[
+            (triplet_df['num1'] == number) | 
+            (triplet_df['num2'] == number) | 
+            (triplet_df['num3'] == number)
+        ]
+        return pairs_with_number, triplets_with_number
+    return pair_df.iloc[index.pair_rows_for(number)], triplet_df.iloc[index.triplet_rows_for(number)]
+
+def best_pair_and_triplet_for_number(pair_df, triplet_df, number, index=None):
+    # Find the top pair and triplet containing the number
+    if index is not None:
+        pair = index.top_pairs(number, 1)
+        triplet = index.top_triplets(number, 1)
+        best_pair = dict(zip(['num1', 'num2', 'count'], pair[0])) if len(pair) else None
+        best_triplet = dict(zip(['num1', 'num2', 'num3', 'count'], triplet[0])) if len(triplet) else None
+    else:
+        pairs_with_number, triplets_with_number = _rows_with_number(pair_df, triplet_df, number, None)
+        best_pair = None if pairs_with_number.empty else pairs_with_number.iloc[0]
+        best_triplet = None if triplets_with_number.empty else triplets_with_number.iloc[0]
+
+    if best_pair is not None:
         print(f"\nMost frequent pair with {number}: ({best_pair['num1']}, {best_pair['num2']}) - {best_pair['count']} times")
     else:
         print(f"\nNo pairs found with {number}.")
     
-    # Find all triplets containing the number
-    triplets_with_number = triplet_df[
-        (triplet_df['num1'] == number) | 
-        (triplet_df['num2'] == number) | 
-        (triplet_df['num3'] == number)
-    ]
-    if not triplets_with_number.empty:
-        best_triplet = triplets_with_number.iloc[0]
+    if best_triplet is not None:
         print(f"Most frequent triplet with {number}: ({best_triplet['num1']}, {best_triplet['num2']}, {best_triplet['num3']}) - {best_triplet['count']} times")
     else:
         print(f"No triplets found with {number}.")
 
-def show_all_pairs_and_triplets_for_number(pair_df, triplet_df, number):
+def show_all_pairs_and_triplets_for_number(pair_df, triplet_df, number, index=None):
+    pairs_with_number, triplets_with_number = _rows_with_number(pair_df, triplet_df, number, index)
+
     # All pairs with the number
-    pairs_with_number = pair_df[(pair_df['num1'] == number) | (pair_df['num2'] == number)]
     if not pairs_with_number.empty:
         print(f"\nAll pairs with {number} (sorted by frequency):")
         print(pairs_with_number.to_string(index=False))
@@ -75,11 +98,6 @@ def show_all_pairs_and_triplets_for_number(pair_df, triplet_df, number):
         print(f"\nNo pairs found with {number}.")
 
     # All triplets with the number
-    triplets_with_number = triplet_df[
-        (triplet_df['num1'] == number) | 
-        (triplet_df['num2'] == number) | 
-        (triplet_df['num3'] == number)
-    ]
     if not triplets_with_number.empty:
         print(f"\nAll triplets with {number} (sorted by frequency):")
         print(triplets_with_number.to_string(index=False))
@@ -87,8 +105,9 @@ def show_all_pairs_and_triplets_for_number(pair_df, triplet_df, number):
         print(f"\nNo triplets found with {number}.")
 
 if __name__ == "__main__":
+    profiling.enable_from_argv()
     input_path = os.path.join(PROCESSED_DIR, CLEANED_FILENAME)
-    pair_df, triplet_df = pair_triplet_analysis(input_path)
+    pair_df, triplet_df, index = load_pair_triplet_tables(input_path)
 
     while True:
         print("\nChoose an option:")
@@ -101,14 +120,14 @@ if __name__ == "__main__":
             user_input = input("Enter a number: ").strip()
             if user_input.isdigit():
                 number = int(user_input)
-                best_pair_and_triplet_for_number(pair_df, triplet_df, number)
+                best_pair_and_triplet_for_number(pair_df, triplet_df, number, index)
             else:
                 print("Please enter a valid integer.")
         elif choice == "2":
             user_input = input("Enter a number: ").strip()
             if user_input.isdigit():
                 number = int(user_input)
-                show_all_pairs_and_triplets_for_number(pair_df, triplet_df, number)
+                show_all_pairs_and_triplets_for_number(pair_df, triplet_df, number, index)
             else:
                 print("Please enter a valid integer.")
         elif choice == "3":
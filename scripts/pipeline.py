@@ -0,0 +1,273 @@
+import os
+import sys
+import ast
+import json
+import time
+import hashlib
+import argparse
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
+
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+RAW_DIR = "data/raw"
+PROCESSED_DIR = "data/processed"
+MANIFEST_FILENAME = "pipeline_manifest.json"
+LOG_DIR = os.path.join(PROCESSED_DIR, "pipeline_logs")
+
+RAW_PATH = os.path.join(RAW_DIR, "lottomax_history.xlsx")
+CLEANED_PATH = os.path.join(PROCESSED_DIR, "lottomax_cleaned.csv")
+
+def _processed(*names):
+    return [os.path.join(PROCESSED_DIR, name) for name in names]
+
+# Stage name -> module/function to call, keyword arguments, upstream stages,
+# data files read and files written. A stage is up to date when the content
+# hashes of its inputs (plus the source of its local imports) match the
+# manifest and all of its outputs exist. Stages without data outputs keep
+# their log as output.
+STAGES = {
+    'clean': {
+        'module': 'process_data', 'func': 'clean_lottomax_data',
+        'kwargs': {'input_path': RAW_PATH, 'output_path': CLEANED_PATH},
+        'deps': [], 'inputs': [RAW_PATH],
+        'outputs': _processed("lottomax_cleaned.csv", "lottomax_cleaned.bin"),
+    },
+    'frequency': {
+        'module': 'frequency_analysis', 'func': 'frequency_analysis',
+        'kwargs': {'input_path': CLEANED_PATH},
+        'deps': ['clean'], 'inputs': [CLEANED_PATH],
+        'outputs': _processed("main_number_frequencies.csv", "bonus_number_frequencies.csv"),
+    },
+    'pair_triplet': {
+        'module': 'pair_triplet_analysis', 'func': 'pair_triplet_analysis',
+        'kwargs': {'input_path': CLEANED_PATH},
+        'deps': ['clean'], 'inputs': [CLEANED_PATH],
+        'outputs': _processed("pair_frequencies.csv", "triplet_frequencies.csv", "pair_triplet_index.npz"),
+    },
+    'probability': {
+        'module': 'probability_tables', 'func': 'probability_analysis',
+        'kwargs': {'input_path': CLEANED_PATH},
+        'deps': ['clean'], 'inputs': [CLEANED_PATH],
+        'outputs': _processed("pair_significance.csv", "triplet_significance.csv", "probability_tables.npz"),
+    },
+    'ml_prep': {
+        'module': 'prepare_ml_data', 'func': 'prepare_ml_data',
+        'kwargs': {},
+        'deps': ['clean'], 'inputs': [CLEANED_PATH],
+        'outputs': _processed("lottomax_ml_ready.csv", "lottomax_ml_ready.bin"),
+    },
+    'gaps': {
+        'module': 'gap_analysis', 'func': 'gap_analysis',
+        'kwargs': {'input_path': CLEANED_PATH},
+        'deps': ['clean'], 'inputs': [CLEANED_PATH],
+        'outputs': _processed("gap_state.npz", "number_gaps.csv"),
+    },
+    'randomness': {
+        'module': 'randomness_tests', 'func': 'run_all_tests',
+        'kwargs': {'input_path': CLEANED_PATH},
+        'deps': ['clean'], 'inputs': [CLEANED_PATH],
+        'outputs': _processed("randomness_report.json"),
+    },
+    'ml_logistic': {
+        'module': 'ml_predict_next_draw', 'func': 'main',
+        'kwargs': {},
+        'deps': ['ml_prep'], 'inputs': _processed("lottomax_ml_ready.bin"),
+        'outputs': [],
+    },
+    'ml_lagged': {
+        'module': 'ml_predict_next_draw_lagged', 'func': 'main',
+        'kwargs': {'n_lags': 54},
+        'deps': ['ml_prep'], 'inputs': _processed("lottomax_ml_ready.bin"),
+        'outputs': [],
+    },
+    'ml_rf': {
+        'module': 'ml_predict_next_draw_rf', 'func': 'main',
+        'kwargs': {'n_lags': 20},
+        'deps': ['ml_prep'], 'inputs': _processed("lottomax_ml_ready.bin"),
+        'outputs': [],
+    },
+}
+
+def log_path(name):
+    return os.path.join(LOG_DIR, f"{name}.log")
+
+def stage_outputs(name):
+    return STAGES[name]['outputs'] or [log_path(name)]
+
+def script_path(module):
+    return os.path.relpath(os.path.join(SCRIPTS_DIR, module + ".py"))
+
+def local_imports(module, found=None):
+    # The module plus every scripts/ module it imports, directly or through
+    # other local modules (function-level lazy imports included), found by
+    # walking the AST rather than importing anything
+    found = set() if found is None else found
+    found.add(module)
+    with open(script_path(module)) as f:
+        tree = ast.parse(f.read())
+    for node in ast.walk(tree):
+        if isinstance(node, ast.Import):
+            names = [alias.name.split('.')[0] for alias in node.names]
+        elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module:
+            names = [node.module.split('.')[0]]
+        else:
+            continue
+        for name in names:
+            if name not in found and os.path.exists(script_path(name)):
+                local_imports(name, found)
+    return found
+
+def stage_inputs(name):
+    # Data inputs plus the source of the stage module's local import closure,
+    # so a change in a shared engine (cooccurrence, ml_common, ...) reruns it
+    return STAGES[name]['inputs'] + [script_path(module) for module in sorted(local_imports(STAGES[name]['module']))]
+
+def descendants(name):
+    found = {name}
+    changed = True
+    while changed:
+        changed = False
+        for stage, spec in STAGES.items():
+            if stage not in found and found & set(spec['deps']):
+                found.add(stage)
+                changed = True
+    return found
+
+def select_stages(only=None, start=None):
+    # Stages to consider, in STAGES (topological) order
+    selected = set(STAGES)
+    if only:
+        selected &= set(only)
+    if start:
+        selected &= descendants(start)
+    return [name for name in STAGES if name in selected]
+
+def load_manifest():
+    path = os.path.join(PROCESSED_DIR, MANIFEST_FILENAME)
+    if not os.path.exists(path):
+        return {'stages': {}, 'files': {}}
+    with open(path) as f:
+        return json.load(f)
+
+def save_manifest(manifest):
+    path = os.path.join(PROCESSED_DIR, MANIFEST_FILENAME)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, path)
+
+def file_hash(path, manifest):
+    # SHA-256 of the file's contents, reused from the manifest while the
+    # file's (mtime, size) are unchanged so an idle re-run reads nothing
+    if not os.path.exists(path):
+        return None
+    st = os.stat(path)
+    cached = manifest['files'].get(path)
+    if cached and cached[0] == st.st_mtime_ns and cached[1] == st.st_size:
+        return cached[2]
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    manifest['files'][path] = [st.st_mtime_ns, st.st_size, digest.hexdigest()]
+    return digest.hexdigest()
+
+def input_hashes(name, manifest):
+    return {path: file_hash(path, manifest) for path in stage_inputs(name)}
+
+def is_up_to_date(name, manifest):
+    record = manifest['stages'].get(name)
+    return (record is not None and record['inputs'] == input_hashes(name, manifest)
+            and all(os.path.exists(path) for path in stage_outputs(name)))
+
+def _run_stage(name):
+    # Worker: call the stage function with its output captured in the stage log
+    import importlib
+    from contextlib import redirect_stdout, redirect_stderr
+    sys.path.insert(0, SCRIPTS_DIR)
+    spec = STAGES[name]
+    os.makedirs(LOG_DIR, exist_ok=True)
+    start = time.perf_counter()
+    with open(log_path(name), 'w') as log, redirect_stdout(log), redirect_stderr(log):
+        func = getattr(importlib.import_module(spec['module']), spec['func'])
+        func(**spec['kwargs'])
+    return time.perf_counter() - start
+
+def run_pipeline(only=None, start=None, force=False, workers=None, dry_run=False):
+    # Run the selected stages whose inputs changed, as soon as their upstream
+    # stages (if selected) are done; independent stages run concurrently
+    manifest = load_manifest()
+    stages = select_stages(only, start)
+    pending = list(stages)
+    done, failed, running = set(), set(), {}
+    results = {}
+
+    def ready(name):
+        deps = [dep for dep in STAGES[name]['deps'] if dep in stages]
+        return all(dep in done for dep in deps)
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        while pending or running:
+            for name in [n for n in pending if ready(n)]:
+                pending.remove(name)
+                upstream_stale = any(results.get(dep) == 'stale' for dep in STAGES[name]['deps'])
+                if not force and not upstream_stale and is_up_to_date(name, manifest):
+                    print(f"[skip] {name} (up to date)")
+                    done.add(name)
+                    results[name] = 'skipped'
+                elif dry_run:
+                    print(f"[would run] {name}")
+                    done.add(name)
+                    results[name] = 'stale'
+                else:
+                    print(f"[run]  {name}")
+                    running[pool.submit(_run_stage, name)] = name
+            # Drop stages whose upstream failed
+            for name in [n for n in pending if any(dep in failed for dep in STAGES[n]['deps'])]:
+                pending.remove(name)
+                failed.add(name)
+                results[name] = 'blocked'
+                print(f"[blocked] {name} (upstream failed)")
+            if not running:
+                if pending and not any(ready(n) for n in pending):
+                    break
+                continue
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                try:
+                    elapsed = future.result()
+                except Exception as e:
+                    failed.add(name)
+                    results[name] = 'failed'
+                    print(f"[fail] {name}: {type(e).__name__}: {e} (see {log_path(name)})")
+                    continue
+                manifest['stages'][name] = {
+                    'inputs': input_hashes(name, manifest),
+                    'outputs': {path: file_hash(path, manifest) for path in stage_outputs(name)},
+                    'seconds': round(elapsed, 3),
+                    'finished': time.strftime('%Y-%m-%dT%H:%M:%S'),
+                }
+                save_manifest(manifest)
+                done.add(name)
+                results[name] = 'ran'
+                print(f"[done] {name} in {elapsed:.2f}s")
+    if not dry_run:
+        save_manifest(manifest)
+    return results
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Run the processing pipeline, skipping up-to-date stages.")
+    parser.add_argument('--only', nargs='+', choices=list(STAGES), help="Run just these stages")
+    parser.add_argument('--from', dest='start', choices=list(STAGES), help="Run this stage and everything downstream")
+    parser.add_argument('--force', action='store_true', help="Run selected stages even if up to date")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--dry-run', action='store_true', help="Only report which stages would run")
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    args = parse_args(sys.argv[1:])
+    start = time.perf_counter()
+    results = run_pipeline(args.only, args.start, args.force, args.workers, args.dry_run)
+    print(f"Pipeline finished in {time.perf_counter() - start:.2f}s")
+    if any(status in ('failed', 'blocked') for status in results.values()):
+        sys.exit(1)
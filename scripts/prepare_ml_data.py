@@ -1,29 +1,84 @@
 import os
-import pandas as pd
 import numpy as np
+import profiling
+from cooccurrence import indicator_matrix
+from draw_store import load_draws, mains, to_frame
+from artifact_stamps import stamp_artifacts
 
 PROCESSED_DIR = "data/processed"
 CLEANED_FILENAME = "lottomax_cleaned.csv"
 ML_FILENAME = "lottomax_ml_ready.csv"
+ML_PACKED_FILENAME = "lottomax_ml_ready.bin"
+NUM_COLS = [f"num_{i}" for i in range(1, 51)]
+# The packed matrix is headerless: 50 one-hot columns packed into 7 bytes per
+# draw, so new draws are appended in place like the draw store
+PACKED_WIDTH = (len(NUM_COLS) + 7) // 8
 
+def packed_path():
+    return os.path.join(PROCESSED_DIR, ML_PACKED_FILENAME)
+
+def pack_rows(ml_matrix):
+    return np.packbits(np.asarray(ml_matrix).astype(bool), axis=1)
+
+def save_packed_matrix(ml_matrix):
+    # Whole-file write through a temp file so readers never see a partial matrix
+    path = packed_path()
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(np.ascontiguousarray(pack_rows(ml_matrix)).tobytes())
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp_path, path)
+
+def append_packed_rows(ml_rows):
+    # Only the new 7-byte rows, in a single O_APPEND write
+    data = np.ascontiguousarray(pack_rows(ml_rows)).tobytes()
+    fd = os.open(packed_path(), os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        os.write(fd, data)
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+def open_packed_matrix():
+    # Zero-copy, read-only (draws, 7) view; a torn tail row is ignored
+    path = packed_path()
+    n_rows = os.path.getsize(path) // PACKED_WIDTH
+    if n_rows == 0:
+        return np.zeros((0, PACKED_WIDTH), dtype=np.uint8)
+    return np.memmap(path, dtype=np.uint8, mode='r', shape=(n_rows, PACKED_WIDTH))
+
+def unpack_rows(packed):
+    return np.unpackbits(np.asarray(packed), axis=1, count=len(NUM_COLS))
+
+def load_ml_matrix():
+    # (draws, 50) uint8 one-hot matrix, from the packed file when available
+    if os.path.exists(packed_path()):
+        return unpack_rows(open_packed_matrix())
+    import pandas as pd
+    df = pd.read_csv(os.path.join(PROCESSED_DIR, ML_FILENAME))
+    return df[NUM_COLS].to_numpy(dtype=np.uint8)
+
+@profiling.profiled()
 def prepare_ml_data():
+    import pandas as pd
     path = os.path.join(PROCESSED_DIR, CLEANED_FILENAME)
-    df = pd.read_csv(path)
-    main_cols = ['n1', 'n2', 'n3', 'n4', 'n5', 'n6', 'n7']
-    
+    draws = load_draws(path)
+
     # Create a binary matrix: rows = draws, columns = numbers 1-50
-    ml_matrix = np.zeros((len(df), 50), dtype=int)
-    for i, row in df.iterrows():
-        for n in row[main_cols]:
-            ml_matrix[i, int(n)-1] = 1  # -1 for zero-based index
-    
-    ml_df = pd.DataFrame(ml_matrix, columns=[f"num_{i}" for i in range(1, 51)])
+    ml_matrix = indicator_matrix(mains(draws))
+
+    df = to_frame(draws)
+    ml_df = pd.DataFrame(ml_matrix, columns=NUM_COLS)
     ml_df['draw_date'] = df['draw_date']
     ml_df['bonus'] = df['bonus']
-    
-    # Save for ML use
+
+    # Save for ML use: bit-packed matrix for the ML scripts, CSV as export format
+    save_packed_matrix(ml_matrix)
     ml_df.to_csv(os.path.join(PROCESSED_DIR, ML_FILENAME), index=False)
+    stamp_artifacts([ML_FILENAME, ML_PACKED_FILENAME], df['draw_date'].max())
     print(f"ML-ready data saved to {os.path.join(PROCESSED_DIR, ML_FILENAME)}")
 
 if __name__ == "__main__":
-    prepare_ml_data()
\ No newline at end of file
+    profiling.enable_from_argv()
+    prepare_ml_data()
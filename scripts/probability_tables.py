@@ -0,0 +1,184 @@
+import os
+import sys
+import numpy as np
+import profiling
+from functools import lru_cache
+from dataset import get_dataset
+from combinations_index import BINOM, MAX_NUMBER, NUMBERS_PER_DRAW, rank_subsets, unrank_subsets
+
+PROCESSED_DIR = "data/processed"
+CLEANED_FILENAME = "lottomax_cleaned.csv"
+TABLES_FILENAME = "probability_tables.npz"
+PAIR_SIGNIFICANCE_FILENAME = "pair_significance.csv"
+TRIPLET_SIGNIFICANCE_FILENAME = "triplet_significance.csv"
+# Bumped whenever the layout of the cached tables changes
+TABLES_VERSION = 1
+# The bonus is drawn from the numbers left after the 7 mains
+BONUS_POOL = MAX_NUMBER - NUMBERS_PER_DRAW
+
+def build_tables():
+    # Everything that depends only on the game (7 of 50 + bonus), as arrays
+    k = np.arange(NUMBERS_PER_DRAW + 1)
+    hits = BINOM[NUMBERS_PER_DRAW, k] * BINOM[BONUS_POOL, NUMBERS_PER_DRAW - k]
+    # match_counts[k, b]: (draw, bonus) outcomes where a 7-number ticket matches
+    # k mains and (b=1) the bonus, i.e. one of its 7 - k other numbers
+    match_counts = np.stack([hits * (BONUS_POOL - (NUMBERS_PER_DRAW - k)), hits * (NUMBERS_PER_DRAW - k)], axis=1)
+    tables = {
+        'version': np.array(TABLES_VERSION),
+        'match_counts': match_counts,
+        'match_probs': match_counts / float(BINOM[MAX_NUMBER, NUMBERS_PER_DRAW] * BONUS_POOL),
+        # subset_probs[k]: P(a given k-subset of 1..50 is among a draw's mains)
+        'subset_probs': BINOM[MAX_NUMBER - k, NUMBERS_PER_DRAW - k] / float(BINOM[MAX_NUMBER, NUMBERS_PER_DRAW]),
+    }
+    for size in (2, 3):
+        subsets = unrank_subsets(np.arange(BINOM[MAX_NUMBER, size]), size)
+        # Dense rank lookup indexed by the zero-based sorted subset (-1 for unsorted or repeated indices)
+        lookup = np.full((MAX_NUMBER,) * size, -1, dtype=np.int32)
+        lookup[tuple((subsets - 1).T)] = np.arange(len(subsets))
+        tables[f'subsets{size}'] = subsets.astype(np.uint8)
+        tables[f'rank{size}'] = lookup
+    return tables
+
+@lru_cache(maxsize=None)
+def load_tables():
+    # Built once and kept in data/processed; read-only afterwards
+    path = os.path.join(PROCESSED_DIR, TABLES_FILENAME)
+    if os.path.exists(path):
+        with np.load(path) as data:
+            tables = {name: data[name] for name in data.files}
+        if int(tables.get('version', -1)) == TABLES_VERSION:
+            return _freeze(tables)
+    tables = build_tables()
+    if os.path.isdir(PROCESSED_DIR):
+        tmp_path = f"{path}.{os.getpid()}.tmp.npz"
+        np.savez(tmp_path, **tables)
+        os.replace(tmp_path, path)
+    return _freeze(tables)
+
+def _freeze(tables):
+    for array in tables.values():
+        array.flags.writeable = False
+    return tables
+
+def match_probabilities():
+    # (8, 2) P(k main matches, bonus hit) for one 7-number ticket and one draw;
+    # same layout as a ticket_scoring histogram row
+    return load_tables()['match_probs']
+
+def subset_probability(k):
+    return float(load_tables()['subset_probs'][k])
+
+def subset_ranks(subsets):
+    # Rank of each sorted pair/triplet by table lookup; other sizes fall back
+    # to rank_subsets
+    subsets = np.asarray(subsets, dtype=np.int64)
+    k = subsets.shape[-1]
+    if k not in (2, 3):
+        return rank_subsets(subsets)
+    return load_tables()[f'rank{k}'][tuple(np.moveaxis(subsets - 1, -1, 0))].astype(np.int64)
+
+def all_subsets(k):
+    # (C(50, k), k) every sorted pair/triplet, in rank order
+    return load_tables()[f'subsets{k}']
+
+@lru_cache(maxsize=64)
+def _binomial_tails(n, p, length):
+    # P(X <= x) and P(X >= x) for X ~ Binomial(n, p), x = 0..length - 1.
+    # The pmf comes from the ratio recurrence in log space, so no scipy and
+    # no overflow; the table runs far enough past the mean that the upper
+    # tail is summed directly rather than taken as 1 - cdf.
+    sd = np.sqrt(n * p * (1 - p))
+    end = int(min(n, max(length - 1, n * p + 40 * sd + 10)))
+    x = np.arange(1, end + 1)
+    log_pmf = np.empty(end + 1)
+    log_pmf[0] = n * np.log1p(-p)
+    log_pmf[1:] = log_pmf[0] + np.cumsum(np.log(n - x + 1) - np.log(x) + np.log(p / (1 - p)))
+    pmf = np.exp(log_pmf)
+    cdf = np.minimum(np.cumsum(pmf), 1.0)
+    sf = np.minimum(np.cumsum(pmf[::-1])[::-1], 1.0)
+    cdf, sf = np.resize(cdf, length), np.resize(sf, length)
+    # Counts past the table are beyond n or far out in the upper tail
+    cdf[end + 1:], sf[end + 1:] = 1.0, 0.0
+    cdf.flags.writeable = sf.flags.writeable = False
+    return cdf, sf
+
+def significance(counts, k, n_draws):
+    # Expected count, binomial z-score and exact two-sided p-value for each
+    # observed k-subset count over n_draws draws, all vectorized
+    counts = np.asarray(counts, dtype=np.int64)
+    p = subset_probability(k)
+    expected = n_draws * p
+    z = (counts - expected) / np.sqrt(n_draws * p * (1 - p))
+    cdf, sf = _binomial_tails(int(n_draws), p, int(counts.max(initial=0)) + 1)
+    p_value = np.minimum(1.0, 2 * np.minimum(cdf[counts], sf[counts]))
+    return np.full(counts.shape, expected), z, p_value
+
+def annotate(frame, n_draws):
+    # Add expected/z_score/p_value columns to a pair or triplet table
+    # (num1..numk + count, as written by pair_triplet_analysis)
+    k = sum(1 for col in frame.columns if col.startswith('num'))
+    expected, z, p_value = significance(frame['count'].to_numpy(), k, n_draws)
+    return frame.assign(expected=expected, z_score=z, p_value=p_value)
+
+def subset_counts(draws, k):
+    # Occurrence count of every pair/triplet, in rank order (zeros included)
+    from cooccurrence import indicator_matrix, pair_matrix, triplet_tensor
+    zero_based = tuple((all_subsets(k).astype(np.intp) - 1).T)
+    if k == 2:
+        return pair_matrix(indicator_matrix(draws))[zero_based]
+    return triplet_tensor(draws)[zero_based]
+
+def significance_frame(draws, k):
+    # All C(50, k) pairs/triplets with count and significance, most
+    # over-represented first (same tie order as the frequency tables)
+    import pandas as pd
+    counts = subset_counts(draws, k)
+    cols = [f"num{i + 1}" for i in range(k)]
+    frame = pd.DataFrame(all_subsets(k).astype(np.int64), columns=cols)
+    frame['count'] = counts
+    frame = annotate(frame, len(draws))
+    return frame.sort_values(['z_score'] + cols, ascending=[False] + [True] * k)
+
+@profiling.profiled()
+def probability_analysis(input_path):
+    draws = get_dataset(input_path).mains
+    probs = match_probabilities()
+    print("Odds per ticket and draw (7 of 50, bonus from the other 43):")
+    for matches in range(NUMBERS_PER_DRAW, -1, -1):
+        for hit in (1, 0):
+            p = probs[matches, hit]
+            if p > 0:
+                label = f"{matches}/7+bonus" if hit else f"{matches}/7"
+                print(f"  {label:<12} p = {p:.6e}   1 in {1 / p:,.1f}")
+    results = {}
+    for k, filename in ((2, PAIR_SIGNIFICANCE_FILENAME), (3, TRIPLET_SIGNIFICANCE_FILENAME)):
+        frame = significance_frame(draws, k)
+        frame.to_csv(os.path.join(PROCESSED_DIR, filename), index=False)
+        name = "pairs" if k == 2 else "triplets"
+        expected = frame['expected'].iloc[0]
+        print(f"\n{len(frame)} {name}; expected count per {name[:-1]} over {len(draws)} draws: {expected:.2f}")
+        print(f"Most over-represented {name}:")
+        print(frame.head(10).to_string(index=False))
+        print(f"{name.capitalize()} with p < 0.001: {int((frame['p_value'] < 0.001).sum())} "
+              f"(about {0.001 * len(frame):.1f} expected by chance)")
+        results[k] = frame
+    print(f"\nSignificance tables saved to {PROCESSED_DIR}/")
+    return results
+
+if __name__ == "__main__":
+    profiling.enable_from_argv()
+    input_path = os.path.join(PROCESSED_DIR, CLEANED_FILENAME)
+    if len(sys.argv) > 1:
+        # Look up one pair or triplet, e.g. probability_tables.py 5,12,23
+        subset = sorted(int(n) for n in sys.argv[1].split(','))
+        if len(subset) not in (2, 3) or len(set(subset)) != len(subset) or not all(1 <= n <= MAX_NUMBER for n in subset):
+            print("You must provide 2 or 3 distinct numbers between 1 and 50.")
+            sys.exit(1)
+        draws = get_dataset(input_path).mains
+        rank = subset_ranks(subset)
+        count = subset_counts(draws, len(subset))[rank]
+        expected, z, p_value = significance([count], len(subset), len(draws))
+        print(f"{tuple(subset)} (rank {rank}): {count} occurrences in {len(draws)} draws, "
+              f"expected {expected[0]:.2f}, z = {z[0]:+.2f}, p = {p_value[0]:.4f}")
+    else:
+        probability_analysis(input_path)
@@ -1,44 +1,125 @@
 import os
+import numpy as np
 import pandas as pd
+import profiling
+from cooccurrence import MAIN_COLS, MAX_NUMBER
+from draw_store import (RECORD_DTYPE, make_records, open_store, close_store, append_records,
+                        write_store_chunks, write_csv_chunks, store_path_for)
 
 RAW_DIR = "data/raw"
 PROCESSED_DIR = "data/processed"
-RAW_FILENAME = "lottomax_history.xlsx" 
+RAW_FILENAME = "lottomax_history.xlsx"
 PROCESSED_FILENAME = "lottomax_cleaned.csv"
 
-def clean_lottomax_data(input_path, output_path):
-    # Read Excel file
-    df = pd.read_excel(input_path)
-    
-    # Standardize column names
-    df.columns = [col.strip().lower() for col in df.columns]
-    
-    # Ensure required columns exist
-    required = ['draw_date', 'n1', 'n2', 'n3', 'n4', 'n5', 'n6', 'n7']
-    for col in required:
-        if col not in df.columns:
+# Raw rows validated and written per chunk
+CHUNK_ROWS = 100_000
+REQUIRED_COLS = ['draw_date'] + MAIN_COLS
+
+def _check_columns(columns):
+    # Standardize column names and ensure required columns exist
+    columns = [str(col).strip().lower() for col in columns]
+    for col in REQUIRED_COLS:
+        if col not in columns:
             raise ValueError(f"Missing required column: {col}")
-    
-    # Handle bonus column
-    if 'bonus' not in df.columns:
-        df['bonus'] = None
-    
-    # Convert draw_date to datetime and sort
-    df['draw_date'] = pd.to_datetime(df['draw_date'])
-    df = df.sort_values('draw_date')
-    
-    # Drop duplicates
-    df = df.drop_duplicates(subset=['draw_date', 'n1', 'n2', 'n3', 'n4', 'n5', 'n6', 'n7', 'bonus'])
-
-    # Reorder columns for consistency
-    output_cols = ['draw_date', 'n1', 'n2', 'n3', 'n4', 'n5', 'n6', 'n7', 'bonus']
-    df = df[output_cols]
-    
-    # Save cleaned data
-    df.to_csv(output_path, index=False)
+    return columns
+
+def iter_raw_chunks(input_path, chunksize=CHUNK_ROWS):
+    # DataFrames of at most chunksize raw rows; the workbook is read row by
+    # row in openpyxl read-only mode instead of being loaded whole
+    if os.path.splitext(input_path)[1].lower() == '.csv':
+        for chunk in pd.read_csv(input_path, chunksize=chunksize):
+            chunk.columns = _check_columns(chunk.columns)
+            yield chunk
+        return
+    from openpyxl import load_workbook
+    workbook = load_workbook(input_path, read_only=True, data_only=True)
+    try:
+        rows = workbook.active.iter_rows(values_only=True)
+        columns = _check_columns(next(rows, ()))
+        batch = []
+        for row in rows:
+            batch.append(row)
+            if len(batch) == chunksize:
+                yield pd.DataFrame(batch, columns=columns)
+                batch = []
+        if batch:
+            yield pd.DataFrame(batch, columns=columns)
+    finally:
+        workbook.close()
+
+def validate_chunk(chunk):
+    # Records for the valid rows of a raw chunk plus the number rejected: a
+    # parsable date, 7 distinct whole-number mains in 1..50 and an optional
+    # bonus in 0..50 that is not one of the mains
+    dates = pd.to_datetime(chunk['draw_date'], errors='coerce').to_numpy(dtype='datetime64[D]')
+    mains = chunk[MAIN_COLS].apply(pd.to_numeric, errors='coerce').to_numpy(dtype=float)
+    if 'bonus' in chunk.columns:
+        bonus = pd.to_numeric(chunk['bonus'], errors='coerce').to_numpy(dtype=float)
+    else:
+        bonus = np.full(len(chunk), np.nan)
+
+    valid = ~np.isnat(dates)
+    valid &= np.isfinite(mains).all(axis=1) & (mains == np.round(mains)).all(axis=1)
+    valid &= ((mains >= 1) & (mains <= MAX_NUMBER)).all(axis=1)
+    valid &= (np.diff(np.sort(mains, axis=1), axis=1) != 0).all(axis=1)
+    has_bonus = ~np.isnan(bonus)
+    bonus_ok = (bonus == np.round(bonus)) & (bonus >= 0) & (bonus <= MAX_NUMBER) & (mains != bonus[:, None]).all(axis=1)
+    valid &= ~has_bonus | bonus_ok
+
+    records = make_records(dates[valid], mains[valid].astype(np.int64), bonus[valid])
+    return records, int((~valid).sum())
+
+def _draw_keys(records):
+    # Packed (date, mains, bonus) key per record: its first 12 bytes, as a
+    # sortable V12 array
+    raw = np.ascontiguousarray(records).view(np.uint8).reshape(-1, RECORD_DTYPE.itemsize)
+    return np.ascontiguousarray(raw[:, :12]).view('V12').ravel()
+
+def _sorted_chunks(spool, order, chunksize):
+    # Copies of the spooled records in output order, chunksize at a time
+    for start in range(0, len(order), chunksize):
+        yield spool[order[start:start + chunksize]]
+
+@profiling.profiled()
+def clean_lottomax_data(input_path, output_path, chunksize=CHUNK_ROWS):
+    # Validated records are spooled to a temporary binary file; duplicates
+    # are then dropped and the rest sorted by date with whole-array
+    # operations over the spool's keys, so no per-row Python work is needed
+    spool_path = output_path + ".spool"
+    n_read = n_invalid = 0
+    if os.path.exists(spool_path):
+        os.remove(spool_path)
+    try:
+        for chunk in iter_raw_chunks(input_path, chunksize):
+            records, rejected = validate_chunk(chunk)
+            n_read += len(chunk)
+            n_invalid += rejected
+            if len(records):
+                append_records(records, spool_path)
+
+        spool = open_store(spool_path) if os.path.exists(spool_path) else np.zeros(0, dtype=RECORD_DTYPE)
+        try:
+            # Drop duplicates (keeping the first occurrence), then sort by draw date
+            _, first = np.unique(_draw_keys(spool), return_index=True)
+            first.sort()
+            n_duplicate = len(spool) - len(first)
+            order = first[np.argsort(spool['day'][first], kind='stable')]
+
+            # Save cleaned data, then the binary store so it is never older than the CSV
+            write_csv_chunks(_sorted_chunks(spool, order, chunksize), output_path)
+            write_store_chunks(_sorted_chunks(spool, order, chunksize), store_path_for(output_path))
+        finally:
+            close_store(spool)
+    finally:
+        if os.path.exists(spool_path):
+            os.remove(spool_path)
+
+    print(f"Read {n_read} rows: {n_invalid} invalid, {n_duplicate} duplicates dropped, "
+          f"{len(order)} draws kept")
     print(f"Cleaned data saved to {output_path}")
 
 if __name__ == "__main__":
+    profiling.enable_from_argv()
     input_path = os.path.join(RAW_DIR, RAW_FILENAME)
     output_path = os.path.join(PROCESSED_DIR, PROCESSED_FILENAME)
-    clean_lottomax_data(input_path, output_path)
\ No newline at end of file
+    clean_lottomax_data(input_path, output_path)
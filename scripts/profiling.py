@@ -0,0 +1,158 @@
+import os
+import sys
+import json
+import time
+import atexit
+import functools
+from contextlib import nullcontext
+
+# LOTTOMAX_PROFILE=1 turns timing on; a value ending in .json is also the
+# report path. LOTTOMAX_PROFILE_MEMORY=1 adds tracemalloc peaks (slow).
+ENV_VAR = "LOTTOMAX_PROFILE"
+MEMORY_ENV_VAR = "LOTTOMAX_PROFILE_MEMORY"
+PROFILE_DIR = "data/processed/profiles"
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+ENABLED = False
+_TRACE_MEMORY = False
+_REPORT_PATH = None
+_STARTED = None
+_RECORDS = []
+_STACK = []
+_OFF = nullcontext()
+
+def enable(report_path=None, trace_memory=False):
+    # Start recording; the report is written at interpreter exit
+    global ENABLED, _TRACE_MEMORY, _REPORT_PATH, _STARTED
+    if not ENABLED:
+        atexit.register(dump)
+        _STARTED = time.strftime('%Y-%m-%dT%H:%M:%S')
+    ENABLED = True
+    _REPORT_PATH = report_path or _REPORT_PATH
+    if trace_memory and not _TRACE_MEMORY:
+        import tracemalloc
+        tracemalloc.start()
+        _TRACE_MEMORY = True
+
+def enable_from_argv(argv=None):
+    # Strip --profile / --profile-memory from argv (sys.argv by default, in
+    # place) so each script's own argument parsing never sees them
+    argv = sys.argv if argv is None else argv
+    flags = {'--profile', '--profile-memory'} & set(argv)
+    if flags:
+        argv[:] = [arg for arg in argv if arg not in flags]
+        enable(trace_memory='--profile-memory' in flags)
+    return argv
+
+def _peak_rss_mb():
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KiB on Linux, bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+class _Stage:
+    def __init__(self, name, tag):
+        self.name = name
+        self.tag = tag
+
+    def __enter__(self):
+        if _TRACE_MEMORY:
+            import tracemalloc
+            current, peak = tracemalloc.get_traced_memory()
+            if _STACK:
+                # Keep the enclosing stage's peak before resetting it for this one
+                _STACK[-1].child_peak = max(_STACK[-1].child_peak, peak)
+            tracemalloc.reset_peak()
+            self.start_traced = current
+            self.child_peak = 0
+        _STACK.append(self)
+        self.start_wall = time.perf_counter()
+        self.start_cpu = time.process_time()
+        return self
+
+    def __exit__(self, *exc):
+        wall = time.perf_counter() - self.start_wall
+        cpu = time.process_time() - self.start_cpu
+        _STACK.pop()
+        record = {'stage': self.name, 'wall_s': wall, 'cpu_s': cpu, 'peak_rss_mb': _peak_rss_mb()}
+        if self.tag is not None:
+            record['tag'] = str(self.tag)
+        if _TRACE_MEMORY:
+            import tracemalloc
+            peak = max(tracemalloc.get_traced_memory()[1], self.child_peak)
+            record['traced_peak_mb'] = (peak - self.start_traced) / (1024 * 1024)
+            if _STACK:
+                _STACK[-1].child_peak = max(_STACK[-1].child_peak, peak)
+        record['depth'] = len(_STACK)
+        _RECORDS.append(record)
+        return False
+
+def stage(name, tag=None):
+    # Context manager timing one stage; a shared no-op when profiling is off
+    if not ENABLED:
+        return _OFF
+    return _Stage(name, tag)
+
+def profiled(name=None):
+    # Decorator form of stage(), named after the function by default
+    def decorate(func):
+        # Module from the file name so scripts run as __main__ keep their name
+        module = os.path.splitext(os.path.basename(func.__code__.co_filename))[0]
+        stage_name = name or f"{module}.{func.__qualname__}"
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not ENABLED:
+                return func(*args, **kwargs)
+            with _Stage(stage_name, None):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorate
+
+def records():
+    return list(_RECORDS)
+
+def summary():
+    # Per-stage totals: calls, wall/CPU seconds and the largest memory figures
+    totals = {}
+    for record in _RECORDS:
+        entry = totals.setdefault(record['stage'], {'calls': 0, 'wall_s': 0.0, 'cpu_s': 0.0})
+        entry['calls'] += 1
+        entry['wall_s'] += record['wall_s']
+        entry['cpu_s'] += record['cpu_s']
+        for key in ('peak_rss_mb', 'traced_peak_mb'):
+            if record.get(key) is not None:
+                entry[key] = max(entry.get(key, 0.0), record[key])
+    return totals
+
+def default_report_path():
+    script = os.path.splitext(os.path.basename(sys.argv[0] or ''))[0].lstrip('-') or 'python'
+    return os.path.join(PROFILE_DIR, f"{script}_{time.strftime('%Y%m%d-%H%M%S')}_{os.getpid()}.json")
+
+def dump(path=None):
+    # Write the run's records and per-stage summary as JSON
+    if not _RECORDS:
+        return None
+    path = path or _REPORT_PATH or default_report_path()
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    report = {
+        'script': sys.argv[0],
+        'argv': sys.argv[1:],
+        'started': _STARTED,
+        'pid': os.getpid(),
+        'summary': summary(),
+        'records': _RECORDS,
+    }
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Profile written to {path}", file=sys.stderr)
+    return path
+
+_env = os.environ.get(ENV_VAR, '')
+if _env and _env != '0':
+    enable(_env if _env.endswith('.json') else None, trace_memory=os.environ.get(MEMORY_ENV_VAR, '') not in ('', '0'))
@@ -1,17 +1,20 @@
 import os
-import pandas as pd
+import sys
+import json
 import numpy as np
-from scipy.stats import chisquare
-from scipy.stats import norm
+import profiling
+from dataset import get_dataset
+from monte_carlo import history_statistics
 
 PROCESSED_DIR = "data/processed"
 CLEANED_FILENAME = "lottomax_cleaned.csv"
+REPORT_FILENAME = "randomness_report.json"
 
+@profiling.profiled()
 def chi_square_test(input_path):
-    df = pd.read_csv(input_path)
-    main_cols = ['n1', 'n2', 'n3', 'n4', 'n5', 'n6', 'n7']
-    all_numbers = df[main_cols].to_numpy().flatten()
-    all_numbers = pd.Series(all_numbers)
+    from scipy.stats import chisquare
+    dataset = get_dataset(input_path)
+    all_numbers = dataset.main_series
     
     # Count occurrences of each number (1-50)
     observed = all_numbers.value_counts().sort_index()
@@ -22,7 +25,7 @@ def chi_square_test(input_path):
     observed = observed.sort_index()
     
     # Expected frequency: each number should appear equally often
-    total_draws = len(df)
+    total_draws = dataset.n_draws
     expected = [total_draws * 7 / 50] * 50  # 7 numbers per draw, 50 possible numbers
     
     # Chi-square test
@@ -37,23 +40,17 @@ def chi_square_test(input_path):
         print("Result: Significant deviation from randomness (reject H0).")
 
 
+@profiling.profiled()
 def runs_test(input_path):
-    df = pd.read_csv(input_path)
-    main_cols = ['n1', 'n2', 'n3', 'n4', 'n5', 'n6', 'n7']
-    all_numbers = df[main_cols].to_numpy().flatten()
-    all_numbers = pd.Series(all_numbers)
+    from scipy.stats import norm
+    dataset = get_dataset(input_path)
 
-    # Convert numbers to 'L' (low: 1-25) and 'H' (high: 26-50)
-    hl_seq = all_numbers.apply(lambda x: 'L' if x <= 25 else 'H').tolist()
+    # High (26-50) / low (1-25) sequence; a run ends wherever it flips
+    high = dataset.high_low
+    runs = 1 + int(np.count_nonzero(np.diff(high)))
 
-    # Count runs
-    runs = 1
-    for i in range(1, len(hl_seq)):
-        if hl_seq[i] != hl_seq[i-1]:
-            runs += 1
-
-    n_L = hl_seq.count('L')
-    n_H = hl_seq.count('H')
+    n_H = int(np.count_nonzero(high))
+    n_L = len(high) - n_H
 
     # Expected number of runs
     expected_runs = ((2 * n_L * n_H) / (n_L + n_H)) + 1
@@ -77,11 +74,10 @@ def runs_test(input_path):
         print("Result: Significant deviation from randomness (reject H0).")
 
 
+@profiling.profiled()
 def serial_correlation_test(input_path):
-    df = pd.read_csv(input_path)
-    main_cols = ['n1', 'n2', 'n3', 'n4', 'n5', 'n6', 'n7']
-    all_numbers = df[main_cols].to_numpy().flatten()
-    all_numbers = pd.Series(all_numbers)
+    dataset = get_dataset(input_path)
+    all_numbers = dataset.main_series
     # Shift by 1 to compare each number to the next
     x = all_numbers[:-1]
     y = all_numbers[1:]
@@ -94,11 +90,10 @@ def serial_correlation_test(input_path):
         print("Result: Significant serial correlation (possible non-randomness).")
 
 
+@profiling.profiled()
 def entropy_test(input_path):
-    df = pd.read_csv(input_path)
-    main_cols = ['n1', 'n2', 'n3', 'n4', 'n5', 'n6', 'n7']
-    all_numbers = df[main_cols].to_numpy().flatten()
-    all_numbers = pd.Series(all_numbers)
+    dataset = get_dataset(input_path)
+    all_numbers = dataset.main_series
     freq = all_numbers.value_counts(normalize=True)
     entropy = -np.sum(freq * np.log2(freq))
     max_entropy = np.log2(50)
@@ -111,8 +106,72 @@ def entropy_test(input_path):
     else:
         print("Result: Entropy is lower than expected (possible non-randomness).")
 
+@profiling.profiled()
+def run_all_tests(input_path, report_path=None):
+    # All four tests from one vectorized pass over the draw array, written
+    # as a machine-readable report (JSON, or CSV if report_path ends in .csv)
+    from scipy.stats import chi2 as chi2_dist, norm
+    dataset = get_dataset(input_path)
+    stats = {name: float(v[0]) for name, v in history_statistics(dataset.mains[None]).items()}
+    max_entropy = float(np.log2(50))
+    results = {
+        'chi_square': {
+            'statistic': stats['chi2'],
+            'p_value': float(chi2_dist.sf(stats['chi2'], df=49)),
+        },
+        'runs': {
+            'statistic': stats['runs_z'],
+            'p_value': float(2 * (1 - norm.cdf(abs(stats['runs_z'])))),
+        },
+        'serial_correlation': {
+            'statistic': stats['serial_corr'],
+            'p_value': None,
+        },
+        'entropy': {
+            'statistic': stats['entropy'],
+            'p_value': None,
+            'max_entropy': max_entropy,
+        },
+    }
+    # Same decision rules as the interactive tests
+    results['chi_square']['random'] = results['chi_square']['p_value'] > 0.05
+    results['runs']['random'] = results['runs']['p_value'] > 0.05
+    results['serial_correlation']['random'] = abs(stats['serial_corr']) < 0.05
+    results['entropy']['random'] = abs(stats['entropy'] - max_entropy) < 0.1
+    report = {
+        'input': input_path,
+        'n_draws': dataset.n_draws,
+        'last_draw_date': str(dataset.dates.max()) if dataset.n_draws else None,
+        'tests': results,
+    }
+
+    report_path = report_path or os.path.join(PROCESSED_DIR, REPORT_FILENAME)
+    if report_path.endswith('.csv'):
+        import csv
+        with open(report_path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['test', 'statistic', 'p_value', 'random', 'n_draws', 'last_draw_date'])
+            for name, r in results.items():
+                writer.writerow([name, r['statistic'], r['p_value'], r['random'],
+                                 report['n_draws'], report['last_draw_date']])
+    else:
+        with open(report_path, 'w') as f:
+            json.dump(report, f, indent=2)
+
+    for name, r in results.items():
+        p_value = 'N/A' if r['p_value'] is None else f"{r['p_value']:.4f}"
+        verdict = 'consistent with randomness' if r['random'] else 'possible non-randomness'
+        print(f"{name}: statistic={r['statistic']:.4f}, p-value={p_value} ({verdict})")
+    print(f"Randomness report saved to {report_path}")
+    return report
+
 if __name__ == "__main__":
+    profiling.enable_from_argv()
     input_path = os.path.join(PROCESSED_DIR, CLEANED_FILENAME)
+    if len(sys.argv) > 1 and sys.argv[1] == "--all":
+        # Non-interactive batch mode: randomness_tests.py --all [report_path]
+        run_all_tests(input_path, sys.argv[2] if len(sys.argv) > 2 else None)
+        sys.exit(0)
     while True:
         print("\nChoose a randomness test:")
         print("1. Chi-square test")
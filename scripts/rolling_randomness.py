@@ -0,0 +1,127 @@
+import os
+import sys
+import argparse
+import numpy as np
+import profiling
+from dataset import get_dataset
+
+PROCESSED_DIR = "data/processed"
+CLEANED_FILENAME = "lottomax_cleaned.csv"
+OUTPUT_FILENAME = "rolling_randomness.csv"
+
+def _prefix(a):
+    # Prefix sums with a leading 0: sum(a[i:j]) == p[j] - p[i]
+    out = np.zeros(len(a) + 1, dtype=np.float64 if a.dtype.kind == 'f' else np.int64)
+    np.cumsum(a, out=out[1:])
+    return out
+
+def window_bounds(n_draws, window=None, min_draws=None):
+    # (start, stop) draw indices per window ending at each draw; window=None
+    # gives an expanding window from the first draw
+    min_draws = min_draws or window or 2
+    stops = np.arange(min_draws, n_draws + 1)
+    starts = np.zeros_like(stops) if window is None else stops - window
+    return starts, stops
+
+def rolling_statistics(mains, indicator, starts, stops, lag=1):
+    # Chi-square, entropy, runs Z and lag-k serial correlation for every
+    # [start, stop) draw window in O(N * 50) total, from prefix sums
+    from scipy.stats import chi2 as chi2_dist
+    if lag < 1:
+        raise ValueError(f"Serial correlation lag must be at least 1, got {lag}")
+    n_per_draw = mains.shape[1]
+    n_numbers = indicator.shape[1]
+    window_draws = (stops - starts).astype(np.float64)
+
+    # Per-number counts from cumulative indicator counts
+    cum_counts = np.zeros((len(indicator) + 1, n_numbers), dtype=np.int64)
+    np.cumsum(indicator, axis=0, out=cum_counts[1:])
+    counts = cum_counts[stops] - cum_counts[starts]
+    expected = window_draws * n_per_draw / n_numbers
+    chi2 = ((counts - expected[:, None]) ** 2).sum(axis=1) / expected
+    p = counts / counts.sum(axis=1, keepdims=True)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        entropy = -np.where(p > 0, p * np.log2(p), 0.0).sum(axis=1)
+
+    # Runs over the flattened high/low sequence
+    flat = mains.ravel().astype(np.float64)
+    first, last = starts * n_per_draw, stops * n_per_draw
+    high = flat > 25
+    cum_high = _prefix(high.astype(np.int64))
+    cum_changes = _prefix(np.concatenate([[0], np.diff(high.astype(np.int8)) != 0]).astype(np.int64))
+    n = (last - first).astype(np.float64)
+    runs = 1 + cum_changes[last] - cum_changes[first + 1]
+    n_h = (cum_high[last] - cum_high[first]).astype(np.float64)
+    n_l = n - n_h
+    expected_runs = 2 * n_l * n_h / n + 1
+    var_runs = (2 * n_l * n_h) * (2 * n_l * n_h - n_l - n_h) / (n ** 2 * (n - 1))
+    with np.errstate(divide='ignore', invalid='ignore'):
+        runs_z = np.where(var_runs > 0, (runs - expected_runs) / np.sqrt(var_runs), 0.0)
+
+    # Lag-k Pearson correlation from prefix sums of x, y, x^2, y^2, xy
+    # over the pairs (flat[i], flat[i + lag]) that fall inside the window;
+    # windows holding fewer than two such pairs get NaN
+    x, y = flat[:-lag], flat[lag:]
+    sums = [_prefix(v) for v in (x, y, x * x, y * y, x * y)]
+    short = (last - first) - lag < 2
+    pair_first = np.where(short, 0, first)
+    pair_stop = np.where(short, 0, last - lag)
+    m = (pair_stop - pair_first).astype(np.float64)
+    sx, sy, sxx, syy, sxy = (s[pair_stop] - s[pair_first] for s in sums)
+    with np.errstate(divide='ignore', invalid='ignore'):
+        cov = sxy - sx * sy / m
+        serial_corr = cov / np.sqrt((sxx - sx * sx / m) * (syy - sy * sy / m))
+    serial_corr[short] = np.nan
+
+    return {
+        'n_draws': (stops - starts),
+        'chi2': chi2,
+        'chi2_p_value': chi2_dist.sf(chi2, df=n_numbers - 1),
+        'entropy': entropy,
+        'runs_z': runs_z,
+        f'serial_corr_lag{lag}': serial_corr,
+    }
+
+def check_lag(lag, window=None):
+    # A fixed window of W draws holds 7 * W numbers, so lag-k pairs need k < 7 * W
+    if lag < 1:
+        raise ValueError(f"Serial correlation lag must be at least 1, got {lag}")
+    if window is not None and lag >= window * 7:
+        raise ValueError(f"Serial correlation lag must be below {window * 7} for a {window}-draw window, got {lag}")
+
+@profiling.profiled()
+def rolling_randomness(input_path, window=100, lag=1, min_draws=None, output_path=None):
+    # Time series of randomness statistics keyed by the window's last draw_date
+    import pandas as pd
+    check_lag(lag, window)
+    dataset = get_dataset(input_path)
+    starts, stops = window_bounds(dataset.n_draws, window, min_draws)
+    stats = rolling_statistics(dataset.mains, dataset.indicator, starts, stops, lag=lag)
+    result = pd.DataFrame(stats, index=pd.Index(dataset.dates[stops - 1].astype(str), name='draw_date'))
+    output_path = output_path or os.path.join(PROCESSED_DIR, OUTPUT_FILENAME)
+    result.to_csv(output_path)
+    mode = "expanding" if window is None else f"{window}-draw rolling"
+    print(f"{mode} randomness statistics for {len(result)} windows saved to {output_path}")
+    return result
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Rolling/expanding-window randomness statistics.")
+    parser.add_argument('--window', type=int, default=100, help="Window length in draws")
+    parser.add_argument('--expanding', action='store_true', help="Use an expanding window from the first draw")
+    parser.add_argument('--lag', type=int, default=1, help="Lag for the serial correlation")
+    parser.add_argument('--min-draws', type=int, default=None, help="First window size in expanding mode")
+    parser.add_argument('--output', default=None)
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    profiling.enable_from_argv()
+    args = parse_args(sys.argv[1:])
+    try:
+        check_lag(args.lag, None if args.expanding else args.window)
+    except ValueError as e:
+        print(e)
+        sys.exit(2)
+    input_path = os.path.join(PROCESSED_DIR, CLEANED_FILENAME)
+    result = rolling_randomness(input_path, None if args.expanding else args.window, args.lag,
+                                args.min_draws, args.output)
+    print(result.tail(10).to_string(float_format=lambda v: f"{v:.4f}"))
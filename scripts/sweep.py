@@ -0,0 +1,123 @@
+import os
+import sys
+import json
+import hashlib
+import argparse
+import warnings
+import itertools
+import numpy as np
+import profiling
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from prepare_ml_data import load_ml_matrix
+from ml_common import evaluate_lagged, data_fingerprint, shared_matrix_path
+
+PROCESSED_DIR = "data/processed"
+SWEEP_DIR = os.path.join(PROCESSED_DIR, "sweep_cache")
+SUMMARY_FILENAME = "sweep_summary.csv"
+
+# model type -> hyperparameter name -> values to try
+DEFAULT_GRID = {
+    'logistic': {'C': [0.1, 1.0]},
+    'rf': {'n_estimators': [100], 'max_depth': [None, 8]},
+}
+DEFAULT_LAGS = [1, 3, 10, 20, 54]
+
+def expand_grid(grid, lags):
+    configs = []
+    for model_type, space in grid.items():
+        names = sorted(space)
+        for values in itertools.product(*(space[name] for name in names)):
+            for n_lags in lags:
+                configs.append({'model': model_type, 'n_lags': n_lags, 'params': dict(zip(names, values))})
+    return configs
+
+def config_key(fingerprint, config):
+    payload = json.dumps({'data': fingerprint, **config}, sort_keys=True)
+    return hashlib.sha256(payload.encode()).hexdigest()[:20]
+
+def _result_path(key):
+    return os.path.join(SWEEP_DIR, "results", f"{key}.json")
+
+def _run_config(matrix_path, config, key):
+    # Worker: every process maps the same on-disk feature matrix read-only
+    warnings.simplefilter('ignore')
+    ml_matrix = np.load(matrix_path, mmap_mode='r')
+    accs, aucs = evaluate_lagged(ml_matrix, config['model'], config['n_lags'], config['params'], n_jobs=1)
+    result = {**config, 'mean_accuracy': float(np.mean(accs)), 'mean_roc_auc': float(np.nanmean(aucs))}
+    tmp_path = _result_path(key) + ".tmp"
+    with open(tmp_path, "w") as f:
+        json.dump(result, f)
+    os.replace(tmp_path, _result_path(key))
+    return result
+
+@profiling.profiled()
+def run_sweep(grid=None, lags=None, workers=None):
+    ml_matrix = load_ml_matrix()
+    fingerprint = data_fingerprint(ml_matrix)
+    os.makedirs(os.path.join(SWEEP_DIR, "results"), exist_ok=True)
+    matrix_path = shared_matrix_path(ml_matrix, SWEEP_DIR)
+
+    results = []
+    pending = []
+    for config in expand_grid(grid or DEFAULT_GRID, lags or DEFAULT_LAGS):
+        if config['n_lags'] >= len(ml_matrix) - 20:
+            print(f"Skipping n_lags={config['n_lags']}: not enough draws.")
+            continue
+        key = config_key(fingerprint, config)
+        if os.path.exists(_result_path(key)):
+            with open(_result_path(key)) as f:
+                results.append(json.load(f))
+        else:
+            pending.append((config, key))
+    print(f"{len(results)} cached, {len(pending)} to run (data {fingerprint}).")
+
+    if pending:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(_run_config, matrix_path, config, key) for config, key in pending]
+            for future in as_completed(futures):
+                result = future.result()
+                print(f"done: {result['model']} n_lags={result['n_lags']} {result['params']} "
+                      f"AUC={result['mean_roc_auc']:.3f}")
+                results.append(result)
+    return summarize(results)
+
+def summarize(results):
+    import pandas as pd
+    summary = pd.DataFrame([
+        {'model': r['model'], 'n_lags': r['n_lags'], 'params': json.dumps(r['params'], sort_keys=True),
+         'mean_roc_auc': r['mean_roc_auc'], 'mean_accuracy': r['mean_accuracy']}
+        for r in results
+    ])
+    if summary.empty:
+        return summary
+    summary = summary.sort_values(['mean_roc_auc', 'mean_accuracy'], ascending=False).reset_index(drop=True)
+    summary.index += 1
+    summary.to_csv(os.path.join(PROCESSED_DIR, SUMMARY_FILENAME), index_label='rank')
+    print("\nSweep results (ranked by mean ROC-AUC):")
+    print(summary.to_string(float_format=lambda v: f"{v:.3f}"))
+    print(f"\nSummary saved to {os.path.join(PROCESSED_DIR, SUMMARY_FILENAME)}")
+    return summary
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Parallel model x n_lags x hyperparameter sweep.")
+    parser.add_argument('--models', nargs='+', choices=sorted(DEFAULT_GRID), default=None,
+                        help="Model types to sweep (default: every model in the grid)")
+    parser.add_argument('--lags', nargs='+', type=int, default=DEFAULT_LAGS)
+    parser.add_argument('--grid', help="JSON file mapping model type to {param: [values]}")
+    parser.add_argument('--workers', type=int, default=None, help="Worker processes (default: all cores)")
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    profiling.enable_from_argv()
+    args = parse_args(sys.argv[1:])
+    grid = DEFAULT_GRID
+    if args.grid:
+        with open(args.grid) as f:
+            grid = json.load(f)
+    if args.models:
+        missing = [model for model in args.models if model not in grid]
+        if missing:
+            print(f"Not in the grid: {', '.join(missing)}")
+            sys.exit(2)
+        grid = {model: grid[model] for model in args.models}
+    run_sweep(grid, args.lags, args.workers)
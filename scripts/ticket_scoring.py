@@ -0,0 +1,129 @@
+import os
+import sys
+import time
+import argparse
+import numpy as np
+import profiling
+from concurrent.futures import ProcessPoolExecutor
+from draw_store import load_draws, presence_masks, bonus
+
+PROCESSED_DIR = "data/processed"
+CLEANED_FILENAME = "lottomax_cleaned.csv"
+
+# Ticket x draw cells scored per chunk (each cell is a uint64 AND + popcount)
+CHUNK_CELLS = 4_000_000
+# Prize categories as (main matches, bonus required)
+PRIZE_CATEGORIES = [(7, False), (6, True), (6, False), (5, True), (5, False),
+                    (4, True), (4, False), (3, True), (3, False)]
+
+if hasattr(np, 'bitwise_count'):
+    popcount = np.bitwise_count
+else:
+    _BYTE_COUNTS = np.array([bin(i).count('1') for i in range(256)], dtype=np.uint8)
+
+    def popcount(x):
+        # Per-byte lookup for numpy < 2.0
+        x = np.ascontiguousarray(x, dtype=np.uint64)
+        return _BYTE_COUNTS[x.view(np.uint8)].reshape(x.shape + (8,)).sum(axis=-1, dtype=np.uint8)
+
+def draw_masks(records):
+    # Main-number masks straight from the store, plus a one-bit bonus mask
+    # (0 when the bonus is missing or outside 1..50)
+    b = bonus(records).astype(np.int64)
+    valid = (b >= 1) & (b <= 50)
+    bonus_masks = np.where(valid, np.left_shift(np.uint64(1), np.where(valid, b - 1, 0).astype(np.uint64)),
+                           np.uint64(0)).astype(np.uint64)
+    return np.asarray(records['mask'], dtype=np.uint64), bonus_masks
+
+def _score_chunk(ticket_masks, main_masks, bonus_masks):
+    # (tickets, 8, 2) counts of draws by main matches (0..7) x bonus hit
+    n_tickets = len(ticket_masks)
+    hist = np.zeros((n_tickets, 16), dtype=np.int32)
+    step = max(1, CHUNK_CELLS // max(1, len(main_masks)))
+    for start in range(0, n_tickets, step):
+        t = ticket_masks[start:start + step, None]
+        # uint8 cell code = 2 * main matches + bonus hit, kept narrow until the bincount
+        code = popcount(t & main_masks[None, :])
+        code <<= 1
+        code |= popcount(t & bonus_masks[None, :])
+        offsets = (16 * np.arange(len(t), dtype=np.intp))[:, None]
+        cells = np.add(code, offsets, dtype=np.intp)
+        hist[start:start + step] = np.bincount(cells.ravel(), minlength=16 * len(t)).reshape(len(t), 16)
+    return hist
+
+def score_tickets(tickets, records, workers=None):
+    # Match histogram of every 7-number ticket against every historical draw:
+    # hist[i, m, b] = draws where ticket i matched m mains and (b=1) the bonus
+    tickets = np.asarray(tickets)
+    if tickets.ndim != 2 or tickets.shape[1] != 7:
+        raise ValueError(f"Expected a (tickets, 7) array of numbers, got shape {tickets.shape}")
+    return score_masks(presence_masks(tickets), records, workers)
+
+@profiling.profiled()
+def score_masks(ticket_masks, records, workers=None):
+    # score_tickets for tickets already encoded as uint64 presence masks
+    ticket_masks = np.asarray(ticket_masks, dtype=np.uint64).ravel()
+    main_masks, bonus_masks = draw_masks(records)
+    if workers == 1 or len(ticket_masks) * len(main_masks) <= CHUNK_CELLS:
+        return _score_chunk(ticket_masks, main_masks, bonus_masks).reshape(-1, 8, 2)
+    n_parts = (workers or os.cpu_count() or 1) * 4
+    parts = np.array_split(ticket_masks, n_parts)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        hists = list(pool.map(_score_chunk, parts, [main_masks] * n_parts, [bonus_masks] * n_parts))
+    return np.concatenate(hists).reshape(-1, 8, 2)
+
+def prize_table(hist):
+    # Per-ticket counts for each prize category (e.g. '6/7+bonus')
+    import pandas as pd
+    columns = {}
+    for matches, needs_bonus in PRIZE_CATEGORIES:
+        label = f"{matches}/7+bonus" if needs_bonus else f"{matches}/7"
+        columns[label] = hist[:, matches, 1] if needs_bonus else (hist[:, matches, 0] if matches < 7 else hist[:, 7].sum(axis=1))
+    return pd.DataFrame(columns)
+
+def read_tickets(path):
+    # 7 numbers per row; a header row or stray text rows are skipped
+    import pandas as pd
+    frame = pd.read_csv(path, header=None).apply(pd.to_numeric, errors='coerce').dropna()
+    return frame.to_numpy(dtype=np.int64)
+
+def random_tickets(n_tickets, seed=0):
+    rng = np.random.default_rng(seed)
+    return np.argpartition(rng.random((n_tickets, 50)), 7, axis=1)[:, :7] + 1
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Score candidate tickets against every historical draw.")
+    parser.add_argument('tickets', nargs='?', help="CSV of tickets, 7 numbers per row (header optional)")
+    parser.add_argument('--random', type=int, default=None, help="Score N random tickets instead (benchmark)")
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--output', default=None, help="CSV for the per-ticket prize table")
+    return parser.parse_args(argv)
+
+if __name__ == "__main__":
+    profiling.enable_from_argv()
+    args = parse_args(sys.argv[1:])
+    if args.random:
+        tickets = random_tickets(args.random)
+    elif args.tickets:
+        tickets = read_tickets(args.tickets)
+    else:
+        print("Provide a tickets CSV or --random N.")
+        sys.exit(1)
+    if tickets.shape[1] != 7 or (tickets < 1).any() or (tickets > 50).any() \
+            or (np.diff(np.sort(tickets, axis=1), axis=1) == 0).any():
+        print("Each ticket must have 7 distinct numbers between 1 and 50.")
+        sys.exit(1)
+
+    records = load_draws(os.path.join(PROCESSED_DIR, CLEANED_FILENAME))
+    start = time.perf_counter()
+    hist = score_tickets(tickets, records, args.workers)
+    elapsed = time.perf_counter() - start
+    table = prize_table(hist)
+    print(f"Scored {len(tickets)} tickets against {len(records)} draws in {elapsed:.2f}s")
+    print("\nTotal wins across all tickets:")
+    print(table.sum().to_string())
+    if args.output:
+        table.to_csv(args.output, index_label='ticket')
+        print(f"\nPer-ticket prize table saved to {args.output}")
+    elif len(table) <= 20:
+        print(table.to_string())
@@ -0,0 +1,33 @@
+import os
+import sys
+import numpy as np
+import pytest
+
+SCRIPTS_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "scripts")
+sys.path.insert(0, SCRIPTS_DIR)
+
+@pytest.fixture
+def workdir(tmp_path, monkeypatch):
+    # Empty data/raw and data/processed tree as the working directory, since
+    # the scripts resolve their paths relative to it
+    import dataset
+    (tmp_path / "data" / "raw").mkdir(parents=True)
+    (tmp_path / "data" / "processed").mkdir()
+    monkeypatch.chdir(tmp_path)
+    dataset.invalidate()
+    yield tmp_path
+    dataset.invalidate()
+
+@pytest.fixture
+def history(workdir):
+    # 400 uniform 7-of-50 + bonus draws, twice weekly, in the cleaned schema
+    import pandas as pd
+    rng = np.random.default_rng(1)
+    picks = np.argpartition(rng.random((400, 50)), 7, axis=1)[:, :8] + 1
+    days = np.datetime64('2009-09-25') + np.arange(400) * 7 // 2
+    df = pd.DataFrame(np.sort(picks[:, :7], axis=1), columns=['n1', 'n2', 'n3', 'n4', 'n5', 'n6', 'n7'])
+    df.insert(0, 'draw_date', days.astype(str))
+    df['bonus'] = picks[:, 7]
+    path = os.path.join("data", "processed", "lottomax_cleaned.csv")
+    df.to_csv(path, index=False)
+    return path
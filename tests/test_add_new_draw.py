@@ -0,0 +1,81 @@
+import multiprocessing
+import numpy as np
+import pandas as pd
+import pytest
+from draw_store import file_lock, load_draws, store_path_for, to_frame, write_csv_chunks, write_store
+from add_new_draw import add_draws, parse_draw, read_draws
+
+def as_draws(records):
+    return [(row['day'].astype('datetime64[D]'), row['numbers'][:7].tolist(), int(row['numbers'][7]))
+            for row in records]
+
+def assert_consistent(path):
+    # CSV and binary store hold the same strictly date-ordered history
+    records = load_draws(path)
+    assert (np.diff(records['day']) > 0).all()
+    assert to_frame(records).to_csv(index=False) == pd.read_csv(path).to_csv(index=False)
+
+@pytest.mark.parametrize("fields", [
+    ("2024-13-01", [1, 2, 3, 4, 5, 6, 7], 8),
+    ("yesterday", [1, 2, 3, 4, 5, 6, 7], 8),
+    ("NaT", [1, 2, 3, 4, 5, 6, 7], 8),
+    (" nat ", [1, 2, 3, 4, 5, 6, 7], 8),
+    ("2024-01-02", [1, 2, 3, 4, 5, 6], 8),
+    ("2024-01-02", [1, 1, 3, 4, 5, 6, 7], 8),
+    ("2024-01-02", [0, 2, 3, 4, 5, 6, 7], 8),
+    ("2024-01-02", [1, 2, 3, 4, 5, 6, 51], 8),
+    ("2024-01-02", [1, 2, 3, 4, 5, 6, 7], 7),
+    ("2024-01-02", [1, 2, 3, 4, 5, 6, 'x'], 8),
+])
+def test_parse_draw_rejects_invalid_fields(fields):
+    with pytest.raises(ValueError):
+        parse_draw(*fields)
+
+def test_read_draws_skips_header_and_reports_line():
+    draws = read_draws(["draw_date,n1,n2,n3,n4,n5,n6,n7,bonus\n", "\n", "2024-01-02, 7,6,5,4,3,2,1, 8\n"])
+    assert draws == [(np.datetime64('2024-01-02'), [7, 6, 5, 4, 3, 2, 1], 8)]
+    with pytest.raises(ValueError, match="Line 2"):
+        read_draws(["2024-01-02,1,2,3,4,5,6,7,8\n", "2024-01-05,1,2,3,4,5,6,7\n"])
+    with pytest.raises(ValueError, match="Line 1"):
+        read_draws(["NaT,1,2,3,4,5,6,7,8\n"])
+
+def test_duplicate_dates_are_skipped(history, capsys):
+    records = np.array(load_draws(history))
+    write_csv_chunks([records[:390]], history)
+    write_store(records[:390], store_path_for(history))
+    new = as_draws(records[390:392])
+    earlier = as_draws(records[100:101])
+    assert add_draws(earlier + new + new[:1], history) == new
+    assert capsys.readouterr().out.count("already exists") == 2
+    assert len(load_draws(history)) == 392
+    assert add_draws(new, history) == []
+    assert_consistent(history)
+
+def test_older_missing_draw_is_merged_into_place(history):
+    records = np.array(load_draws(history))
+    kept = np.delete(records, 200)
+    write_csv_chunks([kept], history)
+    write_store(kept, store_path_for(history))
+    assert add_draws(as_draws(records[200:201]), history)
+    assert np.array_equal(np.asarray(load_draws(history)), records)
+    assert_consistent(history)
+
+def _append_in_child(path, draws):
+    add_draws(draws, path)
+
+def test_appends_wait_for_the_write_lock(history):
+    records = np.array(load_draws(history))
+    write_csv_chunks([records[:399]], history)
+    write_store(records[:399], store_path_for(history))
+    context = multiprocessing.get_context('fork')
+    with file_lock(history):
+        child = context.Process(target=_append_in_child, args=(history, as_draws(records[399:])))
+        child.start()
+        child.join(1.0)
+        # Blocked on the lock: nothing written yet
+        assert child.is_alive()
+        assert len(load_draws(history)) == 399
+    child.join(30)
+    assert child.exitcode == 0
+    assert np.array_equal(np.asarray(load_draws(history)), records)
+    assert_consistent(history)
@@ -0,0 +1,59 @@
+import os
+import numpy as np
+import pandas as pd
+import benchmark
+from benchmark import (CLEANED_FILENAME, FIRST_DAY, LAST_DAY, MAX_SYNTHETIC_DRAWS, RAW_FILENAME,
+                       compare_to_baseline, parse_args, synthetic_history, write_synthetic_history)
+from draw_store import load_draws, to_frame
+from process_data import clean_lottomax_data
+
+def read_text(path):
+    with open(path) as f:
+        return f.read()
+
+def test_synthetic_history_is_a_clean_history(workdir):
+    write_synthetic_history(str(workdir), 1000, seed=2)
+    cleaned = os.path.join("data", "processed", CLEANED_FILENAME)
+    records = load_draws(cleaned)
+    assert len(records) == 1000
+    assert (np.diff(records['numbers'][:, :7].astype(int), axis=1) > 0).all()
+    assert not (records['numbers'][:, 7:] == records['numbers'][:, :7]).any()
+    assert to_frame(records).to_csv(index=False) == pd.read_csv(cleaned).to_csv(index=False)
+    # Cleaning the raw copy changes nothing
+    clean_lottomax_data(os.path.join("data", "raw", RAW_FILENAME), "data/processed/recleaned.csv")
+    assert read_text("data/processed/recleaned.csv") == read_text(cleaned)
+
+def history_days(n_draws):
+    return np.concatenate([chunk['day'] for chunk in synthetic_history(n_draws)])
+
+def test_synthetic_dates_are_unique_while_they_fit():
+    days = history_days(MAX_SYNTHETIC_DRAWS)
+    assert len(days) == MAX_SYNTHETIC_DRAWS
+    assert (np.diff(days) > 0).all()
+    assert days[0] == FIRST_DAY.astype(np.int64) and days[-1] == LAST_DAY.astype(np.int64)
+
+def test_longer_histories_share_dates():
+    n_draws = 3 * MAX_SYNTHETIC_DRAWS
+    days = history_days(n_draws)
+    assert len(days) == n_draws
+    assert (np.diff(days) >= 0).all()
+    assert days[0] == FIRST_DAY.astype(np.int64) and days[-1] == LAST_DAY.astype(np.int64)
+    assert np.bincount(days - days[0]).max() <= 4
+    assert parse_args(['--sizes', '1e6', '1e7']).sizes == [10**6, 10**7]
+
+def test_shared_dates_survive_cleaning(workdir, monkeypatch):
+    # 300 draws over 100 days: cleaning keeps every draw in generation order
+    monkeypatch.setattr(benchmark, 'LAST_DAY', FIRST_DAY + 99)
+    write_synthetic_history(str(workdir), 300, seed=3)
+    cleaned = os.path.join("data", "processed", CLEANED_FILENAME)
+    assert len(np.unique(load_draws(cleaned)['day'])) == 100
+    clean_lottomax_data(os.path.join("data", "raw", RAW_FILENAME), "data/processed/recleaned.csv")
+    assert read_text("data/processed/recleaned.csv") == read_text(cleaned)
+
+def test_compare_to_baseline():
+    baseline = {'a@1000': {'wall_s': 1.0}, 'b@1000': {'wall_s': 1.0}, 'c@1000': {'wall_s': 1.0}}
+    results = {'a@1000': {'wall_s': 1.2}, 'b@1000': {'wall_s': 1.5}, 'c@1000': {'error': 'MemoryError: '},
+               'd@1000': {'wall_s': 9.0}}
+    regressions = compare_to_baseline(results, baseline, tolerance=0.25)
+    assert [r[0] for r in regressions] == ['b@1000', 'c@1000']
+    assert regressions[0][3] == 1.5
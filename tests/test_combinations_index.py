@@ -0,0 +1,42 @@
+from collections import Counter
+from itertools import combinations
+from math import comb
+import numpy as np
+from benchmark_pair_triplet import synthetic_draws
+from combinations_index import DrawHistory, count_subsets, rank_subsets, unrank_subsets
+
+def test_rank_unrank_round_trip_is_exhaustive_for_pairs_and_triplets():
+    for k in (2, 3):
+        subsets = np.array(list(combinations(range(1, 51), k)))
+        ranks = rank_subsets(subsets)
+        assert np.array_equal(np.sort(ranks), np.arange(comb(50, k)))
+        assert np.array_equal(unrank_subsets(ranks, k), subsets)
+
+def test_rank_unrank_round_trip_for_larger_subsets():
+    rng = np.random.default_rng(0)
+    for k in range(4, 8):
+        ranks = rng.integers(0, comb(50, k), size=2000)
+        ranks[:2] = [0, comb(50, k) - 1]
+        subsets = unrank_subsets(ranks, k)
+        assert (np.diff(subsets, axis=1) > 0).all()
+        assert subsets.min() >= 1 and subsets.max() <= 50
+        assert np.array_equal(rank_subsets(subsets), ranks)
+    assert unrank_subsets([comb(50, 7) - 1], 7).tolist() == [[44, 45, 46, 47, 48, 49, 50]]
+
+def test_count_subsets_matches_counter():
+    draws = synthetic_draws(300, seed=5)
+    expected = Counter(c for draw in draws for c in combinations(sorted(draw), 4))
+    ranks, counts = count_subsets(draws, 4)
+    found = {tuple(s): int(n) for s, n in zip(unrank_subsets(ranks, 4).tolist(), counts)}
+    assert found == dict(expected)
+
+def test_draw_history_lookups():
+    history = DrawHistory(np.array([[1, 2, 3, 4, 5, 6, 7], [10, 20, 30, 40, 41, 42, 43]]))
+    tickets = [[7, 6, 5, 4, 3, 2, 1], [1, 2, 3, 4, 5, 6, 8], [1, 2, 3, 4, 5, 9, 8]]
+    assert history.drawn(tickets).tolist() == [True, False, False]
+    assert history.six_subset_drawn(tickets).tolist() == [True, True, False]
+
+def test_empty_draw_history():
+    history = DrawHistory(np.zeros((0, 7), dtype=np.int64))
+    assert history.drawn([1, 2, 3, 4, 5, 6, 7]).tolist() == [False]
+    assert history.six_subset_drawn([[1, 2, 3, 4, 5, 6, 7], [8, 9, 10, 11, 12, 13, 14]]).tolist() == [False, False]
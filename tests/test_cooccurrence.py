@@ -0,0 +1,54 @@
+from collections import Counter
+from itertools import combinations
+import pandas as pd
+import cooccurrence
+from benchmark_pair_triplet import parse_args, run_benchmark, synthetic_draws
+from cooccurrence import MAIN_COLS, indicator_matrix, pair_matrix, pair_triplet_counts, triplet_tensor
+
+def legacy_tables(df):
+    # The original iterrows + Counter implementation
+    pair_counter = Counter()
+    triplet_counter = Counter()
+    for _, row in df.iterrows():
+        numbers = [row[col] for col in MAIN_COLS]
+        for pair in combinations(sorted(numbers), 2):
+            pair_counter[pair] += 1
+        for triplet in combinations(sorted(numbers), 3):
+            triplet_counter[triplet] += 1
+    pair_df = pd.DataFrame(
+        [(a, b, count) for (a, b), count in pair_counter.items()],
+        columns=['num1', 'num2', 'count']
+    ).sort_values(['count', 'num1', 'num2'], ascending=[False, True, True])
+    triplet_df = pd.DataFrame(
+        [(a, b, c, count) for (a, b, c), count in triplet_counter.items()],
+        columns=['num1', 'num2', 'num3', 'count']
+    ).sort_values(['count', 'num1', 'num2', 'num3'], ascending=[False, True, True, True])
+    return pair_df, triplet_df
+
+def test_tables_match_legacy_csv_output():
+    draws = synthetic_draws(500, seed=3)
+    pair_df, triplet_df = pair_triplet_counts(draws)
+    legacy_pairs, legacy_triplets = legacy_tables(pd.DataFrame(draws, columns=MAIN_COLS))
+    assert pair_df.to_csv(index=False) == legacy_pairs.to_csv(index=False)
+    assert triplet_df.to_csv(index=False) == legacy_triplets.to_csv(index=False)
+
+def test_matrix_totals():
+    draws = synthetic_draws(1000, seed=4)
+    pairs = pair_matrix(indicator_matrix(draws))
+    assert (pairs == pairs.T).all()
+    assert pairs.trace() == 7 * len(draws)
+    assert triplet_tensor(draws).sum() == 35 * len(draws)
+
+def test_chunked_triplet_tensor_matches_single_pass(monkeypatch):
+    draws = synthetic_draws(1000, seed=4)
+    whole = triplet_tensor(draws)
+    monkeypatch.setattr(cooccurrence, 'TRIPLET_CHUNK', 7)
+    assert (triplet_tensor(draws) == whole).all()
+
+def test_benchmark_labels_extrapolated_legacy_timings(capsys):
+    rows = run_benchmark([200, 500], legacy_max_draws=300)
+    assert [row['legacy_measured'] for row in rows] == [True, False]
+    lines = capsys.readouterr().out.splitlines()
+    assert lines[1].endswith("measured") and lines[2].endswith("estimate (timed on 300 draws)")
+    assert all(row['legacy_measured'] for row in run_benchmark([500], legacy_max_draws=None))
+    assert parse_args(['1e5', '1e6', '--full-legacy']).sizes == [10**5, 10**6]
@@ -0,0 +1,21 @@
+import os
+import numpy as np
+import pandas as pd
+from draw_store import RECORD_DTYPE, append_records, indicator, load_draws, mains, open_store, store_path_for, to_frame
+
+def test_store_round_trips_the_csv(history):
+    records = load_draws(history)
+    assert os.path.getsize(store_path_for(history)) == 400 * RECORD_DTYPE.itemsize
+    assert to_frame(records).to_csv(index=False) == pd.read_csv(history).to_csv(index=False)
+    ind = indicator(records)
+    assert (ind.sum(axis=1) == 7).all()
+    assert (np.take_along_axis(ind, mains(records).astype(np.int64) - 1, axis=1) == 1).all()
+
+def test_append_and_torn_tail(history):
+    records = np.array(load_draws(history))
+    path = "data/processed/copy.bin"
+    append_records(records[:10], path)
+    append_records(records[10:12], path)
+    with open(path, 'ab') as f:
+        f.write(b'\x01' * 7)
+    assert np.array_equal(np.asarray(open_store(path)), records[:12])
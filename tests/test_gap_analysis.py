@@ -0,0 +1,23 @@
+import numpy as np
+from dataset import get_dataset
+from gap_analysis import build_gap_state, gap_summary
+
+def naive_gaps(mains, number):
+    positions = [i for i, draw in enumerate(mains) if number in draw]
+    return positions, np.diff(positions)
+
+def test_gap_state_matches_per_number_scan(history):
+    dataset = get_dataset(history)
+    state = build_gap_state(dataset)
+    summary = gap_summary(state, 'main')
+    n = dataset.n_draws
+    for number in (1, 17, 50):
+        positions, gaps = naive_gaps(dataset.mains.tolist(), number)
+        assert state['main_last_seen'][number] == positions[-1]
+        assert state['main_max_gap'][number] == gaps.max()
+        assert np.array_equal(np.nonzero(state['main_gap_hist'][number])[0], np.unique(gaps))
+        row = summary.loc[number]
+        assert row['appearances'] == len(positions)
+        assert row['current_gap'] == n - 1 - positions[-1]
+        assert row['mean_gap'] == gaps.mean()
+    assert state['main_gap_hist'].sum() == 7 * n - (state['main_last_seen'][1:] >= 0).sum()
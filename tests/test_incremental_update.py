@@ -0,0 +1,86 @@
+import os
+import numpy as np
+import pytest
+from draw_store import load_draws, store_path_for, write_store, write_csv_chunks
+from artifact_stamps import PROCESSED_DIR, DERIVED_ARTIFACTS, ML_FILENAME, stamp_artifacts
+from incremental_update import STATE_FILENAME, rebuild_artifacts
+from add_new_draw import add_draws
+
+NPZ_ARTIFACTS = [STATE_FILENAME, "gap_state.npz", "pair_triplet_index.npz"]
+
+def snapshot():
+    # Contents of every derived artifact: raw bytes, or arrays for .npz files
+    out = {}
+    for name in sorted(set(DERIVED_ARTIFACTS) | set(NPZ_ARTIFACTS)):
+        path = os.path.join(PROCESSED_DIR, name)
+        if name.endswith(".npz"):
+            with np.load(path) as data:
+                out[name] = {key: data[key] for key in data.files}
+        else:
+            with open(path, 'rb') as f:
+                out[name] = f.read()
+    return out
+
+def assert_same(a, b):
+    assert a.keys() == b.keys()
+    for name in a:
+        if isinstance(a[name], dict):
+            assert a[name].keys() == b[name].keys(), name
+            for key in a[name]:
+                assert np.array_equal(a[name][key], b[name][key]), f"{name}:{key}"
+        else:
+            assert a[name] == b[name], name
+
+def as_draws(records):
+    return [(row['day'].astype('datetime64[D]'), row['numbers'][:7].tolist(), int(row['numbers'][7]))
+            for row in records]
+
+@pytest.fixture
+def split_history(history):
+    # The first 390 draws on file with artifacts built; the last 10 to append
+    records = np.array(load_draws(history))
+    write_csv_chunks([records[:390]], history)
+    write_store(records[:390], store_path_for(history))
+    rebuild_artifacts()
+    return history, as_draws(records[390:])
+
+def test_incremental_appends_match_rebuild(split_history, capsys):
+    path, new_draws = split_history
+    add_draws(new_draws[:4], path)
+    for draw in new_draws[4:]:
+        add_draws([draw], path)
+    assert "Rebuilt" not in capsys.readouterr().out
+    incremental = snapshot()
+    rebuild_artifacts()
+    assert_same(incremental, snapshot())
+
+def test_out_of_sync_stamps_fall_back_to_rebuild(split_history, capsys):
+    path, new_draws = split_history
+    stamp_artifacts([ML_FILENAME], "2000-01-01")
+    add_draws(new_draws[:1], path)
+    assert "Rebuilt processed artifacts" in capsys.readouterr().out
+    add_draws(new_draws[1:2], path)
+    assert "incrementally" in capsys.readouterr().out
+    appended = snapshot()
+    rebuild_artifacts()
+    assert_same(appended, snapshot())
+
+def test_skipped_artifact_updates_are_caught_up(split_history, capsys):
+    path, new_draws = split_history
+    add_draws(new_draws[:3], path, update=False)
+    add_draws(new_draws[3:4], path)
+    assert "Rebuilt processed artifacts" in capsys.readouterr().out
+    appended = snapshot()
+    rebuild_artifacts()
+    assert_same(appended, snapshot())
+
+def test_missing_gap_state_falls_back_to_rebuild(split_history, capsys):
+    path, new_draws = split_history
+    os.remove(os.path.join(PROCESSED_DIR, "gap_state.npz"))
+    add_draws(new_draws[:1], path)
+    assert "Rebuilt processed artifacts" in capsys.readouterr().out
+    add_draws(new_draws[1:2], path)
+    assert "incrementally" in capsys.readouterr().out
+    appended = snapshot()
+    rebuild_artifacts()
+    assert_same(appended, snapshot())
@@ -0,0 +1,32 @@
+import os
+import subprocess
+import sys
+import numpy as np
+import lottomax
+from draw_store import load_draws, store_path_for, write_csv_chunks, write_store
+
+def run_cli(*args):
+    code = ("import sys, lottomax; lottomax.main(sys.argv[1:]); "
+            "print('pandas loaded' if 'pandas' in sys.modules else 'pandas not loaded')")
+    env = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.abspath(lottomax.__file__)))
+    return subprocess.run([sys.executable, "-c", code, *args], capture_output=True, text=True, env=env)
+
+def test_show_last_and_append_skip_heavy_imports(history):
+    records = np.array(load_draws(history))
+    write_csv_chunks([records[:-1]], history)
+    write_store(records[:-1], store_path_for(history))
+    last = records[-1]
+    date = str(last['day'].astype('datetime64[D]'))
+    numbers = ','.join(str(n) for n in last['numbers'][:7])
+
+    out = run_cli("append", date, numbers, str(last['numbers'][7]), "--skip-artifacts")
+    assert out.returncode == 0, out.stderr
+    assert out.stdout.splitlines()[-1] == "pandas not loaded"
+    assert np.array_equal(np.asarray(load_draws(history)), records)
+
+    out = run_cli("show-last")
+    assert f"Last draw date: {date}" in out.stdout
+    assert out.stdout.splitlines()[-1] == "pandas not loaded"
+
+    out = run_cli("append", date, numbers, "99")
+    assert out.returncode == 1 and "Bonus number" in out.stdout
@@ -0,0 +1,49 @@
+import numpy as np
+import pytest
+import monte_carlo
+from benchmark_pair_triplet import synthetic_draws
+from monte_carlo import check_replicates, history_statistics, monte_carlo_pvalues, parse_args, simulate_histories
+
+def test_simulated_draws_are_valid():
+    histories = simulate_histories(np.random.default_rng(0), 20, 300)
+    assert histories.shape == (20, 300, 7)
+    assert (np.diff(histories, axis=2) > 0).all()
+    assert histories.min() >= 1 and histories.max() <= 50
+
+def test_batch_statistics_match_one_history_at_a_time():
+    histories = np.stack([synthetic_draws(200, seed=s) for s in range(3)])
+    stats = history_statistics(histories)
+    for i, draws in enumerate(histories):
+        flat = draws.ravel()
+        counts = np.bincount(flat, minlength=51)[1:]
+        expected = len(draws) * 7 / 50
+        assert stats['chi2'][i] == pytest.approx(((counts - expected) ** 2 / expected).sum())
+        assert stats['serial_corr'][i] == pytest.approx(np.corrcoef(flat[:-1], flat[1:])[0, 1])
+        p = counts[counts > 0] / counts.sum()
+        assert stats['entropy'][i] == pytest.approx(-(p * np.log2(p)).sum())
+
+def test_pvalues_are_reproducible():
+    draws = synthetic_draws(60, seed=9)
+    results = monte_carlo_pvalues(draws, n_replicates=90, workers=2, seed=3)
+    assert monte_carlo_pvalues(draws, n_replicates=90, workers=2, seed=3) == results
+    for r in results.values():
+        assert 1 / 91 <= r['p_value'] <= 1
+
+def test_results_do_not_depend_on_worker_count(monkeypatch):
+    monkeypatch.setattr(monte_carlo, 'TASK_REPLICATES', 20)
+    draws = synthetic_draws(60, seed=9)
+    one = monte_carlo_pvalues(draws, n_replicates=90, workers=1, seed=3)
+    assert monte_carlo_pvalues(draws, n_replicates=90, workers=3, seed=3) == one
+    assert monte_carlo_pvalues(draws, n_replicates=90, workers=1, seed=4) != one
+
+def test_replicate_count_is_checked():
+    draws = synthetic_draws(60, seed=9)
+    for n_replicates in (0, -5):
+        with pytest.raises(ValueError):
+            check_replicates(n_replicates)
+        with pytest.raises(ValueError):
+            monte_carlo_pvalues(draws, n_replicates=n_replicates, workers=1)
+    with pytest.raises(SystemExit) as exit_info:
+        parse_args(['--replicates', '0'])
+    assert exit_info.value.code == 2
+    assert monte_carlo_pvalues(draws, n_replicates=1, workers=1)['chi2']['p_value'] in (0.5, 1.0)
@@ -0,0 +1,73 @@
+import os
+import subprocess
+import sys
+import numpy as np
+import pytest
+pytest.importorskip("sklearn")
+import next_draw
+from ml_common import as_model_input, fit_varying, make_lagged_features
+from prepare_ml_data import load_ml_matrix, prepare_ml_data
+from draw_store import load_draws, store_path_for, write_csv_chunks, write_store
+from add_new_draw import add_draws
+from next_draw import (export_forest, export_linear, history_matches, latest_rows, load_model,
+                       predict_next, predict_windows, train)
+
+PARAMS = {'logistic': None, 'sgd': None, 'rf': {'n_estimators': 10}}
+
+def class1_probas(model, X):
+    # sklearn's predict_proba, column of class 1 for every output
+    classes = model.classes_ if hasattr(model, 'classes_') else [est.classes_ for est in model.estimators_]
+    return np.column_stack([p[:, list(c).index(1)] for p, c in zip(model.predict_proba(X), classes)])
+
+def as_draws(records):
+    return [(row['day'].astype('datetime64[D]'), row['numbers'][:7].tolist(), int(row['numbers'][7]))
+            for row in records]
+
+@pytest.mark.parametrize("model_type", ['logistic', 'sgd', 'rf'])
+def test_exported_arrays_match_sklearn_predict_proba(history, model_type):
+    prepare_ml_data()
+    ml_matrix = load_ml_matrix()
+    X, y = make_lagged_features(ml_matrix, n_lags=2)
+    model, varying, constant = fit_varying(model_type, PARAMS[model_type], as_model_input(X), y, n_jobs=1)
+    arrays = export_forest(model) if model_type == 'rf' else export_linear(model)
+    exported = {'model_type': model_type, 'varying': varying, 'constant': constant, **arrays}
+    windows = np.stack([ml_matrix[i:i + 2] for i in range(0, 399, 7)])
+    expected = class1_probas(model, as_model_input(windows.reshape(len(windows), -1)))
+    assert np.allclose(predict_windows(exported, windows)[:, varying], expected, rtol=0, atol=2e-6)
+
+    # The saved model serves the same probabilities for the latest window
+    train(model_type, n_lags=2, params=PARAMS[model_type], n_jobs=1)
+    saved = load_model(model_type, 2, PARAMS[model_type])
+    assert sorted(name for name in os.listdir(next_draw.model_dir(model_type, 2, PARAMS[model_type]))) == \
+        sorted([next_draw.META_FILENAME] + [name + ".npy" for name in exported if name != 'model_type'])
+    latest = class1_probas(model, as_model_input(ml_matrix[-2:].reshape(1, -1)))[0]
+    assert np.allclose(predict_next(model_type, 2, PARAMS[model_type])[varying], latest, rtol=0, atol=2e-6)
+    assert np.array_equal(predict_next(model_type, 2, PARAMS[model_type])[~varying], constant[~varying])
+
+def test_predict_does_not_import_sklearn(history):
+    prepare_ml_data()
+    train('rf', n_lags=2, params=PARAMS['rf'], n_jobs=1)
+    code = ("import sys, next_draw; p = next_draw.predict_next('rf', 2, {'n_estimators': 10}); "
+            "print(len(p), 'sklearn' in sys.modules)")
+    env = dict(os.environ, PYTHONPATH=os.path.dirname(os.path.abspath(next_draw.__file__)))
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, env=env)
+    assert out.stdout.split() == ["50", "False"], out.stderr
+
+def test_appended_draws_are_served_without_retraining(history):
+    records = np.array(load_draws(history))
+    write_csv_chunks([records[:-2]], history)
+    write_store(records[:-2], store_path_for(history))
+    prepare_ml_data()
+    train('logistic', n_lags=2, n_jobs=1)
+    before = predict_next('logistic', 2)
+    add_draws(as_draws(records[-2:-1]), history)
+    window = latest_rows(2)
+    assert np.array_equal(window[-1], load_ml_matrix()[-1])
+    assert window[-1].sum() == 7
+    assert history_matches(load_model('logistic', 2))
+    assert not np.array_equal(predict_next('logistic', 2), before)
+
+    # An append that skips the artifacts leaves the window stale
+    add_draws(as_draws(records[-1:]), history, update=False)
+    with pytest.raises(ValueError):
+        predict_next('logistic', 2)
@@ -0,0 +1,62 @@
+import os
+import shutil
+import pandas as pd
+import pipeline
+from pipeline import load_manifest, local_imports, run_pipeline, select_stages
+
+STAGES = ['frequency', 'gaps']
+
+def test_stage_selection_follows_dependencies():
+    assert select_stages(start='ml_prep') == ['ml_prep', 'ml_logistic', 'ml_lagged', 'ml_rf']
+    assert select_stages(only=['gaps', 'frequency']) == ['frequency', 'gaps']
+    assert select_stages(only=['frequency'], start='ml_prep') == []
+
+def test_unchanged_stages_are_skipped(history, capsys):
+    assert run_pipeline(only=STAGES, workers=1) == {'frequency': 'ran', 'gaps': 'ran'}
+    manifest = load_manifest()
+    assert set(manifest['stages']) == set(STAGES)
+    assert history in manifest['stages']['gaps']['inputs']
+    assert run_pipeline(only=STAGES, workers=1) == {'frequency': 'skipped', 'gaps': 'skipped'}
+
+    # A missing output reruns just that stage
+    os.remove(os.path.join(pipeline.PROCESSED_DIR, "number_gaps.csv"))
+    assert run_pipeline(only=STAGES, workers=1) == {'frequency': 'skipped', 'gaps': 'ran'}
+
+    # New input content reruns every stage that reads it
+    pd.read_csv(history).iloc[:-1].to_csv(history, index=False)
+    assert run_pipeline(only=STAGES, workers=1, dry_run=True) == {'frequency': 'stale', 'gaps': 'stale'}
+    assert run_pipeline(only=STAGES, workers=1) == {'frequency': 'ran', 'gaps': 'ran'}
+    assert run_pipeline(only=STAGES, workers=1, force=True) == {'frequency': 'ran', 'gaps': 'ran'}
+
+def test_touching_without_changes_does_not_rerun(history):
+    run_pipeline(only=STAGES, workers=1)
+    with open(history) as f:
+        text = f.read()
+    with open(history, 'w') as f:
+        f.write(text)
+    assert run_pipeline(only=STAGES, workers=1) == {'frequency': 'skipped', 'gaps': 'skipped'}
+
+def test_failed_stage_blocks_downstream(history):
+    # ml_prep fails without a history to read, so the ML stages never start
+    os.remove(history)
+    results = run_pipeline(start='ml_prep', workers=1)
+    assert results['ml_prep'] == 'failed'
+    assert {results[name] for name in ('ml_logistic', 'ml_lagged', 'ml_rf')} == {'blocked'}
+
+def test_import_closure_is_found_without_importing():
+    closure = local_imports('ml_predict_next_draw_rf')
+    assert {'ml_predict_next_draw_rf', 'ml_common', 'prepare_ml_data', 'draw_store', 'cooccurrence'} <= closure
+    assert 'numpy' not in closure and 'sklearn' not in closure
+    assert 'cooccurrence' in local_imports('gap_analysis')
+
+def test_changed_shared_module_reruns_its_importers(history, monkeypatch):
+    # Hash a private copy of the scripts so their source can be edited
+    scripts = shutil.copytree(pipeline.SCRIPTS_DIR, "scripts", ignore=shutil.ignore_patterns("__pycache__"))
+    monkeypatch.setattr(pipeline, 'SCRIPTS_DIR', os.path.abspath(scripts))
+    run_pipeline(only=STAGES, workers=1)
+    with open(os.path.join(scripts, "ml_common.py"), 'a') as f:
+        f.write("\n# edited\n")
+    assert run_pipeline(only=STAGES, workers=1, dry_run=True) == {'frequency': 'skipped', 'gaps': 'skipped'}
+    with open(os.path.join(scripts, "draw_store.py"), 'a') as f:
+        f.write("\n# edited\n")
+    assert run_pipeline(only=STAGES, workers=1, dry_run=True) == {'frequency': 'stale', 'gaps': 'stale'}
@@ -0,0 +1,29 @@
+import os
+import numpy as np
+import pandas as pd
+from prepare_ml_data import (ML_FILENAME, ML_PACKED_FILENAME, NUM_COLS, PACKED_WIDTH, PROCESSED_DIR, append_packed_rows,
+                             load_ml_matrix, packed_path, prepare_ml_data, save_packed_matrix)
+
+def test_packed_matrix_matches_csv_export(history):
+    prepare_ml_data()
+    exported = pd.read_csv(os.path.join(PROCESSED_DIR, ML_FILENAME))
+    matrix = load_ml_matrix()
+    assert matrix.shape == (400, 50)
+    assert np.array_equal(matrix, exported[NUM_COLS].to_numpy())
+    assert (matrix.sum(axis=1) == 7).all()
+    assert exported['draw_date'].tolist() == pd.read_csv(history)['draw_date'].tolist()
+    os.remove(os.path.join(PROCESSED_DIR, ML_PACKED_FILENAME))
+    assert np.array_equal(load_ml_matrix(), matrix)
+
+def test_appended_rows_match_a_full_save(history):
+    prepare_ml_data()
+    matrix = load_ml_matrix()
+    save_packed_matrix(matrix[:300])
+    append_packed_rows(matrix[300:301])
+    append_packed_rows(matrix[301:])
+    assert os.path.getsize(packed_path()) == 400 * PACKED_WIDTH
+    assert np.array_equal(load_ml_matrix(), matrix)
+    # A torn row left by an interrupted append is not read
+    with open(packed_path(), 'ab') as f:
+        f.write(b'\xff' * 3)
+    assert np.array_equal(load_ml_matrix(), matrix)
@@ -0,0 +1,78 @@
+import os
+from fractions import Fraction
+from math import comb
+import numpy as np
+import pandas as pd
+import pytest
+import probability_tables
+from probability_tables import (TABLES_FILENAME, load_tables, match_probabilities, subset_probability,
+                                subset_ranks, all_subsets, significance, annotate, subset_counts)
+from combinations_index import rank_subsets
+from benchmark import synthetic_draws
+
+@pytest.fixture(autouse=True)
+def fresh_tables(workdir):
+    # Build (and cache) the tables inside the temporary working directory
+    load_tables.cache_clear()
+    yield
+    load_tables.cache_clear()
+
+def test_match_table_exact_values():
+    counts = load_tables()['match_counts']
+    total = comb(50, 7) * 43
+    assert counts.sum() == total
+    assert counts[7].tolist() == [43, 0]
+    assert counts[6].tolist() == [7 * 43 * 42, 7 * 43]
+    # Main matches alone follow the hypergeometric distribution
+    for k in range(8):
+        assert Fraction(int(counts[k].sum()), total) == Fraction(comb(7, k) * comb(43, 7 - k), comb(50, 7))
+    probs = match_probabilities()
+    assert 1 / probs[7, 0] == pytest.approx(99_884_400)
+    assert 1 / probs[6, 1] == pytest.approx(14_269_200)
+
+def test_subset_probabilities():
+    assert subset_probability(1) == pytest.approx(7 / 50)
+    assert subset_probability(2) == pytest.approx(7 * 6 / (50 * 49))
+    assert subset_probability(3) == pytest.approx(7 * 6 * 5 / (50 * 49 * 48))
+    assert subset_probability(7) == pytest.approx(1 / comb(50, 7))
+
+def test_rank_tables_agree_with_rank_subsets():
+    for k in (2, 3):
+        subsets = all_subsets(k)
+        assert len(subsets) == comb(50, k)
+        assert np.array_equal(subset_ranks(subsets), np.arange(comb(50, k)))
+        assert np.array_equal(rank_subsets(subsets), np.arange(comb(50, k)))
+    assert subset_ranks([5, 12, 23, 34]) == rank_subsets([5, 12, 23, 34])
+
+def test_tables_are_cached_on_disk():
+    tables = load_tables()
+    path = os.path.join("data", "processed", TABLES_FILENAME)
+    assert os.path.exists(path)
+    load_tables.cache_clear()
+    cached = load_tables()
+    assert cached.keys() == tables.keys()
+    for name in tables:
+        assert np.array_equal(cached[name], tables[name])
+
+def test_significance_matches_scipy():
+    stats = pytest.importorskip("scipy.stats")
+    for k, n in ((2, 1100), (3, 1100), (3, 100_000)):
+        p = subset_probability(k)
+        counts = np.arange(0, int(3 * n * p) + 5)
+        expected, z, p_value = significance(counts, k, n)
+        assert np.allclose(expected, n * p)
+        assert np.allclose(z, (counts - n * p) / np.sqrt(n * p * (1 - p)))
+        reference = np.minimum(1, 2 * np.minimum(stats.binom.cdf(counts, n, p), stats.binom.sf(counts - 1, n, p)))
+        assert np.allclose(p_value, reference, rtol=1e-9, atol=0)
+
+def test_annotate_all_triplets():
+    draws = synthetic_draws(500, seed=6)
+    counts = subset_counts(draws, 3)
+    assert counts.sum() == 35 * len(draws)
+    frame = pd.DataFrame(all_subsets(3).astype(np.int64), columns=['num1', 'num2', 'num3'])
+    frame['count'] = counts
+    annotated = annotate(frame, len(draws))
+    assert len(annotated) == 19_600
+    assert list(annotated.columns[-3:]) == ['expected', 'z_score', 'p_value']
+    assert ((annotated['p_value'] > 0) & (annotated['p_value'] <= 1)).all()
+    assert probability_tables.subset_ranks(annotated[['num1', 'num2', 'num3']].to_numpy()).tolist() == list(range(19_600))
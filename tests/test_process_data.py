@@ -0,0 +1,79 @@
+import os
+import numpy as np
+import pandas as pd
+import pytest
+from draw_store import open_store, records_from_frame
+from process_data import clean_lottomax_data
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RAW_WORKBOOK = os.path.join(REPO_DIR, "data", "raw", "lottomax_history.xlsx")
+OUTPUT_COLS = ['draw_date', 'n1', 'n2', 'n3', 'n4', 'n5', 'n6', 'n7', 'bonus']
+
+def legacy_clean(df):
+    # The original whole-frame pandas cleaning, as CSV text
+    df = df.copy()
+    df.columns = [col.strip().lower() for col in df.columns]
+    if 'bonus' not in df.columns:
+        df['bonus'] = None
+    df['draw_date'] = pd.to_datetime(df['draw_date'])
+    df = df.sort_values('draw_date')
+    df = df.drop_duplicates(subset=OUTPUT_COLS)
+    return df[OUTPUT_COLS].to_csv(index=False)
+
+def read_text(path):
+    with open(path) as f:
+        return f.read()
+
+def test_streamed_cleaning_matches_legacy(history):
+    # Shuffled history plus exact duplicates spread over several chunks
+    clean = pd.read_csv(history)
+    raw = pd.concat([clean.sample(frac=1, random_state=0), clean.iloc[:40], clean.iloc[::-5]])
+    raw = raw.rename(columns={'draw_date': ' Draw_Date '})
+    raw.to_csv("data/raw/shuffled.csv", index=False)
+    clean_lottomax_data("data/raw/shuffled.csv", "data/processed/out.csv", chunksize=64)
+    assert read_text("data/processed/out.csv") == legacy_clean(raw)
+    assert read_text("data/processed/out.csv") == read_text(history)
+    store = open_store("data/processed/out.bin")
+    assert (np.asarray(store) == records_from_frame(clean)).all()
+
+def test_invalid_rows_are_dropped(workdir, capsys):
+    rows = [
+        ['2024-01-02', 1, 2, 3, 4, 5, 6, 7, 8],
+        ['not a date', 1, 2, 3, 4, 5, 6, 7, 8],
+        ['2024-01-05', 1, 1, 3, 4, 5, 6, 7, 8],     # repeated main
+        ['2024-01-09', 1, 2, 3, 4, 5, 6, 51, 8],    # out of range
+        ['2024-01-12', 1, 2, 3, 4, 5, 6, 7, 7],     # bonus among the mains
+        ['2024-01-16', 1, 2, 3, 4, 5, 6, 7.5, 8],   # not a whole number
+        ['2024-01-19', 9, 10, 11, 12, 13, 14, 15, None],
+    ]
+    pd.DataFrame(rows, columns=OUTPUT_COLS).to_csv("data/raw/raw.csv", index=False)
+    clean_lottomax_data("data/raw/raw.csv", "data/processed/out.csv")
+    assert "5 invalid" in capsys.readouterr().out
+    assert read_text("data/processed/out.csv") == (
+        "draw_date,n1,n2,n3,n4,n5,n6,n7,bonus\n"
+        "2024-01-02,1,2,3,4,5,6,7,8\n"
+        "2024-01-19,9,10,11,12,13,14,15,\n")
+
+@pytest.mark.skipif(not os.path.exists(RAW_WORKBOOK), reason="raw workbook not present")
+def test_workbook_cleaning_matches_legacy(workdir):
+    clean_lottomax_data(RAW_WORKBOOK, "data/processed/out.csv")
+    assert read_text("data/processed/out.csv") == legacy_clean(pd.read_excel(RAW_WORKBOOK))
+
+def test_dedupe_keeps_first_of_each_exact_draw(workdir, capsys):
+    rows = [
+        ['2024-01-05', 8, 9, 10, 11, 12, 13, 14, 15],
+        ['2024-01-02', 1, 2, 3, 4, 5, 6, 7, 8],
+        ['2024-01-05', 8, 9, 10, 11, 12, 13, 14, 15],
+        ['2024-01-02', 1, 2, 3, 4, 5, 6, 7, 9],     # same date, other bonus
+        ['2024-01-02', 1, 2, 3, 4, 5, 6, 7, 8],
+    ]
+    pd.DataFrame(rows, columns=OUTPUT_COLS).to_csv("data/raw/raw.csv", index=False)
+    clean_lottomax_data("data/raw/raw.csv", "data/processed/out.csv", chunksize=2)
+    assert "2 duplicates" in capsys.readouterr().out
+    assert read_text("data/processed/out.csv") == (
+        "draw_date,n1,n2,n3,n4,n5,n6,n7,bonus\n"
+        "2024-01-02,1,2,3,4,5,6,7,8\n"
+        "2024-01-02,1,2,3,4,5,6,7,9\n"
+        "2024-01-05,8,9,10,11,12,13,14,15\n")
+    # Only the outputs remain; the spool is gone
+    assert sorted(os.listdir("data/processed")) == ["out.bin", "out.csv"]
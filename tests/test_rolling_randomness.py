@@ -0,0 +1,66 @@
+import numpy as np
+import pandas as pd
+import pytest
+from benchmark_pair_triplet import synthetic_draws
+from monte_carlo import history_statistics
+from rolling_randomness import check_lag, rolling_randomness, rolling_statistics, window_bounds
+
+def indicator_for(mains):
+    out = np.zeros((len(mains), 50), dtype=np.int8)
+    np.put_along_axis(out, mains - 1, 1, axis=1)
+    return out
+
+@pytest.fixture
+def mains():
+    return np.asarray(synthetic_draws(120, seed=7), dtype=np.int64)
+
+def test_windows_match_whole_history_statistics(mains):
+    starts, stops = window_bounds(len(mains), window=30)
+    stats = rolling_statistics(mains, indicator_for(mains), starts, stops)
+    for i in (0, 45, len(starts) - 1):
+        expected = history_statistics(mains[None, starts[i]:stops[i]])
+        for name in ('chi2', 'entropy', 'runs_z'):
+            assert stats[name][i] == pytest.approx(expected[name][0])
+        assert stats['serial_corr_lag1'][i] == pytest.approx(expected['serial_corr'][0])
+
+def test_expanding_windows_with_a_longer_lag(mains):
+    starts, stops = window_bounds(len(mains), None, min_draws=10)
+    stats = rolling_statistics(mains, indicator_for(mains), starts, stops, lag=5)
+    assert (starts == 0).all() and stops[0] == 10 and stops[-1] == len(mains)
+    flat = mains[:stops[20]].ravel()
+    assert stats['serial_corr_lag5'][20] == pytest.approx(np.corrcoef(flat[:-5], flat[5:])[0, 1])
+
+def test_output_is_keyed_by_window_end_date(history):
+    result = rolling_randomness(history, window=50, output_path="data/processed/rolling.csv")
+    dates = pd.read_csv(history)['draw_date']
+    assert len(result) == 351
+    assert result.index[0] == dates[49] and result.index[-1] == dates.iloc[-1]
+    assert (result['n_draws'] == 50).all()
+
+def test_lag_bounds():
+    with pytest.raises(ValueError):
+        check_lag(0)
+    with pytest.raises(ValueError):
+        check_lag(-3, window=10)
+    with pytest.raises(ValueError):
+        check_lag(70, window=10)
+    check_lag(69, window=10)
+    check_lag(10_000)
+
+def test_lag_bounds_are_checked_before_reading(history):
+    with pytest.raises(ValueError):
+        rolling_randomness(history, window=10, lag=70)
+    with pytest.raises(ValueError):
+        rolling_randomness(history, window=None, lag=0)
+
+def test_short_windows_get_nan_serial_correlation(mains):
+    # Expanding windows from 2 draws: 14 numbers hold fewer than two lag-13 pairs
+    starts, stops = window_bounds(len(mains), None)
+    lag = 13
+    stats = rolling_statistics(mains, indicator_for(mains), starts, stops, lag=lag)
+    corr = stats[f'serial_corr_lag{lag}']
+    n_pairs = 7 * (stops - starts) - lag
+    assert np.isnan(corr[n_pairs < 2]).all()
+    assert np.isfinite(corr[n_pairs >= 2]).all()
+    with pytest.raises(ValueError):
+        rolling_statistics(mains, indicator_for(mains), starts, stops, lag=0)
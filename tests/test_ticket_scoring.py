@@ -0,0 +1,46 @@
+import numpy as np
+import pytest
+import ticket_scoring
+from draw_store import load_draws, presence_masks
+from ticket_scoring import prize_table, random_tickets, score_masks, score_tickets
+
+def naive_hist(tickets, records):
+    hist = np.zeros((len(tickets), 8, 2), dtype=np.int64)
+    for i, ticket in enumerate(tickets):
+        for row in records:
+            main = set(row['numbers'][:7].tolist())
+            hist[i, len(main & set(ticket)), int(int(row['numbers'][7]) in ticket)] += 1
+    return hist
+
+def test_scores_match_naive_counting(history):
+    records = load_draws(history)
+    tickets = np.vstack([random_tickets(20, seed=8), records['numbers'][5, :7]])
+    hist = score_tickets(tickets, records, workers=1)
+    assert np.array_equal(hist, naive_hist(tickets.tolist(), records))
+    assert hist[-1, 7].sum() >= 1
+    assert (hist.sum(axis=(1, 2)) == len(records)).all()
+    assert prize_table(hist).shape == (len(tickets), 9)
+
+def test_parallel_scoring_matches_one_process(history, monkeypatch):
+    records = load_draws(history)
+    tickets = random_tickets(50, seed=9)
+    single = score_tickets(tickets, records, workers=1)
+    monkeypatch.setattr(ticket_scoring, 'CHUNK_CELLS', 1000)
+    assert np.array_equal(score_tickets(tickets, records, workers=2), single)
+
+def test_single_ticket_and_masks(history):
+    records = load_draws(history)
+    ticket = [[3, 11, 19, 27, 35, 43, 50]]
+    hist = score_tickets(ticket, records)
+    assert hist.shape == (1, 8, 2)
+    assert np.array_equal(hist, naive_hist(ticket, records))
+    assert np.array_equal(score_masks(presence_masks(np.array(ticket)), records), hist)
+
+@pytest.mark.parametrize("tickets", [
+    [3, 11, 19, 27, 35, 43, 50],
+    [[1, 2, 3, 4, 5, 6]],
+    np.ones((2, 3, 7), dtype=np.int64),
+])
+def test_ticket_shape_is_checked(history, tickets):
+    with pytest.raises(ValueError):
+        score_tickets(tickets, load_draws(history))